@@ -0,0 +1,299 @@
+import asyncio
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable
+
+from botocore.exceptions import ClientError
+
+from app import config
+from app.dynamodb_repo import (_NO_COUNTER, BATCH_GET_MAX_KEYS, BATCH_MAX_ATTEMPTS, CustomerDynamoDBRepository,
+                               _condition_failure, _item, _ours, counter_update)
+from app.errors import AlreadyExists, NotFound, Throttled
+from app.retry import THROTTLE_CODES
+from app.stats import summarize
+
+class _InFlightRepository:
+    """Semaphore, in-flight accounting and stats shared by the asyncio repositories.
+
+    Subclasses implement `_run(fn, *args)` to await one DynamoDB call and `_exists_chunk`
+    for one BatchGetItem's worth of ids.
+    """
+
+    def __init__(self, max_in_flight: int = 32):
+        self.max_in_flight = max_in_flight
+        self._sem: asyncio.Semaphore | None = None
+        self._in_flight = self.peak_in_flight = 0
+        self._latencies: list[float] = []
+        self._busy_s = 0.0
+        self._first_start: float | None = None
+        self._last_end = 0.0
+        self.errors = 0
+
+    async def _run(self, fn: Callable, *args) -> Any:
+        raise NotImplementedError
+
+    async def _exists_chunk(self, chunk: list[str]) -> dict[str, bool]:
+        raise NotImplementedError
+
+    async def _call(self, fn: Callable, *args) -> Any:
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_in_flight)
+        async with self._sem:
+            self._in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self._in_flight)
+            t0 = time.perf_counter()
+            if self._first_start is None:
+                self._first_start = t0
+            try:
+                return await self._run(fn, *args)
+            except (AlreadyExists, NotFound):
+                raise
+            except Exception:
+                self.errors += 1
+                raise
+            finally:
+                t1 = time.perf_counter()
+                self._in_flight -= 1
+                self._latencies.append((t1 - t0) * 1000)
+                self._busy_s += t1 - t0
+                self._last_end = max(self._last_end, t1)
+
+    async def exists_many(self, ids: Iterable[str]) -> dict[str, bool]:
+        # BatchGetItem chunks go out concurrently instead of one after another
+        unique = list(dict.fromkeys(ids))
+        chunks = [unique[i:i + BATCH_GET_MAX_KEYS] for i in range(0, len(unique), BATCH_GET_MAX_KEYS)]
+        found: dict[str, bool] = {}
+        for part in await asyncio.gather(*(self._exists_chunk(c) for c in chunks)):
+            found.update(part)
+        return found
+
+    async def put_many(self, ids: Iterable[str], attrs: dict | None = None) -> dict[str, str]:
+        async def one(cid: str) -> str:
+            try:
+                await self.put(cid, attrs)
+                return "created"
+            except AlreadyExists:
+                return "exists"
+            except Exception as e:
+                return f"error: {e}"
+        unique = list(dict.fromkeys(ids))
+        return dict(zip(unique, await asyncio.gather(*(one(cid) for cid in unique))))
+
+    def stats(self) -> dict:
+        elapsed = self._last_end - self._first_start if self._first_start is not None else 0.0
+        return {
+            "requests": len(self._latencies),
+            "errors": self.errors,
+            "max_in_flight": self.max_in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            # average number of requests outstanding over the active window
+            "achieved_concurrency": round(self._busy_s / elapsed, 2) if elapsed else 0.0,
+            "requests_per_s": round(len(self._latencies) / elapsed, 1) if elapsed else 0.0,
+            "latency": summarize(self._latencies),
+        }
+
+class ThreadedAsyncRepository(_InFlightRepository):
+    """Thread-backed asyncio adapter for CustomerDynamoDBRepository.
+
+    Not a native async client (see AsyncCustomerRepository): every call is the sync
+    repository's blocking call, run on a dedicated thread pool behind a semaphore, so at most
+    `max_in_flight` DynamoDB requests (and threads) are outstanding. The shared botocore client
+    is thread-safe and the sync repository supplies the conditional writes, so put/exists/delete
+    raise the same AlreadyExists / NotFound errors.
+    """
+
+    def __init__(self, repo: CustomerDynamoDBRepository | None = None, max_in_flight: int = 32):
+        super().__init__(max_in_flight)
+        self._repo = repo or CustomerDynamoDBRepository()
+        self._pool: ThreadPoolExecutor | None = None
+
+    async def _run(self, fn: Callable, *args) -> Any:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="ddb-async")
+        return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+
+    async def _exists_chunk(self, chunk: list[str]) -> dict[str, bool]:
+        return await self._call(self._repo.exists_many, chunk)
+
+    async def put(self, cid: str, attrs: dict | None = None) -> None:
+        await self._call(self._repo.put, cid, attrs)
+
+    async def exists(self, cid: str, consistent: bool = True) -> bool:
+        return await self._call(self._repo.exists, cid, consistent)
+
+    async def delete(self, cid: str) -> dict:
+        return await self._call(self._repo.delete, cid)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+            self._sem = None
+
+    async def __aenter__(self) -> "ThreadedAsyncRepository":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+
+def _serializers():
+    from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+    return TypeSerializer().serialize, TypeDeserializer().deserialize
+
+_SERIALIZED_KEYS = ("Item", "Key", "ExpressionAttributeValues")
+
+class AsyncCustomerRepository(_InFlightRepository):
+    """Native asyncio DynamoDB repository on aiobotocore (optional dependency).
+
+    Same table layout, conditional writes, counter transactions and AlreadyExists / NotFound
+    errors as CustomerDynamoDBRepository, but every call is a coroutine on one aiobotocore
+    client: no threads. Retries are botocore's standard mode (DDB_RETRY_MAX_ATTEMPTS) instead of
+    the sync RetryPolicy; a put whose attempts include a retry accepts its own earlier write the
+    way the sync repository does after an ambiguous attempt. Use it as `async with`.
+    """
+
+    def __init__(self, table_name: str | None = None, region_name: str | None = None,
+                 counter_table: str | None = _NO_COUNTER, max_in_flight: int = 32,
+                 endpoint_url: str | None = None):
+        super().__init__(max_in_flight)
+        self._table_name = table_name or config.TABLE_NAME
+        self._region_name = region_name or config.AWS_REGION
+        if counter_table is _NO_COUNTER:
+            counter_table = config.COUNTER_TABLE_NAME if config.COUNTER_ENABLED else None
+        self._counter_table = counter_table
+        self._endpoint_url = endpoint_url
+        self._client_cm = self._client = None
+        self._ser, self._des = _serializers()
+
+    async def __aenter__(self) -> "AsyncCustomerRepository":
+        try:
+            from aiobotocore.config import AioConfig
+            from aiobotocore.session import get_session
+        except ImportError as e:
+            raise ImportError("AsyncCustomerRepository needs aiobotocore: pip install aiobotocore") from e
+        self._client_cm = get_session().create_client(
+            "dynamodb", region_name=self._region_name, endpoint_url=self._endpoint_url,
+            config=AioConfig(
+                tcp_keepalive=True,
+                max_pool_connections=self.max_in_flight,
+                connect_timeout=config.AWS_CONNECT_TIMEOUT,
+                read_timeout=config.AWS_READ_TIMEOUT,
+                retries={"mode": "standard", "max_attempts": config.DDB_RETRY_MAX_ATTEMPTS},
+            ),
+        )
+        self._client = await self._client_cm.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        client_cm, self._client_cm, self._client = self._client_cm, None, None
+        self._sem = None
+        if client_cm is not None:
+            await client_cm.__aexit__(*exc)
+
+    async def _run(self, fn: Callable, *args) -> Any:
+        return await fn(*args)
+
+    async def _send(self, operation: str, **kwargs) -> dict:
+        if self._client is None:
+            raise RuntimeError("AsyncCustomerRepository is used as `async with AsyncCustomerRepository() as repo`")
+        try:
+            return await getattr(self._client, operation)(**kwargs)
+        except ClientError as ce:
+            if ce.response.get("Error", {}).get("Code") in THROTTLE_CODES:
+                raise Throttled(f"throttled after {config.DDB_RETRY_MAX_ATTEMPTS} attempts") from ce
+            # botocore retried at least once: an earlier attempt may have been applied
+            ce.after_ambiguous_attempt = ce.response.get("ResponseMetadata", {}).get("RetryAttempts", 0) > 0
+            raise
+
+    def _wire(self, action: dict) -> dict:
+        # the low-level client takes AttributeValues; the sync repo's resource serializes for it
+        return {k: ({n: self._ser(v) for n, v in action[k].items()} if k in _SERIALIZED_KEYS else action[k])
+                for k in action}
+
+    async def _transact(self, kind: str, first: dict, delta: int) -> None:
+        # botocore resends the same parameters on retry, so the token stays stable across attempts
+        counter = counter_update(self._counter_table, delta)["Update"]
+        await self._send("transact_write_items",
+                         TransactItems=[{kind: self._wire(first)}, {"Update": self._wire(counter)}],
+                         ClientRequestToken=str(uuid.uuid4()))
+
+    async def put(self, cid: str, attrs: dict | None = None) -> None:
+        await self._call(self._put, cid, attrs)
+
+    async def exists(self, cid: str, consistent: bool = True) -> bool:
+        return await self._call(self._exists, cid, consistent)
+
+    async def delete(self, cid: str) -> dict:
+        return await self._call(self._delete, cid)
+
+    async def _exists_chunk(self, chunk: list[str]) -> dict[str, bool]:
+        return await self._call(self._batch_get, chunk)
+
+    async def _put(self, cid: str, attrs: dict | None) -> None:
+        item = _item(cid, attrs)
+        request = {
+            "TableName": self._table_name,
+            "Item": item,
+            "ConditionExpression": "attribute_not_exists(#id)",
+            "ExpressionAttributeNames": {"#id": "id"},
+            "ReturnValuesOnConditionCheckFailure": "ALL_OLD",
+        }
+        try:
+            if self._counter_table:
+                await self._transact("Put", request, 1)
+            else:
+                await self._send("put_item", **self._wire(request))
+        except ClientError as ce:
+            failed, stored = _condition_failure(ce)
+            if failed:
+                if _ours(ce, stored, item):
+                    return
+                raise AlreadyExists("id already exists")
+            raise
+
+    async def _exists(self, cid: str, consistent: bool) -> bool:
+        res = await self._send("get_item", TableName=self._table_name, Key={"id": {"S": cid}},
+                               ConsistentRead=consistent, ProjectionExpression="#id",
+                               ExpressionAttributeNames={"#id": "id"})
+        return "Item" in res
+
+    async def _delete(self, cid: str) -> dict:
+        request = {
+            "TableName": self._table_name,
+            "Key": {"id": cid},
+            "ConditionExpression": "attribute_exists(#id)",
+            "ExpressionAttributeNames": {"#id": "id"},
+            "ReturnValuesOnConditionCheckFailure": "ALL_OLD",
+        }
+        try:
+            if self._counter_table:
+                await self._transact("Delete", request, -1)
+                return {"id": cid}
+            res = await self._send("delete_item", ReturnValues="ALL_OLD", **self._wire(request))
+        except ClientError as ce:
+            failed, stored = _condition_failure(ce)
+            if failed and not stored:
+                raise NotFound("id not found")
+            raise
+        old = res.get("Attributes")
+        return {k: self._des(v) for k, v in old.items()} if old else {"id": cid}
+
+    async def _batch_get(self, chunk: list[str]) -> dict[str, bool]:
+        name = self._table_name
+        request = {name: {
+            "Keys": [{"id": {"S": cid}} for cid in chunk],
+            "ProjectionExpression": "#id",
+            "ExpressionAttributeNames": {"#id": "id"},
+            "ConsistentRead": True,
+        }}
+        found = dict.fromkeys(chunk, False)
+        for attempt in range(BATCH_MAX_ATTEMPTS):
+            res = await self._send("batch_get_item", RequestItems=request)
+            for item in res.get("Responses", {}).get(name, []):
+                found[item["id"]["S"]] = True
+            request = res.get("UnprocessedKeys") or {}
+            if not request:
+                return found
+            await asyncio.sleep(min(config.DDB_RETRY_MAX_SECONDS, config.DDB_RETRY_BASE_SECONDS * 2 ** attempt))
+        raise RuntimeError(f"batch_get_item left {len(request[name]['Keys'])} keys unprocessed")
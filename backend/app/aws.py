@@ -0,0 +1,65 @@
+import threading
+from app import config
+
+_lock = threading.Lock()
+_session = None
+_clients: dict = {}
+_resources: dict = {}
+
+def _client_config(service: str):
+    from botocore.config import Config
+    # app.dynamodb_repo retries DynamoDB itself (rate limiting, idempotent conditional writes)
+    attempts = {"total_max_attempts": 1} if service == "dynamodb" else {"max_attempts": config.AWS_MAX_ATTEMPTS}
+    return Config(
+        tcp_keepalive=True,
+        max_pool_connections=config.AWS_MAX_POOL_CONNECTIONS,
+        connect_timeout=config.AWS_CONNECT_TIMEOUT,
+        read_timeout=config.AWS_READ_TIMEOUT,
+        retries={"mode": "standard", **attempts},
+    )
+
+def session():
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                import boto3
+                _session = boto3.session.Session(region_name=config.AWS_REGION)
+    return _session
+
+def client(service: str, region_name: str | None = None):
+    key = (service, region_name or config.AWS_REGION)
+    found = _clients.get(key)
+    if found is None:
+        s = session()
+        with _lock:
+            found = _clients.get(key)
+            if found is None:
+                found = _clients[key] = s.client(service, region_name=key[1], config=_client_config(service))
+    return found
+
+def resource(service: str, region_name: str | None = None):
+    key = (service, region_name or config.AWS_REGION)
+    found = _resources.get(key)
+    if found is None:
+        s = session()
+        with _lock:
+            found = _resources.get(key)
+            if found is None:
+                found = _resources[key] = s.resource(service, region_name=key[1], config=_client_config(service))
+    return found
+
+def reset() -> None:
+    global _session
+    with _lock:
+        _session = None
+        _clients.clear()
+        _resources.clear()
+
+class LazyClient:
+    def __init__(self, service: str, region_name: str | None = None):
+        self._service = service
+        self._region_name = region_name
+
+    def __getattr__(self, name):
+        return getattr(client(self._service, self._region_name), name)
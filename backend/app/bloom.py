@@ -0,0 +1,357 @@
+import argparse
+import fcntl
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterable
+
+from app import config, metrics
+from app.logger import setup_logger
+
+logger = setup_logger("bloom")
+
+MAGIC = b"CIDBLOOM"
+FORMAT_VERSION = 1
+# magic, format version, k, reserved, m (bits), items added, removals seen, generation, built_at, updated_at
+_HEADER = struct.Struct("<8sHHIQQQQdd")
+HEADER_SIZE = _HEADER.size
+LOCAL_ADDS_MAX = 10000
+
+class BloomFilter:
+    """Bloom filter over customer IDs, laid out exactly like its snapshot file.
+
+    The buffer is header + bit array, so a snapshot is loaded by mapping the file and a
+    write is a single buffer dump. Positions come from one blake2b digest split into two
+    64-bit hashes (Kirsch-Mitzenmacher double hashing).
+    """
+
+    def __init__(self, m_bits: int, k: int, buf=None, count: int = 0, removed: int = 0,
+                 generation: int = 0, built_at: float | None = None, updated_at: float | None = None):
+        self.m = m_bits
+        self.k = k
+        self._buf = buf if buf is not None else bytearray(HEADER_SIZE + (m_bits + 7) // 8)
+        self.count = count
+        self.removed = removed
+        self.generation = generation
+        self.built_at = built_at if built_at is not None else time.time()
+        self.updated_at = updated_at if updated_at is not None else self.built_at
+
+    @classmethod
+    def for_capacity(cls, n: int, fp_rate: float = 0.01) -> "BloomFilter":
+        n = max(n, 1)
+        m = max(64, math.ceil(-n * math.log(fp_rate) / math.log(2) ** 2))
+        return cls(m, max(1, round(m / n * math.log(2))))
+
+    def _positions(self, cid: str):
+        digest = hashlib.blake2b(cid.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        m = self.m
+        return [(h1 + i * h2) % m for i in range(self.k)]
+
+    def add(self, cid: str) -> None:
+        buf = self._buf
+        for pos in self._positions(cid):
+            buf[HEADER_SIZE + (pos >> 3)] |= 1 << (pos & 7)
+        self.count += 1
+
+    def add_many(self, ids: Iterable[str]) -> None:
+        for cid in ids:
+            self.add(cid)
+
+    def __contains__(self, cid: str) -> bool:
+        buf = self._buf
+        for pos in self._positions(cid):
+            if not buf[HEADER_SIZE + (pos >> 3)] >> (pos & 7) & 1:
+                return False
+        return True
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._buf)
+
+    def fill_ratio(self) -> float:
+        return int.from_bytes(self._buf[HEADER_SIZE:], "little").bit_count() / self.m
+
+    def stats(self) -> dict:
+        fill = self.fill_ratio()
+        return {"generation": self.generation, "m_bits": self.m, "k": self.k, "items": self.count,
+                "removed": self.removed, "memory_bytes": self.nbytes, "fill_ratio": round(fill, 4),
+                # probability that a random absent id has all k bits set
+                "estimated_fp_rate": round(fill ** self.k, 6),
+                "built_at": self.built_at, "updated_at": self.updated_at}
+
+    def to_bytes(self) -> bytes:
+        _HEADER.pack_into(self._buf, 0, MAGIC, FORMAT_VERSION, self.k, 0, self.m, self.count,
+                          self.removed, self.generation, self.built_at, self.updated_at)
+        return bytes(self._buf)
+
+    @classmethod
+    def from_buffer(cls, buf) -> "BloomFilter":
+        if len(buf) < HEADER_SIZE:
+            raise ValueError("not an id filter snapshot")
+        magic, version, k, _, m, count, removed, generation, built_at, updated_at = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError("not an id filter snapshot")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"unsupported snapshot format {version}")
+        if len(buf) != HEADER_SIZE + (m + 7) // 8:
+            raise ValueError("truncated snapshot")
+        return cls(m, k, buf, count, removed, generation, built_at, updated_at)
+
+def write_snapshot(path: str, bloom: BloomFilter) -> None:
+    # write-then-rename: readers keep their mapping of the old file until they reload
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(bloom.to_bytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def load_snapshot(path: str, writable: bool = False) -> BloomFilter:
+    with open(path, "rb") as f:
+        if writable:
+            return BloomFilter.from_buffer(bytearray(f.read()))
+        # copy-on-write mapping: pages are shared until this container adds its own ids
+        return BloomFilter.from_buffer(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY))
+
+@contextmanager
+def _locked(path: str):
+    with open(f"{path}.lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def _journal_size(path: str) -> int:
+    try:
+        return os.path.getsize(f"{path}.journal")
+    except FileNotFoundError:
+        return 0
+
+def _journal_since(path: str, offset: int) -> list[str]:
+    try:
+        with open(f"{path}.journal", encoding="utf-8") as f:
+            f.seek(offset)
+            return [line.strip() for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+def apply_changes(path: str, inserted: list[str], removed: int = 0) -> dict | None:
+    """Fold stream inserts into the snapshot as a new generation.
+
+    Inserts also go to a journal, so a rebuild that is scanning the table meanwhile can
+    replay them before it swaps its filter in. Removals are only counted: a Bloom filter
+    cannot forget an id, the stale bits just raise the false-positive rate until the next
+    rebuild.
+    """
+    with _locked(path):
+        if inserted:
+            with open(f"{path}.journal", "a", encoding="utf-8") as j:
+                j.write("".join(f"{cid}\n" for cid in inserted))
+        try:
+            bloom = load_snapshot(path, writable=True)
+        except FileNotFoundError:
+            return None
+        bloom.add_many(inserted)
+        bloom.removed += removed
+        bloom.generation += 1
+        bloom.updated_at = time.time()
+        write_snapshot(path, bloom)
+        return {"generation": bloom.generation, "added": len(inserted), "removed": removed}
+
+def rebuild(path: str, repo=None, segments: int = 8, workers: int = 8, fp_rate: float | None = None,
+            headroom: float | None = None) -> dict:
+    from app.dynamodb_repo import CustomerDynamoDBRepository
+    repo = repo or CustomerDynamoDBRepository()
+    fp_rate = fp_rate or config.BLOOM_FP_RATE
+    headroom = config.BLOOM_HEADROOM if headroom is None else headroom
+    started = time.perf_counter()
+    journal_start = _journal_size(path)
+
+    def scan(segment: int) -> list[str]:
+        ids: list[str] = []
+        for page in repo.scan_segment(segment, segments):
+            ids.extend(page)
+        return ids
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(scan, range(segments)))
+    scanned = sum(len(p) for p in parts)
+    scan_s = time.perf_counter() - started
+
+    # sized with headroom so stream inserts until the next rebuild stay near the target rate
+    bloom = BloomFilter.for_capacity(int(scanned * (1 + headroom)), fp_rate)
+    for part in parts:
+        bloom.add_many(part)
+    with _locked(path):
+        # inserts the stream consumer saw while we scanned may sit in segments already read
+        replayed = _journal_since(path, journal_start)
+        bloom.add_many(replayed)
+        try:
+            bloom.generation = load_snapshot(path).generation + 1
+        except (FileNotFoundError, ValueError):
+            bloom.generation = 1
+        write_snapshot(path, bloom)
+        open(f"{path}.journal", "w").close()
+    return {"path": path, "scanned": scanned, "replayed": len(replayed), "scan_s": round(scan_s, 3),
+            "elapsed_s": round(time.perf_counter() - started, 3), **bloom.stats()}
+
+class FilterSource:
+    """The container's current snapshot, re-checked every `refresh_seconds`.
+
+    A missing or unreadable snapshot disables the filter (every lookup goes to DynamoDB).
+    Ids this container wrote are re-added after a reload, until the stream consumer has had
+    time to fold them into the snapshot.
+    """
+
+    def __init__(self, path: str | None = None, refresh_seconds: float | None = None, clock=time.monotonic):
+        self.path = path or config.BLOOM_SNAPSHOT_PATH
+        self.refresh_seconds = config.BLOOM_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        self._clock = clock
+        self._filter: BloomFilter | None = None
+        self._signature = None
+        self._next_check = 0.0
+        self._local: dict[str, None] = {}
+        self.load_ms: float | None = None
+        self.loads = 0
+
+    def get(self) -> BloomFilter | None:
+        now = self._clock()
+        if now >= self._next_check:
+            self._next_check = now + self.refresh_seconds
+            self._refresh()
+        return self._filter
+
+    def _refresh(self) -> None:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            if self._filter is not None:
+                logger.warning("id filter snapshot %s disappeared, filter off", self.path)
+            self._filter, self._signature = None, None
+            return
+        signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if signature == self._signature:
+            return
+        t0 = time.perf_counter()
+        try:
+            bloom = load_snapshot(self.path)
+        except (OSError, ValueError) as e:
+            logger.warning("id filter snapshot %s unusable, filter off: %s", self.path, e)
+            self._filter, self._signature = None, None
+            return
+        for cid in self._local:
+            bloom.add(cid)
+        self.load_ms = (time.perf_counter() - t0) * 1000
+        self.loads += 1
+        metrics.record("IdFilterLoad", self.load_ms)
+        self._filter, self._signature = bloom, signature
+
+    def add(self, cid: str) -> None:
+        self._local[cid] = None
+        if len(self._local) > LOCAL_ADDS_MAX:
+            del self._local[next(iter(self._local))]
+        bloom = self.get()
+        if bloom is not None:
+            bloom.add(cid)
+
+    def stats(self) -> dict:
+        bloom = self._filter
+        return {"loaded": bloom is not None, "loads": self.loads, "load_ms": self.load_ms,
+                "generation": bloom.generation if bloom else None,
+                "memory_bytes": bloom.nbytes if bloom else 0}
+
+class FilteredCustomerRepository:
+    """Answers `exists` with False on a definite filter miss, without a DynamoDB read."""
+
+    def __init__(self, repo, source: FilterSource):
+        self._repo = repo
+        self._source = source
+
+    def exists(self, cid: str, consistent: bool = True) -> bool:
+        bloom = self._source.get()
+        if bloom is not None and cid not in bloom:
+            metrics.incr("IdFilterNegative")
+            return False
+        metrics.incr("IdFilterPass")
+        return self._repo.exists(cid, consistent=consistent)
+
+    def exists_many(self, ids) -> dict[str, bool]:
+        bloom = self._source.get()
+        unique = list(dict.fromkeys(ids))
+        if bloom is None:
+            return self._repo.exists_many(unique)
+        candidates = [cid for cid in unique if cid in bloom]
+        metrics.incr("IdFilterNegative", len(unique) - len(candidates))
+        found = self._repo.exists_many(candidates) if candidates else {}
+        return {cid: found.get(cid, False) for cid in unique}
+
+    def put(self, cid: str, *args, **kwargs):
+        try:
+            return self._repo.put(cid, *args, **kwargs)
+        finally:
+            self._source.add(cid)
+
+    def __getattr__(self, name):
+        return getattr(self._repo, name)
+
+filter_source = FilterSource()
+
+def filtered_repository(repo):
+    if not config.BLOOM_ENABLED:
+        return repo
+    return FilteredCustomerRepository(repo, filter_source)
+
+def measure(path: str, probes: int = 100000) -> dict:
+    t0 = time.perf_counter()
+    bloom = load_snapshot(path)
+    load_ms = (time.perf_counter() - t0) * 1000
+    # random ids are absent from the table, so every hit is a false positive
+    hits = sum(f"probe_{uuid.uuid4().hex}" in bloom for _ in range(probes))
+    t1 = time.perf_counter()
+    for i in range(probes):
+        f"probe_{i}" in bloom
+    lookup_us = (time.perf_counter() - t1) / probes * 1e6 if probes else 0.0
+    stats = bloom.stats()
+    stats.update({"load_ms": round(load_ms, 3), "probes": probes,
+                  "measured_fp_rate": round(hits / probes, 6) if probes else None,
+                  "lookup_us": round(lookup_us, 3),
+                  "rebuild_recommended": bloom.removed > 0.2 * max(bloom.count, 1)
+                  or stats["estimated_fp_rate"] > 2 * config.BLOOM_FP_RATE})
+    return stats
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.bloom", description="Customer id Bloom filter snapshot")
+    parser.add_argument("--path", default=config.BLOOM_SNAPSHOT_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    r = sub.add_parser("rebuild", help="parallel scan of the table into a new snapshot generation")
+    r.add_argument("--segments", type=int, default=8)
+    r.add_argument("--workers", type=int, default=None, help="defaults to --segments")
+    r.add_argument("--fp-rate", type=float, default=None)
+    r.add_argument("--headroom", type=float, default=None)
+    r.add_argument("--table", default=None)
+    s = sub.add_parser("stats", help="size, fill, load time and measured false-positive rate")
+    s.add_argument("--probes", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        from app.dynamodb_repo import CustomerDynamoDBRepository
+        report = rebuild(args.path, CustomerDynamoDBRepository(table_name=args.table), args.segments,
+                         args.workers or args.segments, args.fp_rate, args.headroom)
+    else:
+        report = measure(args.path, args.probes)
+    print(json.dumps(report))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Iterable, Iterator, TextIO
+
+from app.dynamodb_repo import BATCH_WRITE_MAX_ITEMS, PUT_MANY_MAX_IDS, CustomerDynamoDBRepository
+from app.logger import setup_logger
+from app.stats import summarize
+from app.validation import is_valid_customer_id
+
+logger = setup_logger("bulk")
+
+MODES = ("put", "delete")
+INVALID_SAMPLE_SIZE = 10
+
+def read_ids(stream: TextIO) -> Iterator[str]:
+    for line in stream:
+        cid = line.strip()
+        if cid:
+            yield cid
+
+def _chunks(ids: Iterable[str], report: dict, size: int) -> Iterator[list[str]]:
+    seen: set[str] = set()
+    chunk: list[str] = []
+    for cid in ids:
+        report["read"] += 1
+        if not is_valid_customer_id(cid):
+            report["invalid"] += 1
+            if len(report["invalid_sample"]) < INVALID_SAMPLE_SIZE:
+                report["invalid_sample"].append(cid)
+            continue
+        if cid in seen:
+            report["duplicates"] += 1
+            continue
+        seen.add(cid)
+        chunk.append(cid)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def run_bulk(ids: Iterable[str], mode: str = "put", repo: CustomerDynamoDBRepository | None = None,
+             workers: int = 8, attrs: dict | None = None, transactional: bool = False) -> dict:
+    """Validate, de-duplicate and write `ids` from a thread pool.
+
+    By default, chunks of 25 go out as BatchWriteItem. That path has no conditions, so it cannot
+    tell which rows it changed. When the repository keeps a counter, a reconcile scan then
+    corrects the count. `transactional` writes conditional transactions of up to 99 IDs instead.
+    These move the counter exactly, but a transactional write costs twice the write capacity.
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}")
+    repo = repo or CustomerDynamoDBRepository()
+    if mode == "put" and attrs is None:
+        attrs = {"created_at": datetime.utcnow().isoformat() + "Z"}
+
+    # `written` counts ids sent in a batch that succeeded; in transactional mode it is the rows
+    # actually created/deleted, and `unchanged` the ids that already existed / were already gone
+    report = {"mode": mode, "transactional": transactional, "read": 0, "invalid": 0, "duplicates": 0,
+              "written": 0, "unchanged": 0, "failed": 0, "batches": 0, "invalid_sample": []}
+    latencies: list[float] = []
+
+    def write(chunk: list[str]) -> int:
+        t0 = time.perf_counter()
+        if transactional:
+            if mode == "put":
+                outcome = repo.put_many_if_absent(chunk, attrs)
+            else:
+                outcome = repo.delete_many_if_present(chunk)
+            written = sum(v in ("created", "deleted") for v in outcome.values())
+        else:
+            if mode == "put":
+                repo.batch_put(chunk, attrs)
+            else:
+                repo.batch_delete(chunk)
+            written = len(chunk)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        return written
+
+    def collect(done) -> None:
+        for fut in done:
+            chunk = inflight.pop(fut)
+            report["batches"] += 1
+            try:
+                written = fut.result()
+                report["written"] += written
+                report["unchanged"] += len(chunk) - written
+            except Exception as e:
+                report["failed"] += len(chunk)
+                logger.error("bulk %s batch failed (%d ids, first=%s): %s", mode, len(chunk), chunk[0], e)
+
+    started = time.perf_counter()
+    inflight: dict = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        size = PUT_MANY_MAX_IDS if transactional else BATCH_WRITE_MAX_ITEMS
+        for chunk in _chunks(ids, report, size):
+            if len(inflight) >= workers * 2:
+                done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                collect(done)
+            inflight[pool.submit(write, chunk)] = chunk
+        collect(wait(inflight).done)
+
+    elapsed = time.perf_counter() - started
+    report["elapsed_s"] = round(elapsed, 3)
+    report["ids_per_s"] = round(report["written"] / elapsed, 1) if elapsed else 0.0
+    report["batch_latency"] = summarize(latencies)
+    if not transactional and repo.counter_table:
+        from app.counter import CustomerCounter, reconcile
+        report["reconcile"] = reconcile(CustomerCounter(repo.counter_table), repo,
+                                        segments=workers, workers=workers, fix=True)
+    return report
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.bulk", description="Bulk insert/delete customer IDs")
+    parser.add_argument("mode", choices=MODES)
+    parser.add_argument("source", nargs="?", default="-", help="file with one id per line, '-' for stdin")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--table", default=None)
+    parser.add_argument("--transactional", action="store_true",
+                        help="conditional transactions of up to 99 ids: exact counter, twice the write capacity")
+    args = parser.parse_args(argv)
+
+    repo = CustomerDynamoDBRepository(table_name=args.table)
+    if args.source == "-":
+        report = run_bulk(read_ids(sys.stdin), args.mode, repo, args.workers, transactional=args.transactional)
+    else:
+        with open(args.source, encoding="utf-8") as f:
+            report = run_bulk(read_ids(f), args.mode, repo, args.workers, transactional=args.transactional)
+
+    print(json.dumps(report, ensure_ascii=False))
+    return 1 if report["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
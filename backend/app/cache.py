@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict
+from app import config, metrics
+
+_MISSING = object()
+
+class TTLCache:
+    def __init__(self, max_entries: int, clock=time.monotonic):
+        self._max = max_entries
+        self._clock = clock
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key, default=_MISSING):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > self._clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl: float) -> None:
+        if ttl <= 0 or self._max <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, self._clock() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self._max:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        return {"cache_hits": self.hits, "cache_misses": self.misses,
+                "cache_evictions": self.evictions, "cache_size": len(self._data)}
+
+class CachedCustomerRepository:
+    def __init__(self, repo, cache: TTLCache, positive_ttl: float, negative_ttl: float,
+                 consistent_on_miss: bool = True):
+        self._repo = repo
+        self._cache = cache
+        self._positive_ttl = positive_ttl
+        self._negative_ttl = negative_ttl
+        self._consistent = consistent_on_miss
+
+    def exists(self, cid: str) -> bool:
+        found = self._cache.get(cid)
+        if found is not _MISSING:
+            metrics.incr("CacheHit")
+        else:
+            metrics.incr("CacheMiss")
+            found = self._repo.exists(cid, consistent=self._consistent)
+            self._cache.set(cid, found, self._positive_ttl if found else self._negative_ttl)
+        return found
+
+    def put(self, cid: str, *args, **kwargs):
+        try:
+            return self._repo.put(cid, *args, **kwargs)
+        finally:
+            self._cache.invalidate(cid)
+
+    def delete(self, cid: str, *args, **kwargs):
+        try:
+            return self._repo.delete(cid, *args, **kwargs)
+        finally:
+            self._cache.invalidate(cid)
+
+    def __getattr__(self, name):
+        return getattr(self._repo, name)
+
+exists_cache = TTLCache(config.CACHE_MAX_ENTRIES)
+
+def cached_repository(repo):
+    if not config.CACHE_ENABLED:
+        return repo
+    return CachedCustomerRepository(
+        repo, exists_cache,
+        positive_ttl=config.CACHE_POSITIVE_TTL_SECONDS,
+        negative_ttl=config.CACHE_NEGATIVE_TTL_SECONDS,
+        consistent_on_miss=config.CACHE_MISS_READ != "eventual",
+    )
@@ -0,0 +1,324 @@
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+import uuid
+from typing import Iterable, Iterator
+
+from app import aws, config
+from app.cache import TTLCache
+from app.logger import setup_logger
+
+logger = setup_logger("changelog")
+
+SEGMENT_SUFFIX = ".ndjson.gz"
+BASE_PREFIX = "base-"
+APPEND_MAX_ATTEMPTS = 20
+SEGMENT_CACHE_TTL_SECONDS = 3600
+ADD, REMOVE = "add", "remove"
+
+class CheckpointCompacted(Exception):
+    """The segments after this checkpoint were folded into a newer base; resync from `ids_at`."""
+
+class LocalStore:
+    """Changelog files in a directory (EFS, a mounted volume, tests)."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def list(self) -> list[str]:
+        try:
+            return [n for n in os.listdir(self.root) if n.endswith(SEGMENT_SUFFIX)]
+        except FileNotFoundError:
+            return []
+
+    def read(self, name: str) -> bytes:
+        with open(os.path.join(self.root, name), "rb") as f:
+            return f.read()
+
+    def create(self, name: str, data: bytes) -> bool:
+        os.makedirs(self.root, exist_ok=True)
+        tmp = os.path.join(self.root, f".{uuid.uuid4().hex}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            # link() fails if the name is taken: a complete file appears under it, or nothing
+            os.link(tmp, os.path.join(self.root, name))
+            return True
+        except FileExistsError:
+            return False
+        finally:
+            os.unlink(tmp)
+
+    def delete(self, name: str) -> None:
+        try:
+            os.unlink(os.path.join(self.root, name))
+        except FileNotFoundError:
+            pass
+
+class S3Store:
+    """Changelog objects under a prefix of an S3 (or S3-compatible) bucket."""
+
+    def __init__(self, bucket: str, prefix: str = "", client=None):
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            if config.CHANGELOG_S3_ENDPOINT_URL:
+                self._client = aws.session().client("s3", endpoint_url=config.CHANGELOG_S3_ENDPOINT_URL)
+            else:
+                self._client = aws.client("s3")
+        return self._client
+
+    def list(self) -> list[str]:
+        names = []
+        for page in self.client.get_paginator("list_objects_v2").paginate(Bucket=self.bucket, Prefix=self.prefix):
+            names.extend(o["Key"][len(self.prefix):] for o in page.get("Contents", [])
+                         if o["Key"].endswith(SEGMENT_SUFFIX) and "/" not in o["Key"][len(self.prefix):])
+        return names
+
+    def read(self, name: str) -> bytes:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self.prefix + name)["Body"].read()
+        except self.client.exceptions.NoSuchKey:
+            raise FileNotFoundError(name) from None
+
+    def create(self, name: str, data: bytes) -> bool:
+        from botocore.exceptions import ClientError
+        try:
+            self.client.put_object(Bucket=self.bucket, Key=self.prefix + name, Body=data, IfNoneMatch="*")
+            return True
+        except ClientError as ce:
+            # 409 is a concurrent conditional write to the same key still in flight
+            if ce.response.get("Error", {}).get("Code") in ("PreconditionFailed", "ConditionalRequestConflict"):
+                return False
+            raise
+
+    def delete(self, name: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self.prefix + name)
+
+def open_store(uri: str | None = None):
+    uri = uri or config.CHANGELOG_URI
+    if uri.startswith("s3://"):
+        bucket, _, prefix = uri[5:].partition("/")
+        return S3Store(bucket, prefix)
+    return LocalStore(uri[7:] if uri.startswith("file://") else uri)
+
+def segment_name(n: int) -> str:
+    return f"{n:020d}{SEGMENT_SUFFIX}"
+
+def base_name(n: int) -> str:
+    return f"{BASE_PREFIX}{n:020d}{SEGMENT_SUFFIX}"
+
+def _encode(records: Iterable[dict]) -> bytes:
+    body = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+    return gzip.compress(body.encode(), compresslevel=6, mtime=0)
+
+def _decode(data: bytes) -> list[dict]:
+    return [json.loads(line) for line in gzip.decompress(data).decode().splitlines() if line]
+
+def compact_changes(changes: Iterable[tuple[str, str, float | None]]) -> list[dict]:
+    # last operation per id wins; ids keep the position of their last change
+    latest: dict[str, dict] = {}
+    for op, cid, ts in changes:
+        latest.pop(cid, None)
+        latest[cid] = {"op": op, "id": cid, "ts": ts}
+    return list(latest.values())
+
+class Changelog:
+    """Append-only log of id additions and removals, one gzip NDJSON segment per append.
+
+    Segments are numbered 1, 2, 3, ... and a checkpoint is a segment number: the id set at
+    checkpoint `c` is the newest base at or below `c` plus every segment after it up to `c`.
+    Appends claim the next number with a create-if-absent write, so concurrent writers
+    never overlap; the loser re-reads the head and tries the next number.
+    """
+
+    def __init__(self, store=None, cache: TTLCache | None = None):
+        self.store = store or open_store()
+        # segments and bases never change once written, so decoded ones can be kept
+        self._segments = cache if cache is not None else TTLCache(config.CHANGELOG_CACHE_SEGMENTS)
+
+    def _listing(self) -> tuple[int, list[int]]:
+        base, segments = 0, []
+        for name in self.store.list():
+            stem = name[:-len(SEGMENT_SUFFIX)]
+            if stem.startswith(BASE_PREFIX):
+                base = max(base, int(stem[len(BASE_PREFIX):]))
+            elif stem.isdigit():
+                segments.append(int(stem))
+        return base, sorted(n for n in segments if n > base)
+
+    def head(self) -> int:
+        base, segments = self._listing()
+        return max([base, *segments])
+
+    def append(self, records: list[dict]) -> int:
+        data = _encode(records)
+        for _ in range(APPEND_MAX_ATTEMPTS):
+            n = self.head() + 1
+            if self.store.create(segment_name(n), data):
+                return n
+        raise RuntimeError(f"could not claim a changelog segment after {APPEND_MAX_ATTEMPTS} attempts")
+
+    def _read(self, name: str) -> list[dict]:
+        records = self._segments.get(name, None)
+        if records is None:
+            records = _decode(self.store.read(name))
+            self._segments.set(name, records, SEGMENT_CACHE_TTL_SECONDS)
+        return records
+
+    def changes_since(self, checkpoint: int = 0, until: int | None = None) -> Iterator[tuple[int, list[dict]]]:
+        """(segment, records) for every segment after `checkpoint`, oldest first."""
+        base, segments = self._listing()
+        if checkpoint < base:
+            raise CheckpointCompacted(f"checkpoint {checkpoint} is older than base {base}")
+        for n in segments:
+            if n > checkpoint and (until is None or n <= until):
+                yield n, self._read(segment_name(n))
+
+    def read_page(self, position: dict | None, limit: int) -> tuple[list[dict], dict, bool]:
+        """Up to `limit` records from `position` on: (records, next position, more available).
+
+        No position starts with the base, every live id as an `add`, then the segments.
+        `{"b": base, "i": k}` is the k-th id of that base; `{"s": n, "i": k}` is the k-th record
+        of segment n, so `{"s": head + 1, "i": 0}` is caught up. A position inside a base that
+        was replaced, or in segments that were folded, raises CheckpointCompacted.
+        """
+        try:
+            return self._read_page(position, limit)
+        except FileNotFoundError as e:
+            # listed, then folded by a compaction before we got to it
+            raise CheckpointCompacted(f"{e} was compacted away") from None
+
+    def _read_page(self, position: dict | None, limit: int) -> tuple[list[dict], dict, bool]:
+        base, segments = self._listing()
+        if position is None:
+            position = {"b": base, "i": 0} if base else {"s": 1, "i": 0}
+        out: list[dict] = []
+        if "b" in position:
+            if position["b"] != base:
+                raise CheckpointCompacted(f"base {position['b']} was replaced by {base}")
+            records = self._read(base_name(base))
+            i = position["i"]
+            out.extend(records[i:i + limit])
+            i += len(out)
+            if i < len(records):
+                return out, {"b": base, "i": i}, True
+            position = {"s": base + 1, "i": 0}
+        s, i = position["s"], position["i"]
+        if s <= base:
+            raise CheckpointCompacted(f"segment {s} was folded into base {base}")
+        for n in segments:
+            if n < s:
+                continue
+            if len(out) >= limit:
+                return out, {"s": s, "i": i}, True
+            records = self._read(segment_name(n))
+            if n > s:
+                i = 0
+            take = records[i:i + limit - len(out)]
+            out.extend(take)
+            i += len(take)
+            if i < len(records):
+                return out, {"s": n, "i": i}, True
+            s, i = n + 1, 0
+        return out, {"s": s, "i": 0}, False
+
+    def ids_at(self, checkpoint: int | None = None) -> tuple[set[str], int]:
+        """The id set as of `checkpoint` (default: head) and the checkpoint it reflects."""
+        for attempt in range(2):
+            base, segments = self._listing()
+            head = max([base, *segments])
+            target = head if checkpoint is None else min(checkpoint, head)
+            if target < base:
+                raise CheckpointCompacted(f"checkpoint {target} is older than base {base}")
+            try:
+                ids = {r["id"] for r in self._read(base_name(base))} if base else set()
+                for n in segments:
+                    if n > target:
+                        break
+                    _apply(ids, self._read(segment_name(n)))
+                return ids, target
+            except FileNotFoundError:
+                # a compaction replaced what we listed; the new base covers it
+                if attempt:
+                    raise
+        raise AssertionError("unreachable")
+
+    def compact(self, keep: int | None = None) -> dict:
+        """Fold all but the newest `keep` segments into a base of the live ids, then drop them.
+
+        Keeping recent segments lets readers a little behind the head continue incrementally,
+        and guarantees an in-flight append never claims a number that was just folded.
+        """
+        keep = max(1, config.CHANGELOG_KEEP_SEGMENTS if keep is None else keep)
+        base, segments = self._listing()
+        folded = segments[:max(0, len(segments) - keep)]
+        if not folded:
+            return {"base": base, "folded": 0, "ids": None}
+        upto = folded[-1]
+        ids, _ = self.ids_at(upto)
+        self.store.create(base_name(upto), _encode({"op": ADD, "id": cid, "ts": None} for cid in sorted(ids)))
+        for n in folded:
+            self.store.delete(segment_name(n))
+        if base:
+            self.store.delete(base_name(base))
+        return {"base": upto, "folded": len(folded), "ids": len(ids)}
+
+    def stats(self) -> dict:
+        base, segments = self._listing()
+        return {"base": base, "segments": len(segments), "head": max([base, *segments])}
+
+def _apply(ids: set[str], records: list[dict]) -> None:
+    for r in records:
+        if r["op"] == ADD:
+            ids.add(r["id"])
+        else:
+            ids.discard(r["id"])
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.changelog", description="Customer id changelog")
+    parser.add_argument("--uri", default=None, help="directory or s3://bucket/prefix (default CHANGELOG_URI)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats")
+    i = sub.add_parser("ids", help="the id set at a checkpoint, as NDJSON")
+    i.add_argument("--at", type=int, default=None)
+    c = sub.add_parser("changes", help="records after a checkpoint, as NDJSON")
+    c.add_argument("--since", type=int, default=0)
+    k = sub.add_parser("compact")
+    k.add_argument("--keep", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    log = Changelog(open_store(args.uri))
+    started = time.perf_counter()
+    if args.command == "ids":
+        ids, at = log.ids_at(args.at)
+        for cid in sorted(ids):
+            sys.stdout.write(json.dumps({"id": cid}) + "\n")
+        report = {"checkpoint": at, "ids": len(ids)}
+    elif args.command == "changes":
+        count = 0
+        for n, records in log.changes_since(args.since):
+            for r in records:
+                sys.stdout.write(json.dumps({"segment": n, **r}) + "\n")
+            count += len(records)
+        report = {"since": args.since, "records": count}
+    elif args.command == "compact":
+        report = log.compact(args.keep)
+    else:
+        report = log.stats()
+    report["elapsed_s"] = round(time.perf_counter() - started, 3)
+    # the report goes to stderr so stdout stays pure NDJSON
+    print(json.dumps(report), file=sys.stderr if args.command in ("ids", "changes") else sys.stdout)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,4 +7,64 @@ LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
 EVENT_BUS_NAME    = os.getenv("EVENT_BUS_NAME", "default")
 EVENT_SOURCE      = os.getenv("EVENT_SOURCE", "customers.api")
-EVENT_DETAIL_TYPE = os.getenv("EVENT_DETAIL_TYPE", "Customer.Submitted")
\ No newline at end of file
+EVENT_DETAIL_TYPE = os.getenv("EVENT_DETAIL_TYPE", "Customer.Submitted")
+
+EXISTS_BATCH_MAX_IDS = int(os.getenv("EXISTS_BATCH_MAX_IDS", "1000"))
+
+CACHE_ENABLED              = os.getenv("CACHE_ENABLED", "false").lower() == "true"
+CACHE_MAX_ENTRIES          = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_POSITIVE_TTL_SECONDS = float(os.getenv("CACHE_POSITIVE_TTL_SECONDS", "60"))
+CACHE_NEGATIVE_TTL_SECONDS = float(os.getenv("CACHE_NEGATIVE_TTL_SECONDS", "5"))
+CACHE_MISS_READ            = os.getenv("CACHE_MISS_READ", "strong")  # strong | eventual
+
+AWS_CONNECT_TIMEOUT      = float(os.getenv("AWS_CONNECT_TIMEOUT", "2"))
+AWS_READ_TIMEOUT         = float(os.getenv("AWS_READ_TIMEOUT", "5"))
+AWS_MAX_POOL_CONNECTIONS = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "32"))
+AWS_MAX_ATTEMPTS         = int(os.getenv("AWS_MAX_ATTEMPTS", "3"))
+
+SUBMIT_MAX_IDS = int(os.getenv("SUBMIT_MAX_IDS", "500"))
+
+LIST_DEFAULT_LIMIT = int(os.getenv("LIST_DEFAULT_LIMIT", "100"))
+LIST_MAX_LIMIT     = int(os.getenv("LIST_MAX_LIMIT", "1000"))
+
+PREFIX_INDEX_NAME  = os.getenv("PREFIX_INDEX_NAME", "pfx_bucket-id")
+PREFIX_BUCKETS     = int(os.getenv("PREFIX_BUCKETS", "16"))
+
+COUNTER_ENABLED           = os.getenv("COUNTER_ENABLED", "false").lower() == "true"
+COUNTER_TABLE_NAME        = os.getenv("COUNTER_TABLE_NAME", "customer_ids_meta")
+COUNTER_SHARDS            = int(os.getenv("COUNTER_SHARDS", "10"))
+COUNT_CACHE_TTL_SECONDS   = float(os.getenv("COUNT_CACHE_TTL_SECONDS", "5"))
+
+IDEMPOTENCY_ENABLED              = os.getenv("IDEMPOTENCY_ENABLED", "true").lower() == "true"
+IDEMPOTENCY_TABLE_NAME           = os.getenv("IDEMPOTENCY_TABLE_NAME", "customer_ids_idempotency")
+IDEMPOTENCY_TTL_SECONDS          = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_IN_PROGRESS_SECONDS  = float(os.getenv("IDEMPOTENCY_IN_PROGRESS_SECONDS", "30"))
+IDEMPOTENCY_CACHE_MAX_ENTRIES    = int(os.getenv("IDEMPOTENCY_CACHE_MAX_ENTRIES", "1000"))
+
+BLOOM_ENABLED           = os.getenv("BLOOM_ENABLED", "false").lower() == "true"
+BLOOM_SNAPSHOT_PATH     = os.getenv("BLOOM_SNAPSHOT_PATH", "/mnt/ids/customer_ids.bloom")
+BLOOM_REFRESH_SECONDS   = float(os.getenv("BLOOM_REFRESH_SECONDS", "10"))
+BLOOM_FP_RATE           = float(os.getenv("BLOOM_FP_RATE", "0.01"))
+BLOOM_HEADROOM          = float(os.getenv("BLOOM_HEADROOM", "0.5"))
+
+CHANGELOG_URI              = os.getenv("CHANGELOG_URI", "/mnt/changelog")   # directory or s3://bucket/prefix
+CHANGELOG_S3_ENDPOINT_URL  = os.getenv("CHANGELOG_S3_ENDPOINT_URL", "")     # S3-compatible stores
+CHANGELOG_KEEP_SEGMENTS    = int(os.getenv("CHANGELOG_KEEP_SEGMENTS", "1000"))
+CHANGELOG_CACHE_SEGMENTS   = int(os.getenv("CHANGELOG_CACHE_SEGMENTS", "256"))
+
+DDB_RETRY_MAX_ATTEMPTS  = int(os.getenv("DDB_RETRY_MAX_ATTEMPTS", "6"))
+DDB_RETRY_BASE_SECONDS  = float(os.getenv("DDB_RETRY_BASE_SECONDS", "0.025"))
+DDB_RETRY_MAX_SECONDS   = float(os.getenv("DDB_RETRY_MAX_SECONDS", "1"))
+DDB_RATE_LIMIT_MIN      = float(os.getenv("DDB_RATE_LIMIT_MIN", "5"))
+DDB_RATE_LIMIT_MAX      = float(os.getenv("DDB_RATE_LIMIT_MAX", "1000"))
+DDB_RATE_LIMIT_BURST    = float(os.getenv("DDB_RATE_LIMIT_BURST", "10"))
+
+LOG_ASYNC                 = os.getenv("LOG_ASYNC", "false").lower() == "true"
+LOG_QUEUE_SIZE            = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_BATCH_SIZE            = int(os.getenv("LOG_BATCH_SIZE", "256"))
+LOG_FLUSH_TIMEOUT_SECONDS = float(os.getenv("LOG_FLUSH_TIMEOUT_SECONDS", "0.5"))
+
+METRICS_ENABLED   = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_NAMESPACE = os.getenv("METRICS_NAMESPACE", "CloudZone/CustomerIds")
+
+JSON_BACKEND = os.getenv("JSON_BACKEND", "stdlib")  # stdlib | orjson
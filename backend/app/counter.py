@@ -0,0 +1,91 @@
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+
+from app import aws, config
+from app.dynamodb_repo import COUNTER_SHARD_PREFIX, CustomerDynamoDBRepository, retry_policy
+from app.retry import RetryPolicy, backoff as _backoff
+
+class CustomerCounter:
+    """Sum of the sharded `n` counters that put/delete move inside their transactions."""
+
+    def __init__(self, table_name: str | None = None, region_name: str | None = None,
+                 shards: int | None = None, retry: RetryPolicy | None = None):
+        self._table_name = table_name or config.COUNTER_TABLE_NAME
+        self._region_name = region_name
+        self.shards = shards or config.COUNTER_SHARDS
+        self._retry = retry or retry_policy
+
+    @cached_property
+    def _client(self):
+        return aws.client("dynamodb", self._region_name)
+
+    def read(self) -> int:
+        request = {self._table_name: {
+            "Keys": [{"pk": {"S": f"{COUNTER_SHARD_PREFIX}{i}"}} for i in range(self.shards)],
+            "ProjectionExpression": "#n",
+            "ExpressionAttributeNames": {"#n": "n"},
+            "ConsistentRead": True,
+        }}
+        total = 0
+        for attempt in range(8):
+            res = self._retry.call(self._client.batch_get_item, RequestItems=request)
+            total += sum(int(item["n"]["N"]) for item in res.get("Responses", {}).get(self._table_name, []))
+            request = res.get("UnprocessedKeys") or {}
+            if not request:
+                return total
+            _backoff(attempt)
+        raise RuntimeError("batch_get_item left counter shards unprocessed")
+
+    def adjust(self, delta: int) -> None:
+        self._retry.call(
+            self._client.update_item,
+            TableName=self._table_name,
+            Key={"pk": {"S": f"{COUNTER_SHARD_PREFIX}0"}},
+            UpdateExpression="ADD #n :d",
+            ExpressionAttributeNames={"#n": "n"},
+            ExpressionAttributeValues={":d": {"N": str(delta)}},
+        )
+
+def scan_count(repo: CustomerDynamoDBRepository, segments: int = 8, workers: int = 8) -> int:
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(lambda s: repo.count_segment(s, segments), range(segments)))
+
+def reconcile(counter: CustomerCounter | None = None, repo: CustomerDynamoDBRepository | None = None,
+              segments: int = 8, workers: int = 8, fix: bool = False) -> dict:
+    counter = counter or CustomerCounter()
+    repo = repo or CustomerDynamoDBRepository()
+    started = time.perf_counter()
+    # writes during the scan move the counter; reading it on both sides shows whether they did
+    before = counter.read()
+    scanned = scan_count(repo, segments, workers)
+    after = counter.read()
+    drift = scanned - after
+    report = {"counter": after, "scanned": scanned, "drift": drift,
+              "stable": before == after, "fixed": False}
+    if fix and drift and before == after:
+        counter.adjust(drift)
+        report["fixed"] = True
+    report["elapsed_s"] = round(time.perf_counter() - started, 3)
+    return report
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.counter",
+                                     description="Recount customer IDs with a parallel scan and report counter drift")
+    parser.add_argument("--segments", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=None, help="defaults to --segments")
+    parser.add_argument("--fix", action="store_true", help="add the drift to the counter (only when no writes raced the scan)")
+    parser.add_argument("--table", default=None)
+    parser.add_argument("--counter-table", default=None)
+    args = parser.parse_args(argv)
+
+    report = reconcile(CustomerCounter(args.counter_table), CustomerDynamoDBRepository(table_name=args.table),
+                       args.segments, args.workers or args.segments, args.fix)
+    print(json.dumps(report))
+    return 1 if report["drift"] and not report["fixed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,41 +1,368 @@
-import boto3
+import heapq
+import random
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import Iterator
 from botocore.exceptions import ClientError
-from app.config import TABLE_NAME, AWS_REGION
+from app import aws, metrics
+from app import config
+from app.config import TABLE_NAME
 from app.errors import AlreadyExists, NotFound
+from app.retry import RetryPolicy, TokenBucket, backoff as _backoff
+
+BATCH_GET_MAX_KEYS = 100
+BATCH_WRITE_MAX_ITEMS = 25
+BATCH_MAX_ATTEMPTS = 8
+TRANSACT_MAX_ITEMS = 100
+# one transaction slot stays free for the counter update
+PUT_MANY_MAX_IDS = TRANSACT_MAX_ITEMS - 1
+COUNTER_SHARD_PREFIX = "count#"
+
+# one limiter/policy per container, shared by every repository instance and thread
+retry_policy = RetryPolicy(
+    TokenBucket(min_rate=config.DDB_RATE_LIMIT_MIN, max_rate=config.DDB_RATE_LIMIT_MAX,
+                burst=config.DDB_RATE_LIMIT_BURST),
+    max_attempts=config.DDB_RETRY_MAX_ATTEMPTS,
+    base=config.DDB_RETRY_BASE_SECONDS,
+    cap=config.DDB_RETRY_MAX_SECONDS,
+)
+
+def counter_update(table_name: str, delta: int, shards: int | None = None) -> dict:
+    # a random shard per write spreads concurrent transactions over COUNTER_SHARDS items;
+    # values are plain Python, the resource's client serializes them
+    shard = random.randrange(shards or config.COUNTER_SHARDS)
+    return {"Update": {
+        "TableName": table_name,
+        "Key": {"pk": f"{COUNTER_SHARD_PREFIX}{shard}"},
+        "UpdateExpression": "ADD #n :d",
+        "ExpressionAttributeNames": {"#n": "n"},
+        "ExpressionAttributeValues": {":d": delta},
+    }}
+
+def prefix_bucket(cid: str, buckets: int | None = None) -> int:
+    # crc32, not hash(): the bucket must be the same in every process
+    return zlib.crc32(cid.encode()) % (buckets or config.PREFIX_BUCKETS)
+
+def _item(cid: str, attrs: dict | None) -> dict:
+    # pfx_bucket is the partition key of the prefix index; writing it with the item keeps
+    # the index in step with every put, and a delete drops the item's index entry with it
+    return {**(attrs or {}), "id": cid, "pfx_bucket": prefix_bucket(cid)}
+
+def _code(ce: ClientError) -> str | None:
+    return ce.response.get("Error", {}).get("Code")
+
+def _ours(ce: ClientError, stored: dict | None, item: dict) -> bool:
+    # condition failed on a retry after an attempt whose outcome we never saw: if the stored
+    # item is exactly the one we sent, that attempt landed and this is not a conflict
+    if not getattr(ce, "after_ambiguous_attempt", False) or stored is None:
+        return False
+    from boto3.dynamodb.types import TypeDeserializer
+    des = TypeDeserializer()
+    return {k: des.deserialize(v) for k, v in stored.items()} == item
+
+def _condition_failure(ce: ClientError) -> tuple[bool, dict | None]:
+    """(condition failed, ALL_OLD item) for PutItem/DeleteItem and for the first item of a transaction."""
+    code = _code(ce)
+    if code == "ConditionalCheckFailedException":
+        return True, ce.response.get("Item")
+    if code == "TransactionCanceledException":
+        reasons = ce.response.get("CancellationReasons") or [{}]
+        if reasons[0].get("Code") == "ConditionalCheckFailed":
+            return True, reasons[0].get("Item")
+    return False, None
+
+_NO_COUNTER = object()
 
 class CustomerDynamoDBRepository:
-    def __init__(self, table_name: str | None = None, region_name: str | None = None, ddb=None):
-        self._ddb = ddb or boto3.resource("dynamodb", region_name=region_name or AWS_REGION)
-        self._table = self._ddb.Table(table_name or TABLE_NAME)
+    def __init__(self, table_name: str | None = None, region_name: str | None = None, ddb=None,
+                 retry: RetryPolicy | None = None, counter_table: str | None = _NO_COUNTER):
+        self._table_name = table_name or TABLE_NAME
+        self._region_name = region_name
+        self._retry = retry or retry_policy
+        if counter_table is _NO_COUNTER:
+            counter_table = config.COUNTER_TABLE_NAME if config.COUNTER_ENABLED else None
+        # with a counter table, put/delete also move a sharded count in the same transaction
+        self._counter_table = counter_table
+        if ddb is not None:
+            self._ddb = ddb
+
+    @property
+    def counter_table(self) -> str | None:
+        return self._counter_table
 
+    @cached_property
+    def _ddb(self):
+        return aws.resource("dynamodb", self._region_name)
+
+    @cached_property
+    def _table(self):
+        return self._ddb.Table(self._table_name)
+
+    def _transact(self, first: dict, delta: int) -> None:
+        # the token makes a retry of an applied transaction a no-op on DynamoDB's side
+        self._retry.call(
+            self._table.meta.client.transact_write_items,
+            TransactItems=[first, counter_update(self._counter_table, delta)],
+            ClientRequestToken=str(uuid.uuid4()),
+        )
+
+    @metrics.timed("DynamoDBPut")
     def put(self, cid: str, attrs: dict | None = None) -> None:
-        item = {"id": cid}
-        if attrs:
-            item.update(attrs)
+        item = _item(cid, attrs)
+        condition = {
+            "ConditionExpression": "attribute_not_exists(#id)",
+            "ExpressionAttributeNames": {"#id": "id"},
+            "ReturnValuesOnConditionCheckFailure": "ALL_OLD",
+        }
         try:
-            self._table.put_item(
-                Item=item,
-                ConditionExpression="attribute_not_exists(#id)",
-                ExpressionAttributeNames={"#id": "id"},
-            )
+            if self._counter_table:
+                self._transact({"Put": {"TableName": self._table_name, "Item": item, **condition}}, 1)
+            else:
+                self._retry.call(self._table.put_item, Item=item, **condition)
         except ClientError as ce:
-            if ce.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException":
+            failed, stored = _condition_failure(ce)
+            if failed:
+                if _ours(ce, stored, item):
+                    return
                 raise AlreadyExists("id already exists")
             raise
 
 
-    def exists(self, cid: str) -> bool:
-        res = self._table.get_item(Key={"id": cid}, ConsistentRead=True)
+    def _transact_many(self, actions: list[dict], delta: int) -> dict[int, tuple[ClientError, dict]]:
+        """Commit the conditional `actions` whose condition holds, moving the counter by `delta` for each.
+
+        Returns the (error, cancellation reason) of every action whose condition failed, by
+        index. A transaction is all-or-nothing, so those actions are dropped and the rest go
+        out again; every round removes at least one action.
+        """
+        failures: dict[int, tuple[ClientError, dict]] = {}
+        pending = list(range(len(actions)))
+        while pending:
+            batch = [actions[i] for i in pending]
+            if self._counter_table:
+                batch.append(counter_update(self._counter_table, delta * len(pending)))
+            try:
+                self._retry.call(self._table.meta.client.transact_write_items,
+                                 TransactItems=batch, ClientRequestToken=str(uuid.uuid4()))
+            except ClientError as ce:
+                reasons = ce.response.get("CancellationReasons") or []
+                failed = {i for i, r in enumerate(reasons[:len(pending)]) if r.get("Code") == "ConditionalCheckFailed"}
+                if _code(ce) != "TransactionCanceledException" or not failed:
+                    raise
+                failures.update((pending[i], (ce, reasons[i])) for i in failed)
+                pending = [idx for i, idx in enumerate(pending) if i not in failed]
+                continue
+            break
+        return failures
+
+    @metrics.timed("DynamoDBTransactPut")
+    def put_many_if_absent(self, ids: list[str], attrs: dict | None = None) -> dict[str, str]:
+        """Conditional put of up to PUT_MANY_MAX_IDS ids in one TransactWriteItems call.
+
+        Returns "created" or "exists" per id; the counter moves by the number created.
+        """
+        unique = list(dict.fromkeys(ids))
+        if len(unique) > PUT_MANY_MAX_IDS:
+            raise ValueError(f"at most {PUT_MANY_MAX_IDS} ids per transaction")
+        condition = {
+            "ConditionExpression": "attribute_not_exists(#id)",
+            "ExpressionAttributeNames": {"#id": "id"},
+            "ReturnValuesOnConditionCheckFailure": "ALL_OLD",
+        }
+        items = [_item(cid, attrs) for cid in unique]
+        failures = self._transact_many(
+            [{"Put": {"TableName": self._table_name, "Item": item, **condition}} for item in items], 1)
+        outcome = dict.fromkeys(unique, "created")
+        for i, (ce, reason) in failures.items():
+            if not _ours(ce, reason.get("Item"), items[i]):
+                outcome[unique[i]] = "exists"
+        return outcome
+
+    @metrics.timed("DynamoDBTransactDelete")
+    def delete_many_if_present(self, ids: list[str]) -> dict[str, str]:
+        """Conditional delete of up to PUT_MANY_MAX_IDS ids in one TransactWriteItems call.
+
+        Returns "deleted" or "missing" per id; the counter moves by the number deleted.
+        """
+        unique = list(dict.fromkeys(ids))
+        if len(unique) > PUT_MANY_MAX_IDS:
+            raise ValueError(f"at most {PUT_MANY_MAX_IDS} ids per transaction")
+        condition = {"ConditionExpression": "attribute_exists(#id)", "ExpressionAttributeNames": {"#id": "id"}}
+        failures = self._transact_many(
+            [{"Delete": {"TableName": self._table_name, "Key": {"id": cid}, **condition}} for cid in unique], -1)
+        outcome = dict.fromkeys(unique, "deleted")
+        for i in failures:
+            outcome[unique[i]] = "missing"
+        return outcome
+
+    @metrics.timed("DynamoDBExists")
+    def exists(self, cid: str, consistent: bool = True) -> bool:
+        res = self._retry.call(self._table.get_item, Key={"id": cid}, ConsistentRead=consistent)
         return "Item" in res
 
-    def delete(self, cid: str) -> None:
+    @metrics.timed("DynamoDBBatchGet")
+    def exists_many(self, ids) -> dict[str, bool]:
+        unique = list(dict.fromkeys(ids))
+        found: dict[str, bool] = dict.fromkeys(unique, False)
+        for i in range(0, len(unique), BATCH_GET_MAX_KEYS):
+            chunk = unique[i:i + BATCH_GET_MAX_KEYS]
+            for item in self._batch_get(chunk):
+                found[item["id"]] = True
+        return found
+
+    def _batch_get(self, chunk: list[str]) -> list[dict]:
+        name = self._table_name
+        request = {name: {
+            "Keys": [{"id": cid} for cid in chunk],
+            "ProjectionExpression": "#id",
+            "ExpressionAttributeNames": {"#id": "id"},
+            "ConsistentRead": True,
+        }}
+        items: list[dict] = []
+        for attempt in range(BATCH_MAX_ATTEMPTS):
+            res = self._retry.call(self._ddb.batch_get_item, RequestItems=request)
+            items.extend(res.get("Responses", {}).get(name, []))
+            request = res.get("UnprocessedKeys") or {}
+            if not request:
+                return items
+            _backoff(attempt)
+        raise RuntimeError(f"batch_get_item left {len(request[name]['Keys'])} keys unprocessed")
+
+    # BatchWriteItem has no conditions, so these cannot tell what they changed and leave the
+    # counter alone; app.bulk reconciles the counter after a run that used them
+    def batch_put(self, ids: list[str], attrs: dict | None = None) -> None:
+        self._batch_write([{"PutRequest": {"Item": _item(cid, attrs)}} for cid in ids])
+
+    def batch_delete(self, ids: list[str]) -> None:
+        self._batch_write([{"DeleteRequest": {"Key": {"id": cid}}} for cid in ids])
+
+    def _batch_write(self, requests: list[dict]) -> None:
+        if len(requests) > BATCH_WRITE_MAX_ITEMS:
+            raise ValueError(f"at most {BATCH_WRITE_MAX_ITEMS} items per batch write")
+        client = self._table.meta.client
+        pending = {self._table_name: requests}
+        for attempt in range(BATCH_MAX_ATTEMPTS):
+            res = self._retry.call(client.batch_write_item, RequestItems=pending)
+            pending = res.get("UnprocessedItems") or {}
+            if not pending:
+                return
+            _backoff(attempt)
+        raise RuntimeError(f"batch_write_item left {len(pending[self._table_name])} items unprocessed")
+
+    @metrics.timed("DynamoDBScan")
+    def list_page(self, limit: int, start_id: str | None = None) -> tuple[list[str], str | None]:
+        kwargs = {"ProjectionExpression": "#id", "ExpressionAttributeNames": {"#id": "id"}, "Limit": limit}
+        if start_id is not None:
+            kwargs["ExclusiveStartKey"] = {"id": start_id}
+        res = self._retry.call(self._table.scan, **kwargs)
+        last = res.get("LastEvaluatedKey")
+        return [item["id"] for item in res.get("Items", [])], (last["id"] if last else None)
+
+    @metrics.timed("DynamoDBPrefixQuery")
+    def search_prefix(self, prefix: str, limit: int, after: str | None = None) -> tuple[list[str], str | None]:
+        """Ids starting with `prefix` in order, after `after`, from every bucket of the prefix index.
+
+        The first page of each bucket is queried in parallel; heapq.merge then pulls further
+        pages only from the buckets the merged output reaches.
+        """
+        buckets = config.PREFIX_BUCKETS
+        page_size = max(10, -(-limit // buckets) * 2)
+
+        def query(bucket: int, start: str | None) -> tuple[list[str], str | None]:
+            kwargs = {
+                "TableName": self._table_name, "IndexName": config.PREFIX_INDEX_NAME,
+                "KeyConditionExpression": "#b = :b AND begins_with(#id, :p)",
+                "ExpressionAttributeNames": {"#b": "pfx_bucket", "#id": "id"},
+                "ExpressionAttributeValues": {":b": bucket, ":p": prefix},
+                "ProjectionExpression": "#id", "Limit": page_size,
+            }
+            if start is not None:
+                kwargs["ExclusiveStartKey"] = {"pfx_bucket": bucket, "id": start}
+            res = self._retry.call(self._table.meta.client.query, **kwargs)
+            last = res.get("LastEvaluatedKey")
+            return [item["id"] for item in res.get("Items", [])], (last["id"] if last else None)
+
+        def stream(bucket: int, first: tuple[list[str], str | None]):
+            ids, last = first
+            while True:
+                yield from ids
+                if last is None:
+                    return
+                ids, last = query(bucket, last)
+
+        firsts = list(self._pool.map(lambda b: query(b, after), range(buckets)))
+        merged = heapq.merge(*(stream(b, first) for b, first in enumerate(firsts)))
+        page = [cid for _, cid in zip(range(limit + 1), merged)]
+        if len(page) > limit:
+            return page[:limit], page[limit - 1]
+        return page, None
+
+    def tag_prefix_bucket(self, cid: str) -> bool:
+        """Write `cid`'s pfx_bucket if missing or stale; False if it already had it or is gone."""
         try:
-            self._table.delete_item(
-                Key={"id": cid},
-                ConditionExpression="attribute_exists(#id)",
-                ExpressionAttributeNames={"#id": "id"},
+            # attribute_exists keeps a delete that raced the scan from being undone
+            self._retry.call(
+                self._table.update_item, Key={"id": cid},
+                UpdateExpression="SET #b = :b",
+                ConditionExpression="attribute_exists(#id) AND (attribute_not_exists(#b) OR #b <> :b)",
+                ExpressionAttributeNames={"#id": "id", "#b": "pfx_bucket"},
+                ExpressionAttributeValues={":b": prefix_bucket(cid)},
             )
+            return True
         except ClientError as ce:
-            if ce.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException":
+            if _code(ce) == "ConditionalCheckFailedException":
+                return False
+            raise
+
+    @cached_property
+    def _pool(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=config.PREFIX_BUCKETS, thread_name_prefix="ddb-prefix")
+
+    def scan_segment(self, segment: int, total_segments: int, page_size: int = 1000) -> Iterator[list[str]]:
+        kwargs = {"ProjectionExpression": "#id", "ExpressionAttributeNames": {"#id": "id"},
+                  "Segment": segment, "TotalSegments": total_segments, "Limit": page_size}
+        while True:
+            res = self._retry.call(self._table.scan, **kwargs)
+            yield [item["id"] for item in res.get("Items", [])]
+            last = res.get("LastEvaluatedKey")
+            if not last:
+                return
+            kwargs["ExclusiveStartKey"] = last
+
+    @metrics.timed("DynamoDBDelete")
+    def delete(self, cid: str) -> dict:
+        condition = {
+            "ConditionExpression": "attribute_exists(#id)",
+            "ExpressionAttributeNames": {"#id": "id"},
+            "ReturnValuesOnConditionCheckFailure": "ALL_OLD",
+        }
+        try:
+            if self._counter_table:
+                # delete and -1 commit together; a transaction cannot return ALL_OLD, only the id
+                self._transact({"Delete": {"TableName": self._table_name, "Key": {"id": cid}, **condition}}, -1)
+                return {"id": cid}
+            res = self._retry.call(self._table.delete_item, Key={"id": cid}, ReturnValues="ALL_OLD", **condition)
+        except ClientError as ce:
+            failed, stored = _condition_failure(ce)
+            if failed and not stored:
+                # a retried transaction reuses its token, so an applied one never gets here; after an
+                # ambiguous plain DeleteItem the id may be gone because that attempt deleted it, but
+                # nothing shows that: it may never have existed
+                if getattr(ce, "after_ambiguous_attempt", False) and not self._counter_table:
+                    metrics.incr("DynamoDBAmbiguousDelete")
                 raise NotFound("id not found")
             raise
+        return res.get("Attributes") or {"id": cid}
+
+    def count_segment(self, segment: int, total_segments: int) -> int:
+        kwargs = {"Select": "COUNT", "Segment": segment, "TotalSegments": total_segments}
+        count = 0
+        while True:
+            res = self._retry.call(self._table.scan, **kwargs)
+            count += res.get("Count", 0)
+            last = res.get("LastEvaluatedKey")
+            if not last:
+                return count
+            kwargs["ExclusiveStartKey"] = last
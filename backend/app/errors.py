@@ -8,4 +8,16 @@ class AlreadyExists(DomainError):
     pass
 
 class NotFound(DomainError):
-    pass
\ No newline at end of file
+    pass
+
+class Throttled(DomainError):
+    pass
+
+class InvalidToken(DomainError):
+    pass
+
+class IdempotencyInProgress(DomainError):
+    pass
+
+class IdempotencyKeyReused(DomainError):
+    pass
@@ -0,0 +1,89 @@
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import Iterator
+from app import metrics
+from app.retry import backoff as _backoff
+
+PUT_EVENTS_MAX_ENTRIES = 10
+PUT_EVENTS_MAX_BYTES = 256 * 1024
+PUT_EVENTS_MAX_ATTEMPTS = 5
+
+def entry_size(entry: dict) -> int:
+    # https://docs.aws.amazon.com/eventbridge/latest/userguide/eb-putevent-size.html
+    size = 14 if entry.get("Time") else 0
+    for key in ("Source", "DetailType", "Detail"):
+        if entry.get(key):
+            size += len(entry[key].encode("utf-8"))
+    for res in entry.get("Resources") or []:
+        size += len(res.encode("utf-8"))
+    return size
+
+def batches(indexed: list[tuple[int, dict]]) -> Iterator[list[tuple[int, dict]]]:
+    batch, batch_bytes = [], 0
+    for i, entry in indexed:
+        size = entry_size(entry)
+        if batch and (len(batch) == PUT_EVENTS_MAX_ENTRIES or batch_bytes + size > PUT_EVENTS_MAX_BYTES):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append((i, entry))
+        batch_bytes += size
+    if batch:
+        yield batch
+
+def _error_code(e: Exception) -> str:
+    response = getattr(e, "response", None)
+    code = response.get("Error", {}).get("Code") if isinstance(response, dict) else None
+    return code or type(e).__name__
+
+def put_events_batched(client, entries: list[dict]) -> list[dict]:
+    """One result per entry: the PutEvents result entry, or an ErrorCode if it was not published.
+
+    Entries reported as failed are retried with backoff. A batch whose call raised is
+    marked failed with the exception's code and not resent, since botocore already retried
+    it. The other batches still go out, so earlier results are never lost.
+    """
+    results: list[dict] = [{} for _ in entries]
+    pending = []
+    for i, entry in enumerate(entries):
+        if entry_size(entry) > PUT_EVENTS_MAX_BYTES:
+            results[i] = {"ErrorCode": "EntryTooLarge", "ErrorMessage": "entry exceeds 256 KB"}
+        else:
+            pending.append((i, entry))
+
+    for attempt in range(PUT_EVENTS_MAX_ATTEMPTS):
+        failed = []
+        for batch in batches(pending):
+            try:
+                with metrics.timer("EventBridgePutEvents"):
+                    res = client.put_events(Entries=[entry for _, entry in batch])
+            except Exception as e:
+                code = _error_code(e)
+                for i, _ in batch:
+                    results[i] = {"ErrorCode": code, "ErrorMessage": str(e)}
+                continue
+            outs = res.get("Entries") or []
+            for n, (i, entry) in enumerate(batch):
+                out = outs[n] if n < len(outs) else {"ErrorCode": "MissingResult"}
+                results[i] = out
+                if out.get("ErrorCode"):
+                    failed.append((i, entry))
+        pending = failed
+        if not pending:
+            break
+        if attempt + 1 < PUT_EVENTS_MAX_ATTEMPTS:
+            _backoff(attempt)
+    return results
+
+def to_eventbridge_event(entry: dict, account: str = "000000000000", region: str = "eu-central-1") -> dict:
+    return {
+        "version": "0",
+        "id": str(uuid.uuid4()),
+        "detail-type": entry.get("DetailType"),
+        "source": entry.get("Source"),
+        "account": account,
+        "time": entry.get("Time") or datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "region": region,
+        "resources": entry.get("Resources") or [],
+        "detail": json.loads(entry.get("Detail") or "{}"),
+    }
@@ -0,0 +1,93 @@
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TextIO
+
+from app.dynamodb_repo import CustomerDynamoDBRepository
+from app.logger import setup_logger
+
+logger = setup_logger("export")
+
+_DONE = object()
+
+def export_ndjson(out: TextIO, repo: CustomerDynamoDBRepository | None = None, segments: int = 8,
+                  workers: int = 8, page_size: int = 1000, max_pending_pages: int = 32) -> dict:
+    """Parallel Scan of every id, written to `out` as one `{"id": ...}` line each.
+
+    Segment workers hand pages to the writer through a bounded queue, so at most
+    `max_pending_pages` pages are held in memory however large the table is.
+    """
+    repo = repo or CustomerDynamoDBRepository()
+    pages: queue.Queue = queue.Queue(max_pending_pages)
+    report = {"segments": segments, "ids": 0, "pages": 0, "failed_segments": []}
+    stop = threading.Event()
+
+    def scan(segment: int) -> None:
+        try:
+            for ids in repo.scan_segment(segment, segments, page_size):
+                if stop.is_set():
+                    return
+                pages.put(ids)
+        except Exception as e:
+            logger.error("export segment %d failed: %s", segment, e)
+            report["failed_segments"].append(segment)
+        finally:
+            pages.put(_DONE)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for segment in range(segments):
+            pool.submit(scan, segment)
+        remaining = segments
+        try:
+            while remaining:
+                ids = pages.get()
+                if ids is _DONE:
+                    remaining -= 1
+                    continue
+                if ids:
+                    out.write("".join(f'{{"id": {json.dumps(cid)}}}\n' for cid in ids))
+                report["ids"] += len(ids)
+                report["pages"] += 1
+        except BaseException:
+            # writer failed (e.g. closed pipe): stop the workers and unblock their puts
+            stop.set()
+            while remaining:
+                if pages.get() is _DONE:
+                    remaining -= 1
+            raise
+    out.flush()
+
+    elapsed = time.perf_counter() - started
+    report["failed_segments"].sort()
+    report["elapsed_s"] = round(elapsed, 3)
+    report["ids_per_s"] = round(report["ids"] / elapsed, 1) if elapsed else 0.0
+    return report
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.export", description="Export all customer IDs as NDJSON")
+    parser.add_argument("out", nargs="?", default="-", help="output file, '-' for stdout")
+    parser.add_argument("--segments", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=None, help="defaults to --segments")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--table", default=None)
+    args = parser.parse_args(argv)
+
+    repo = CustomerDynamoDBRepository(table_name=args.table)
+    workers = args.workers or args.segments
+    if args.out == "-":
+        report = export_ndjson(sys.stdout, repo, args.segments, workers, args.page_size)
+    else:
+        with open(args.out, "w", encoding="utf-8") as f:
+            report = export_ndjson(f, repo, args.segments, workers, args.page_size)
+
+    # the data goes to stdout, so the report goes to stderr
+    print(json.dumps(report), file=sys.stderr)
+    return 1 if report["failed_segments"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
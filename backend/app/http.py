@@ -1,29 +1,274 @@
 # app/http.py
-import json, base64
-from typing import Any, Dict, Optional
+import json, base64, re
+from typing import Any, Callable, Dict, Optional
+from app import config
 
 CORS_HEADERS: Dict[str, str] = {
     "Access-Control-Allow-Origin": "*",
-    "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token",
+    "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token,Idempotency-Key",
     "Access-Control-Allow-Methods": "GET,PUT,DELETE,POST,OPTIONS",  
     "Content-Type": "application/json", 
 }
 
+def _json_backend(name: str) -> Callable[[Any], str]:
+    # orjson is compact (no spaces after separators), so it is opt-in: the stdlib default
+    # keeps bodies byte-identical to what clients have always received.
+    if name == "orjson":
+        try:
+            import orjson
+        except ImportError:
+            return json.dumps
+        dumps = orjson.dumps
+        return lambda payload: dumps(payload).decode()
+    return json.dumps
+
+dumps = _json_backend(config.JSON_BACKEND)
+
 def resp(status: int, payload: Any, headers: Optional[Dict[str, str]] = None):
     return {
         "statusCode": status,
-        "headers": {**CORS_HEADERS, **(headers or {})},
-        "body": json.dumps(payload),
+        "headers": {**CORS_HEADERS, **headers} if headers else CORS_HEADERS.copy(),
+        "body": dumps(payload),
+    }
+
+def resp_body(status: int, body: str, headers: Optional[Dict[str, str]] = None):
+    return {
+        "statusCode": status,
+        "headers": {**CORS_HEADERS, **headers} if headers else CORS_HEADERS.copy(),
+        "body": body,
     }
 
-def parse_body(event) -> dict:
-    raw = event.get("body") or "{}"
-    if event.get("isBase64Encoded"):
+# printable ASCII without quote/backslash encodes to itself between quotes
+_NEEDS_ESCAPE = re.compile(r'[^ -~]|["\\]').search
+
+def _value(v, _needs_escape=_NEEDS_ESCAPE, _dumps=json.dumps) -> str:
+    if v.__class__ is str:
+        if _needs_escape(v) is None:
+            return '"' + v + '"'
+    elif v is True:
+        return "true"
+    elif v is False:
+        return "false"
+    elif v is None:
+        return "null"
+    elif v.__class__ is int:
+        return int.__repr__(v)
+    return _dumps(v)
+
+def body_template(*keys: str) -> Callable[..., str]:
+    """Encoder for a flat object with fixed keys; output matches json.dumps.
+
+    The `{"key": ` / `, "key": ` fragments are serialized once, so a call only encodes the
+    values and concatenates.
+    """
+    prefixes = tuple(("{" if i == 0 else ", ") + json.dumps(key) + ": " for i, key in enumerate(keys))
+    if len(prefixes) == 1:
+        p0, = prefixes
+        def encode(v0, _value=_value):
+            return p0 + _value(v0) + "}"
+    elif len(prefixes) == 2:
+        p0, p1 = prefixes
+        def encode(v0, v1, _value=_value):
+            return p0 + _value(v0) + p1 + _value(v1) + "}"
+    else:
+        def encode(*values, _value=_value):
+            if len(values) != len(prefixes):
+                raise TypeError(f"expected {len(prefixes)} values, got {len(values)}")
+            return "".join([p + _value(v) for p, v in zip(prefixes, values)]) + "}"
+    return encode
+
+EXISTS_BODY = body_template("exists", "id")
+CREATED_BODY = body_template("message", "id")
+ACCEPTED_BODY = body_template("status", "id")
+MESSAGE_BODY = body_template("message")
+ERROR_BODY = body_template("error")
+
+_THROTTLED_BODY = ERROR_BODY("throttled, retry later")
+
+def throttled(retry_after: int = 1):
+    return resp_body(503, _THROTTLED_BODY, {"Retry-After": str(retry_after)})
+
+class Request:
+    __slots__ = ("event", "_headers", "_body", "_json")
+
+    def __init__(self, event):
+        self.event = event if event.__class__ is dict else {}
+        self._headers = self._body = self._json = None
+
+    @property
+    def method(self) -> str | None:
+        return self.event.get("httpMethod")
+
+    @property
+    def resource(self) -> str | None:
+        return self.event.get("resource")
+
+    @property
+    def path_params(self) -> dict:
+        return self.event.get("pathParameters") or {}
+
+    @property
+    def query(self) -> dict:
+        return self.event.get("queryStringParameters") or {}
+
+    def header(self, name: str, default=None):
+        h = self.event.get("headers")
+        if not h:
+            return default
+        value = h.get(name)
+        if value is not None:
+            return value
+        if self._headers is None:
+            self._headers = {k.lower(): v for k, v in h.items()}
+        return self._headers.get(name.lower(), default)
+
+    @property
+    def body(self) -> str:
+        if self._body is None:
+            self._body = _body_text(self.event)
+        return self._body
+
+    @property
+    def json(self) -> Any:
+        if self._json is None:
+            self._json = _body_json(self.body)
+        return self._json
+
+def _body_text(event: dict) -> str:
+    raw = event.get("body") or ""
+    if raw.__class__ is not str:
+        return json.dumps(raw)
+    if raw and event.get("isBase64Encoded"):
         try:
-            raw = base64.b64decode(raw).decode("utf-8", errors="ignore")
+            return base64.b64decode(raw).decode("utf-8", errors="ignore")
         except Exception:
-            return {}
+            return ""
+    return raw
+
+def _body_json(body: str, _loads=json.loads) -> Any:
+    if not body:
+        return {}
+    try:
+        return _loads(body)
+    except Exception:
+        return {}
+
+_EMPTY: Dict[str, Any] = {}
+
+# One getter per ID source, over the raw event `e` and the Request `req` when the caller has
+# one. A Request is only built when the body is needed; headers are probed under every
+# casing of "id" without lower-casing the whole header dict.
+def _root_id(e, req):
+    return e.get("id")
+
+def _detail_id(e, req):
+    return (e.get("detail") or _EMPTY).get("id")
+
+def _path_id(e, req):
+    return (e.get("pathParameters") or _EMPTY).get("id")
+
+def _header_id(e, req):
+    h = e.get("headers")
+    return h and (h.get("id") or h.get("Id") or h.get("ID") or h.get("iD"))
+
+def _query_id(e, req):
+    return (e.get("queryStringParameters") or _EMPTY).get("id")
+
+def _body_id(e, req):
+    body = (req or Request(e)).json
+    return body.get("id") if body.__class__ is dict else None
+
+ID_SOURCES: Dict[str, Callable[[dict, Optional["Request"]], Any]] = {
+    "root": _root_id, "detail": _detail_id, "path": _path_id,
+    "header": _header_id, "query": _query_id, "body": _body_id,
+}
+
+# Unrolled extractors for the source orders the handlers use: inline probes with no call per
+# source and no type check on the hot path, as fast as the per-handler code they replaced.
+# Anything but an event dict fails the first .get() and is retried through _unwrap.
+# Any other source order takes the generic getter loop in id_extractor.
+def _unwrap(extract, src):
+    return extract(src.event) if src.__class__ is Request else None
+
+def _path_header(e, _empty=_EMPTY):
+    try:
+        v = (e.get("pathParameters") or _empty).get("id")
+    except AttributeError:
+        return _unwrap(_path_header, e)
+    if v:
+        return v
+    h = e.get("headers")
+    return h and (h.get("id") or h.get("Id") or h.get("ID") or h.get("iD")) or None
+
+def _path_header_query(e, _empty=_EMPTY):
     try:
-        return json.loads(raw)
+        v = (e.get("pathParameters") or _empty).get("id")
+    except AttributeError:
+        return _unwrap(_path_header_query, e)
+    if v:
+        return v
+    h = e.get("headers")
+    v = h and (h.get("id") or h.get("Id") or h.get("ID") or h.get("iD"))
+    if v:
+        return v
+    return (e.get("queryStringParameters") or _empty).get("id") or None
+
+def _root_detail(e, _empty=_EMPTY):
+    try:
+        return e.get("id") or (e.get("detail") or _empty).get("id") or None
+    except AttributeError:
+        return _unwrap(_root_detail, e)
+
+def _root_detail_path_header(e, _empty=_EMPTY):
+    try:
+        v = e.get("id") or (e.get("detail") or _empty).get("id") or (e.get("pathParameters") or _empty).get("id")
+    except AttributeError:
+        return _unwrap(_root_detail_path_header, e)
+    if v:
+        return v
+    h = e.get("headers")
+    return h and (h.get("id") or h.get("Id") or h.get("ID") or h.get("iD")) or None
+
+_UNROLLED: Dict[tuple, Callable[[Any], Any]] = {
+    ("path", "header"): _path_header,
+    ("path", "header", "query"): _path_header_query,
+    ("root", "detail"): _root_detail,
+    ("root", "detail", "path", "header"): _root_detail_path_header,
+}
+
+def _getter_loop(sources: tuple) -> Callable[[Any], Any]:
+    getters = tuple(ID_SOURCES[source] for source in sources)
+
+    def extract(src):
+        if src.__class__ is dict:
+            e, req = src, None
+        elif src.__class__ is Request:
+            e, req = src.event, src
+        else:
+            return None
+        for get in getters:
+            v = get(e, req)
+            if v:
+                return v
+        return None
+    return extract
+
+def id_extractor(*sources: str) -> Callable[[Any], Any]:
+    """First non-empty id from `sources`, in order, for an event dict or a Request."""
+    return _UNROLLED.get(sources) or _getter_loop(sources)
+
+def parse_body(event, _loads=json.loads) -> dict:
+    # Request.json without the Request: for a handler that reads the body once, this is the whole cost
+    if event.__class__ is not dict:
+        return {}
+    raw = event.get("body")
+    if not raw:
+        return {}
+    if raw.__class__ is not str:
+        return _body_json(_body_text(event))
+    try:
+        if event.get("isBase64Encoded"):
+            raw = base64.b64decode(raw).decode("utf-8", errors="ignore")
+        return _loads(raw) if raw else {}
     except Exception:
         return {}
@@ -0,0 +1,171 @@
+import functools
+import hashlib
+import json
+import time
+from functools import cached_property
+from typing import Callable
+
+from botocore.exceptions import ClientError
+from app import aws, config, metrics
+from app.cache import TTLCache
+from app.dynamodb_repo import retry_policy
+from app.errors import IdempotencyInProgress, IdempotencyKeyReused, Throttled
+from app.http import ERROR_BODY, Request, resp_body, throttled
+from app.logger import setup_logger
+from app.retry import RetryPolicy
+
+logger = setup_logger("idempotency")
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+IN_PROGRESS, COMPLETED = "in_progress", "completed"
+# headers the handlers read request inputs from (id_extractor's "header" source)
+INPUT_HEADERS = ("id",)
+
+def fingerprint(req: Request) -> str:
+    headers = {name: req.header(name) for name in INPUT_HEADERS}
+    raw = "\n".join((req.method or "", req.event.get("path") or "", json.dumps(req.path_params, sort_keys=True),
+                     json.dumps(headers, sort_keys=True), req.body))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+class IdempotencyStore:
+    """First response per idempotency key, in DynamoDB with a TTL and an in-container LRU.
+
+    `begin` claims a key with a conditional put (`in_progress`, short expiry) or returns the
+    stored record; `complete` stores the response for `ttl` seconds; `release` drops a claim
+    so the client can retry after a failure.
+    """
+
+    def __init__(self, table_name: str | None = None, region_name: str | None = None,
+                 ttl: float | None = None, in_progress_ttl: float | None = None,
+                 cache: TTLCache | None = None, clock=time.time, retry: RetryPolicy | None = None):
+        self._table_name = table_name or config.IDEMPOTENCY_TABLE_NAME
+        self._region_name = region_name
+        self._retry = retry or retry_policy
+        self.ttl = config.IDEMPOTENCY_TTL_SECONDS if ttl is None else ttl
+        self.in_progress_ttl = config.IDEMPOTENCY_IN_PROGRESS_SECONDS if in_progress_ttl is None else in_progress_ttl
+        self.cache = cache if cache is not None else TTLCache(config.IDEMPOTENCY_CACHE_MAX_ENTRIES)
+        self._clock = clock
+
+    @cached_property
+    def _table(self):
+        return aws.resource("dynamodb", self._region_name).Table(self._table_name)
+
+    def begin(self, key: str, fp: str) -> dict | None:
+        record = self.cache.get(key, None)
+        if record is not None:
+            return self._check(record, fp)
+        now = int(self._clock())
+        claim = {"key": key, "status": IN_PROGRESS, "fingerprint": fp, "expires_at": now + int(self.in_progress_ttl)}
+        ambiguous = False
+        try:
+            self._retry.call(
+                self._table.put_item, Item=claim,
+                ConditionExpression="attribute_not_exists(#k) OR expires_at < :now",
+                ExpressionAttributeNames={"#k": "key"},
+                ExpressionAttributeValues={":now": now},
+            )
+            return None
+        except ClientError as ce:
+            if ce.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+                raise
+            ambiguous = getattr(ce, "after_ambiguous_attempt", False)
+        record = self._retry.call(self._table.get_item, Key={"key": key}, ConsistentRead=True).get("Item")
+        if record is None:
+            # expired and swept between the two calls
+            return self.begin(key, fp)
+        if ambiguous and record == claim:
+            # our own claim from an attempt whose response was lost
+            return None
+        if record["status"] == COMPLETED:
+            self.cache.set(key, record, int(record["expires_at"]) - now)
+        return self._check(record, fp)
+
+    def _check(self, record: dict, fp: str) -> dict:
+        if record.get("fingerprint") != fp:
+            raise IdempotencyKeyReused("idempotency key was used with a different request")
+        if record["status"] != COMPLETED:
+            raise IdempotencyInProgress("a request with this idempotency key is in progress")
+        return record
+
+    def complete(self, key: str, fp: str, response: dict) -> None:
+        expires_at = int(self._clock() + self.ttl)
+        record = {"key": key, "status": COMPLETED, "fingerprint": fp,
+                  "response": json.dumps(response), "expires_at": expires_at}
+        self._retry.call(self._table.put_item, Item=record)
+        self.cache.set(key, record, self.ttl)
+
+    def release(self, key: str) -> None:
+        try:
+            self._retry.call(
+                self._table.delete_item,
+                Key={"key": key},
+                ConditionExpression="#s = :in_progress",
+                ExpressionAttributeNames={"#s": "status"},
+                ExpressionAttributeValues={":in_progress": IN_PROGRESS},
+            )
+        except ClientError as ce:
+            # the claim expired and was taken over; nothing of ours left to drop
+            if ce.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+                logger.warning("idempotency release failed for %s: %s", key, ce)
+        except Exception as e:
+            # the claim expires after in_progress_ttl on its own
+            logger.warning("idempotency release failed for %s: %s", key, e)
+
+store = IdempotencyStore()
+
+def _replay(record: dict) -> dict:
+    response = json.loads(record["response"])
+    response["headers"] = {**response.get("headers", {}), "Idempotent-Replayed": "true"}
+    return response
+
+def idempotent(scope: str, get_store: Callable[[], IdempotencyStore] = lambda: store):
+    """Replay the first response for a repeated `Idempotency-Key` header.
+
+    Only non-5xx responses are stored; a 5xx or an exception releases the key. A throttled
+    store answers 503; any other store failure runs the handler without idempotency.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(event, context):
+            req = Request(event)
+            raw_key = req.header(HEADER)
+            if not config.IDEMPOTENCY_ENABLED or not raw_key:
+                return fn(event, context)
+            if len(raw_key) > MAX_KEY_LENGTH:
+                return resp_body(400, ERROR_BODY(f"{HEADER} longer than {MAX_KEY_LENGTH} characters"))
+
+            s = get_store()
+            key, fp = f"{scope}#{raw_key}", fingerprint(req)
+            try:
+                record = s.begin(key, fp)
+            except IdempotencyInProgress as e:
+                return resp_body(409, ERROR_BODY(str(e)), {"Retry-After": "1"})
+            except IdempotencyKeyReused as e:
+                return resp_body(422, ERROR_BODY(str(e)))
+            except Throttled:
+                return throttled()
+            except Exception as e:
+                logger.error("idempotency store unavailable for %s: %s", key, e)
+                metrics.incr("IdempotencyUnavailable")
+                return fn(event, context)
+            if record is not None:
+                metrics.incr("IdempotentReplay")
+                return _replay(record)
+
+            try:
+                response = fn(event, context)
+            except Exception:
+                s.release(key)
+                raise
+            if response.get("statusCode", 500) >= 500:
+                s.release(key)
+                return response
+            try:
+                s.complete(key, fp, response)
+            except Exception as e:
+                # the work is done; a retry will wait out the in-progress claim instead of replaying
+                logger.warning("idempotency complete failed for %s: %s", key, e)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import time
+import uuid
+from collections import deque
+from types import SimpleNamespace
+from typing import Callable
+
+from app.events import to_eventbridge_event
+from app.stats import summarize
+
+QUEUE_ARN = "arn:aws:sqs:eu-central-1:000000000000:customer-ids-ingest"
+
+class LocalQueue:
+    """In-process stand-in for an SQS queue feeding a Lambda event source mapping.
+
+    `drain` hands batches to a handler in the SQS event shape. Like the partial batch
+    response, a result with `batchItemFailures` marks only those messages as failed. No
+    result, or an exception, fails the whole batch. Failed messages go back on the queue
+    until they have been received `max_receive_count` times, then to `dead_letters`.
+    """
+
+    def __init__(self, arn: str = QUEUE_ARN, max_receive_count: int = 3):
+        self.arn = arn
+        self.max_receive_count = max_receive_count
+        self._messages: deque[dict] = deque()
+        self.dead_letters: list[dict] = []
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def send(self, body: str | dict) -> str:
+        body = body if isinstance(body, str) else json.dumps(body)
+        message_id = str(uuid.uuid4())
+        self._messages.append({"messageId": message_id, "body": body, "receiveCount": 0,
+                               "sentAt": int(time.time() * 1000)})
+        return message_id
+
+    def send_events(self, entries: list[dict]) -> list[str]:
+        # what an EventBridge rule with this queue as target delivers: the whole event as body
+        return [self.send(to_eventbridge_event(entry)) for entry in entries]
+
+    def receive(self, max_messages: int = 10) -> list[dict]:
+        batch = []
+        while self._messages and len(batch) < max_messages:
+            message = self._messages.popleft()
+            message["receiveCount"] += 1
+            batch.append(message)
+        return batch
+
+    def _record(self, message: dict) -> dict:
+        return {
+            "messageId": message["messageId"],
+            "receiptHandle": message["messageId"],
+            "body": message["body"],
+            "attributes": {"ApproximateReceiveCount": str(message["receiveCount"]),
+                           "SentTimestamp": str(message["sentAt"])},
+            "messageAttributes": {},
+            "md5OfBody": hashlib.md5(message["body"].encode()).hexdigest(),
+            "eventSource": "aws:sqs",
+            "eventSourceARN": self.arn,
+            "awsRegion": self.arn.split(":")[3],
+        }
+
+    def _release(self, message: dict) -> bool:
+        if message["receiveCount"] >= self.max_receive_count:
+            self.dead_letters.append(message)
+            return False
+        self._messages.append(message)
+        return True
+
+    def drain(self, handler: Callable, batch_size: int = 10, max_invocations: int | None = None) -> dict:
+        invocations = messages = redelivered = 0
+        latencies: list[float] = []
+        started = time.perf_counter()
+        while self._messages and (max_invocations is None or invocations < max_invocations):
+            batch = self.receive(batch_size)
+            context = SimpleNamespace(aws_request_id=str(uuid.uuid4()), function_name="local-queue-consumer")
+            t0 = time.perf_counter()
+            try:
+                result = handler({"Records": [self._record(m) for m in batch]}, context)
+                failed = {f["itemIdentifier"] for f in (result or {}).get("batchItemFailures", [])}
+            except Exception:
+                failed = {m["messageId"] for m in batch}
+            latencies.append((time.perf_counter() - t0) * 1000)
+            invocations += 1
+            messages += len(batch)
+            for message in batch:
+                if message["messageId"] in failed:
+                    redelivered += self._release(message)
+        elapsed = time.perf_counter() - started
+        return {
+            "invocations": invocations,
+            "messages": messages,
+            "redelivered": redelivered,
+            "dead_lettered": len(self.dead_letters),
+            "remaining": len(self._messages),
+            "messages_per_invocation": round(messages / invocations, 1) if invocations else 0.0,
+            "elapsed_s": round(elapsed, 3),
+            "invocation_latency": summarize(latencies),
+        }
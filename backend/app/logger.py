@@ -1,24 +1,158 @@
+import atexit
+import functools
 import logging
 import json
+import queue
 import sys
+import threading
+import time
 from app import config
 
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "logger": record.name,
+        }
+        fields = getattr(record, "fields", None)
+        if isinstance(fields, dict):
+            payload.update(fields)
+        return json.dumps(payload, ensure_ascii=False)
+
+class LazyJson:
+    __slots__ = ("payload",)
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def __str__(self):
+        return json.dumps(self.payload, ensure_ascii=False)
+
+class _Flush:
+    __slots__ = ("done",)
+
+    def __init__(self):
+        self.done = threading.Event()
+
+class _BatchWriter:
+    def __init__(self, stream, max_queue: int, batch_size: int):
+        self._stream = stream
+        self._queue: queue.Queue = queue.Queue(max_queue)
+        self._batch_size = batch_size
+        self._formatter = JsonFormatter()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.records = self.batches = self.dropped = 0
+        self.write_ms = 0.0
+
+    def submit(self, item) -> bool:
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            return False
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            items = [self._queue.get()]
+            while len(items) < self._batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(items)
+
+    def _write(self, items: list) -> None:
+        t0 = time.perf_counter()
+        lines, flushes = [], []
+        for item in items:
+            if isinstance(item, _Flush):
+                flushes.append(item)
+                continue
+            try:
+                lines.append(self._formatter.format(item))
+            except Exception:
+                self.dropped += 1
+        if lines:
+            self._stream.write("\n".join(lines) + "\n")
+            self._stream.flush()
+            self.records += len(lines)
+            self.batches += 1
+        self.write_ms += (time.perf_counter() - t0) * 1000
+        for f in flushes:
+            f.done.set()
+
+    def flush(self, timeout: float) -> bool:
+        if self._thread is None:
+            return True
+        marker = _Flush()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.done.wait(timeout)
+
+    def stats(self) -> dict:
+        return {"log_records": self.records, "log_batches": self.batches,
+                "log_dropped": self.dropped, "log_write_ms": round(self.write_ms, 3),
+                "log_queue_depth": self._queue.qsize()}
+
+class _QueueHandler(logging.Handler):
+    def __init__(self, writer: _BatchWriter):
+        super().__init__()
+        self._writer = writer
+
+    def emit(self, record):
+        # message interpolation and json.dumps happen on the writer thread
+        if not self._writer.submit(record):
+            self._writer.dropped += 1
+
+_writer: _BatchWriter | None = None
+
+def _get_writer() -> _BatchWriter:
+    global _writer
+    if _writer is None:
+        _writer = _BatchWriter(sys.stdout, config.LOG_QUEUE_SIZE, config.LOG_BATCH_SIZE)
+        atexit.register(flush_logs)
+    return _writer
+
 def setup_logger(name: str = "app") -> logging.Logger:
     logger = logging.getLogger(name)
 
     if not logger.handlers:
-        handler = logging.StreamHandler(sys.stdout)
-
-        class JsonFormatter(logging.Formatter):
-            def format(self, record):
-                return json.dumps({
-                    "level": record.levelname,
-                    "message": record.getMessage(),
-                    "logger": record.name,
-                }, ensure_ascii=False)
-
-        handler.setFormatter(JsonFormatter())
+        if config.LOG_ASYNC:
+            handler = _QueueHandler(_get_writer())
+            logger.propagate = False
+        else:
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(JsonFormatter())
         logger.addHandler(handler)
         logger.setLevel(config.LOG_LEVEL)
 
     return logger
+
+def flush_logs(timeout: float | None = None) -> bool:
+    if _writer is None:
+        return True
+    return _writer.flush(config.LOG_FLUSH_TIMEOUT_SECONDS if timeout is None else timeout)
+
+def log_stats() -> dict:
+    return _writer.stats() if _writer is not None else {}
+
+def flush_after(fn):
+    @functools.wraps(fn)
+    def wrapper(event, context):
+        try:
+            return fn(event, context)
+        finally:
+            flush_logs()
+    return wrapper
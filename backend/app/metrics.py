@@ -0,0 +1,112 @@
+import functools
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from app import config
+
+EMF_MAX_VALUES = 100
+
+_local = threading.local()
+_cold_start = True
+
+class Invocation:
+    __slots__ = ("values", "units")
+
+    def __init__(self):
+        self.values: dict[str, list[float]] = {}
+        self.units: dict[str, str] = {}
+
+    def add(self, name: str, value: float, unit: str) -> None:
+        values = self.values.setdefault(name, [])
+        if len(values) < EMF_MAX_VALUES:
+            values.append(value)
+        self.units[name] = unit
+
+def current() -> Invocation | None:
+    return getattr(_local, "invocation", None)
+
+def record(name: str, value: float, unit: str = "Milliseconds") -> None:
+    inv = current()
+    if inv is not None:
+        inv.add(name, value, unit)
+
+def incr(name: str, n: int = 1) -> None:
+    inv = current()
+    if inv is not None:
+        values = inv.values.get(name)
+        if values:
+            values[0] += n
+        else:
+            inv.add(name, n, "Count")
+
+@contextmanager
+def timer(name: str):
+    if current() is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, round((time.perf_counter() - t0) * 1000, 3))
+
+def timed(name: str):
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timer(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+def _outcome(result) -> str:
+    status = result.get("statusCode") if isinstance(result, dict) else None
+    if not isinstance(status, int) or status < 400:
+        return "success"
+    return "client_error" if status < 500 else "server_error"
+
+def emf_document(function_name: str, outcome: str, inv: Invocation, timestamp_ms: int) -> dict:
+    doc = {
+        "_aws": {
+            "Timestamp": timestamp_ms,
+            "CloudWatchMetrics": [{
+                "Namespace": config.METRICS_NAMESPACE,
+                "Dimensions": [["FunctionName", "Outcome"]],
+                "Metrics": [{"Name": name, "Unit": inv.units[name]} for name in inv.values],
+            }],
+        },
+        "FunctionName": function_name,
+        "Outcome": outcome,
+    }
+    for name, values in inv.values.items():
+        doc[name] = values[0] if len(values) == 1 else values
+    return doc
+
+def instrument(function_name: str, stream=None):
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(event, context):
+            global _cold_start
+            if not config.METRICS_ENABLED or current() is not None:
+                # nested handler calls report into the outer invocation
+                return fn(event, context)
+            inv = _local.invocation = Invocation()
+            if _cold_start:
+                _cold_start = False
+                inv.add("ColdStart", 1, "Count")
+            outcome = "error"
+            t0 = time.perf_counter()
+            try:
+                result = fn(event, context)
+                outcome = _outcome(result)
+                return result
+            finally:
+                inv.add("Duration", round((time.perf_counter() - t0) * 1000, 3), "Milliseconds")
+                _local.invocation = None
+                out = stream or sys.stdout
+                out.write(json.dumps(emf_document(function_name, outcome, inv, int(time.time() * 1000))) + "\n")
+                out.flush()
+        return wrapper
+    return deco
@@ -0,0 +1,32 @@
+import base64
+import binascii
+import json
+from app.errors import InvalidToken
+
+def encode_token(state: dict | None) -> str | None:
+    if state is None:
+        return None
+    raw = json.dumps({"v": 1, **state}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_token(token: str | None) -> dict | None:
+    if not token:
+        return None
+    try:
+        state = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (binascii.Error, ValueError) as e:
+        raise InvalidToken("malformed pagination token") from e
+    if not isinstance(state, dict) or state.pop("v", None) != 1:
+        raise InvalidToken("unsupported pagination token")
+    return state
+
+def parse_limit(raw, default: int, maximum: int) -> int:
+    if raw in (None, ""):
+        return default
+    try:
+        limit = int(raw)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if not 1 <= limit <= maximum:
+        raise ValueError(f"limit must be between 1 and {maximum}")
+    return limit
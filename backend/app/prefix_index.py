@@ -0,0 +1,43 @@
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.dynamodb_repo import CustomerDynamoDBRepository
+
+def _backfill_segment(repo: CustomerDynamoDBRepository, segment: int, segments: int) -> tuple[int, int]:
+    scanned = tagged = 0
+    for ids in repo.scan_segment(segment, segments):
+        scanned += len(ids)
+        tagged += sum(repo.tag_prefix_bucket(cid) for cid in ids)
+    return scanned, tagged
+
+def backfill(repo: CustomerDynamoDBRepository | None = None, segments: int = 8, workers: int = 8) -> dict:
+    """Tag every stored id with its prefix index bucket.
+
+    Needed once for ids written before the index existed and again after PREFIX_BUCKETS
+    changes. Safe to run alongside live traffic and to re-run: puts write the same bucket,
+    and an id deleted after the scan saw it is not written back.
+    """
+    repo = repo or CustomerDynamoDBRepository()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda s: _backfill_segment(repo, s, segments), range(segments)))
+    return {"scanned": sum(r[0] for r in results), "tagged": sum(r[1] for r in results),
+            "elapsed_s": round(time.perf_counter() - started, 3)}
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.prefix_index",
+                                     description="Backfill the pfx_bucket attribute behind GET /customers?prefix=")
+    parser.add_argument("--segments", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=None, help="defaults to --segments")
+    parser.add_argument("--table", default=None)
+    args = parser.parse_args(argv)
+
+    print(json.dumps(backfill(CustomerDynamoDBRepository(table_name=args.table, counter_table=None),
+                              args.segments, args.workers or args.segments)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
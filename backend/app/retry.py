@@ -0,0 +1,139 @@
+import random
+import threading
+import time
+from typing import Callable
+
+from app import metrics
+from app.errors import Throttled
+
+THROTTLE_CODES = frozenset({
+    "ProvisionedThroughputExceededException", "ThrottlingException", "RequestLimitExceeded",
+})
+TRANSIENT_CODES = frozenset({"InternalServerError", "ServiceUnavailable"})
+# TransactWriteItems cancellation reasons that are worth another attempt
+_RETRYABLE_REASONS = frozenset({"TransactionConflict", "ThrottlingError", "ProvisionedThroughputExceeded"})
+
+def _retryable_cancellation(ce) -> bool:
+    if ce.response.get("Error", {}).get("Code") != "TransactionCanceledException":
+        return False
+    codes = {r.get("Code") for r in ce.response.get("CancellationReasons", [])}
+    return bool(codes & _RETRYABLE_REASONS) and codes <= _RETRYABLE_REASONS | {"None"}
+
+def backoff(attempt: int, base: float = 0.05, cap: float = 2.0) -> None:
+    time.sleep(random.uniform(0, min(cap, base * (2 ** attempt))))
+
+class TokenBucket:
+    """Client-side rate limiter that only engages once the service starts throttling.
+
+    Unlimited until the first throttle; then the fill rate drops to half the rate measured
+    over the last second, and every success adds `increase` req/s until `max_rate`, where the
+    limit switches off again.
+    """
+
+    def __init__(self, min_rate: float = 5.0, max_rate: float = 1000.0, increase: float = 0.5,
+                 burst: float = 10.0, clock=time.monotonic, sleep=time.sleep):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.rate: float | None = None
+        self._tokens = 0.0
+        self._last = clock()
+        self._window_start = self._last
+        self._window_count = 0
+        self._measured = 0.0
+        self.waits = 0
+
+    def acquire(self) -> float:
+        with self._lock:
+            now = self._clock()
+            if now - self._window_start >= 1.0:
+                self._measured = self._window_count / (now - self._window_start)
+                self._window_start, self._window_count = now, 0
+            self._window_count += 1
+            if self.rate is None:
+                return 0.0
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            self.waits += 1
+            self._sleep(wait)
+        return wait
+
+    def on_throttle(self) -> None:
+        with self._lock:
+            current = self.rate if self.rate is not None else max(self._measured, self._window_count)
+            self.rate = max(self.min_rate, current / 2)
+            self._tokens = min(self._tokens, 0.0)
+            self._last = self._clock()
+
+    def on_success(self) -> None:
+        if self.rate is None:
+            return
+        with self._lock:
+            if self.rate is not None:
+                self.rate += self.increase
+                if self.rate >= self.max_rate:
+                    self.rate = None
+
+class RetryPolicy:
+    """Retries throttles, transient 5xx and connection errors with jittered backoff.
+
+    A read timeout or a dropped connection leaves it unknown whether the write was applied; an
+    error raised by a later attempt carries `after_ambiguous_attempt = True` so conditional
+    writes can tell their own earlier success apart from a real conflict.
+    """
+
+    def __init__(self, limiter: TokenBucket | None = None, max_attempts: int = 6,
+                 base: float = 0.025, cap: float = 1.0, metric_prefix: str = "DynamoDB"):
+        self.limiter = limiter or TokenBucket()
+        self.max_attempts = max_attempts
+        self.base = base
+        self.cap = cap
+        self._retries_metric = metric_prefix + "Retries"
+        self._throttles_metric = metric_prefix + "Throttles"
+        self.retries = self.throttles = 0
+
+    def call(self, fn: Callable, *args, **kwargs):
+        from botocore.exceptions import ClientError, ConnectionError, HTTPClientError
+
+        ambiguous = False
+        for attempt in range(self.max_attempts):
+            last = attempt + 1 == self.max_attempts
+            self.limiter.acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except ClientError as ce:
+                code = ce.response.get("Error", {}).get("Code")
+                if code in THROTTLE_CODES:
+                    self.throttles += 1
+                    metrics.incr(self._throttles_metric)
+                    self.limiter.on_throttle()
+                    if last:
+                        raise Throttled(f"throttled after {self.max_attempts} attempts") from ce
+                elif last or not (code in TRANSIENT_CODES or _retryable_cancellation(ce)):
+                    ce.after_ambiguous_attempt = ambiguous
+                    raise
+            except HTTPClientError:
+                # read timeout / connection dropped after sending: the request may have been applied
+                ambiguous = True
+                if last:
+                    raise
+            except ConnectionError:
+                if last:
+                    raise
+            else:
+                self.limiter.on_success()
+                return result
+            self.retries += 1
+            metrics.incr(self._retries_metric)
+            backoff(attempt, self.base, self.cap)
+
+    def stats(self) -> dict:
+        return {"retries": self.retries, "throttles": self.throttles,
+                "rate_limit": self.limiter.rate, "rate_limit_waits": self.limiter.waits}
@@ -1,10 +1,44 @@
-import re
+import string
+from typing import Any, Iterable
 from app.errors import InvalidCustomerId
 
-_ID_RE = re.compile(r"^[A-Za-z0-9_-]{3,64}$")
+ID_MIN_LEN, ID_MAX_LEN = 3, 64
+_ID_CHARS = (string.ascii_letters + string.digits + "_-").encode()
 
 def is_valid_customer_id(s: str | None) -> bool:
-    return bool(s) and isinstance(s, str) and bool(_ID_RE.match(s))
+    # bytes.strip over the allowed set runs in C and leaves b"" (a shared singleton) iff every
+    # character is allowed; plain alphanumeric ids never get that far.
+    return (s.__class__ is str and ID_MIN_LEN <= len(s) <= ID_MAX_LEN and s.isascii()
+            and (s.isalnum() or not s.encode().strip(_ID_CHARS)))
+
+def is_valid_prefix(s: str | None) -> bool:
+    # any leading part of a valid id, so a single character is enough
+    return (s.__class__ is str and 1 <= len(s) <= ID_MAX_LEN and s.isascii()
+            and not s.encode().strip(_ID_CHARS))
+
+def rejection_reason(s: Any) -> str | None:
+    if s is None or s == "":
+        return "missing"
+    if not isinstance(s, str):
+        return "not_a_string"
+    if len(s) < ID_MIN_LEN:
+        return "too_short"
+    if len(s) > ID_MAX_LEN:
+        return "too_long"
+    if not is_valid_customer_id(s):
+        return "invalid_characters"
+    return None
+
+def validate_many(ids: Iterable[Any]) -> tuple[list[str], list[dict]]:
+    valid: list[str] = []
+    rejected: list[dict] = []
+    is_valid = is_valid_customer_id
+    for i, cid in enumerate(ids):
+        if is_valid(cid):
+            valid.append(cid)
+        else:
+            rejected.append({"index": i, "id": cid, "reason": rejection_reason(cid)})
+    return valid, rejected
 
 def validate_id(cid: str | None) -> str:
     if not is_valid_customer_id(cid):
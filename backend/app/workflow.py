@@ -0,0 +1,201 @@
+import asyncio
+import importlib
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Iterable
+
+from app.stats import summarize
+
+DEFAULT_DEFINITION = Path(__file__).resolve().parents[2] / "infra" / "customer_workflow.asl.json"
+LAMBDA_INVOKE = "arn:aws:states:::lambda:invoke"
+MAX_TRANSITIONS = 100
+
+class WorkflowError(Exception):
+    def __init__(self, error: str, cause: str = ""):
+        super().__init__(f"{error}: {cause}" if cause else error)
+        self.error = error
+        self.cause = cause
+
+def load_definition(path: str | Path = DEFAULT_DEFINITION) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def _get_path(data: Any, path: str) -> Any:
+    if path == "$":
+        return data
+    if not path.startswith("$."):
+        raise WorkflowError("States.Runtime", f"unsupported path {path!r}")
+    cur = data
+    for key in path[2:].split("."):
+        if not isinstance(cur, dict) or key not in cur:
+            raise WorkflowError("States.Runtime", f"path {path!r} not found in input")
+        cur = cur[key]
+    return cur
+
+def _set_path(data: Any, path: str | None, value: Any) -> Any:
+    if path is None:
+        return data
+    if path == "$":
+        return value
+    out = json.loads(json.dumps(data)) if isinstance(data, dict) else {}
+    cur = out
+    keys = path[2:].split(".")
+    for key in keys[:-1]:
+        cur = cur.setdefault(key, {})
+    cur[keys[-1]] = value
+    return out
+
+def _resolve(template: Any, data: Any) -> Any:
+    if isinstance(template, dict):
+        out = {}
+        for key, value in template.items():
+            if key.endswith(".$"):
+                out[key[:-2]] = _get_path(data, value)
+            else:
+                out[key] = _resolve(value, data)
+        return out
+    if isinstance(template, list):
+        return [_resolve(v, data) for v in template]
+    return template
+
+def _function_name(name_or_arn: str) -> str:
+    if ":function:" in name_or_arn:
+        return name_or_arn.split(":function:", 1)[1].split(":", 1)[0]
+    return name_or_arn
+
+def local_lambda(name: str) -> Callable:
+    return importlib.import_module(f"lambdas.{name}.handler").handler
+
+_COMPARATORS = {
+    "BooleanEquals": lambda a, b: isinstance(a, bool) and a == b,
+    "StringEquals": lambda a, b: isinstance(a, str) and a == b,
+    "NumericEquals": lambda a, b: isinstance(a, (int, float)) and not isinstance(a, bool) and a == b,
+}
+
+def _matches(rule: dict, data: Any) -> bool:
+    if "And" in rule:
+        return all(_matches(r, data) for r in rule["And"])
+    if "Or" in rule:
+        return any(_matches(r, data) for r in rule["Or"])
+    if "Not" in rule:
+        return not _matches(rule["Not"], data)
+    try:
+        value = _get_path(data, rule["Variable"])
+    except WorkflowError:
+        return rule.get("IsPresent") is False
+    if "IsPresent" in rule:
+        return rule["IsPresent"] is True
+    for op, compare in _COMPARATORS.items():
+        if op in rule:
+            return compare(value, rule[op])
+    raise WorkflowError("States.Runtime", f"unsupported choice rule {rule!r}")
+
+class LocalWorkflow:
+    def __init__(self, definition: dict | None = None, resolver: Callable[[str], Callable] = local_lambda):
+        self.definition = definition or load_definition()
+        self._resolver = resolver
+        self._handlers: dict[str, Callable] = {}
+
+    def _handler(self, name: str) -> Callable:
+        fn = self._handlers.get(name)
+        if fn is None:
+            fn = self._handlers[name] = self._resolver(name)
+        return fn
+
+    def _run_task(self, state: dict, data: Any) -> Any:
+        if state.get("Resource") != LAMBDA_INVOKE:
+            raise WorkflowError("States.Runtime", f"unsupported resource {state.get('Resource')!r}")
+        params = _resolve(state.get("Parameters") or {}, data)
+        name = _function_name(params["FunctionName"])
+        # Lambda payloads cross a JSON boundary in Step Functions; keep that here too.
+        payload = json.loads(json.dumps(params.get("Payload", data)))
+        context = SimpleNamespace(aws_request_id=str(uuid.uuid4()), function_name=name)
+        try:
+            out = self._handler(name)(payload, context)
+        except Exception as e:
+            raise WorkflowError(type(e).__name__, str(e)) from e
+        return {"Payload": json.loads(json.dumps(out)), "StatusCode": 200}
+
+    def execute(self, execution_input: dict) -> dict:
+        states = self.definition["States"]
+        name = self.definition["StartAt"]
+        data: Any = execution_input
+        timings: list[tuple[str, float]] = []
+        started = time.perf_counter()
+
+        def finish(status: str, **extra) -> dict:
+            return {"status": status, "output": data, "timings": timings,
+                    "duration_ms": (time.perf_counter() - started) * 1000, **extra}
+
+        for _ in range(MAX_TRANSITIONS):
+            state = states[name]
+            kind = state["Type"]
+            t0 = time.perf_counter()
+            try:
+                nxt = None
+                if kind == "Task":
+                    result = self._run_task(state, data)
+                    if "ResultSelector" in state:
+                        result = _resolve(state["ResultSelector"], result)
+                    data = _set_path(data, state.get("ResultPath", "$"), result)
+                    nxt = state.get("Next")
+                elif kind == "Pass":
+                    data = _set_path(data, state.get("ResultPath", "$"), state.get("Result", data))
+                    nxt = state.get("Next")
+                elif kind == "Choice":
+                    nxt = next((r["Next"] for r in state["Choices"] if _matches(r, data)), state.get("Default"))
+                    if nxt is None:
+                        raise WorkflowError("States.NoChoiceMatched")
+                elif kind == "Succeed":
+                    pass
+                elif kind == "Fail":
+                    timings.append((name, (time.perf_counter() - t0) * 1000))
+                    return finish("FAILED", error=state.get("Error"), cause=state.get("Cause"))
+                else:
+                    raise WorkflowError("States.Runtime", f"unsupported state type {kind!r}")
+                if "OutputPath" in state and kind != "Choice":
+                    data = _get_path(data, state["OutputPath"])
+            except WorkflowError as e:
+                timings.append((name, (time.perf_counter() - t0) * 1000))
+                return finish("FAILED", error=e.error, cause=e.cause, state=name)
+            timings.append((name, (time.perf_counter() - t0) * 1000))
+            if nxt is None or state.get("End"):
+                return finish("SUCCEEDED")
+            name = nxt
+        return finish("FAILED", error="States.Runtime", cause="too many transitions")
+
+    async def run_many(self, inputs: Iterable[dict], concurrency: int = 8) -> dict:
+        loop = asyncio.get_running_loop()
+        sem = asyncio.Semaphore(concurrency)
+        executions: list[dict] = []
+
+        async def one(execution_input: dict) -> None:
+            async with sem:
+                executions.append(await loop.run_in_executor(pool, self.execute, execution_input))
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            await asyncio.gather(*(one(i) for i in inputs))
+        return report(executions, time.perf_counter() - started, concurrency)
+
+def report(executions: list[dict], elapsed_s: float, concurrency: int) -> dict:
+    per_state: dict[str, list[float]] = {}
+    for ex in executions:
+        for state, ms in ex["timings"]:
+            per_state.setdefault(state, []).append(ms)
+    statuses: dict[str, int] = {}
+    for ex in executions:
+        statuses[ex["status"]] = statuses.get(ex["status"], 0) + 1
+    return {
+        "executions": len(executions),
+        "statuses": statuses,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed_s, 3),
+        "executions_per_s": round(len(executions) / elapsed_s, 1) if elapsed_s else 0.0,
+        "execution_latency": summarize([ex["duration_ms"] for ex in executions]),
+        "states": {state: summarize(ms) for state, ms in per_state.items()},
+    }
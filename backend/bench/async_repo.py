@@ -0,0 +1,64 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from app.async_repo import ThreadedAsyncRepository
+from app.dynamodb_repo import CustomerDynamoDBRepository
+
+def _sequential(repo: CustomerDynamoDBRepository, ids: list[str]) -> dict:
+    t0 = time.perf_counter()
+    for cid in ids:
+        repo.exists(cid)
+    elapsed = time.perf_counter() - t0
+    return {"requests": len(ids), "requests_per_s": round(len(ids) / elapsed, 1)}
+
+async def _concurrent(repo: CustomerDynamoDBRepository, ids: list[str], concurrency: int) -> dict:
+    async with ThreadedAsyncRepository(repo, max_in_flight=concurrency) as arepo:
+        await asyncio.gather(*(arepo.exists(cid) for cid in ids))
+        return arepo.stats()
+
+def run(n: int, concurrency_levels: list[int], latency_ms: float) -> dict:
+    import boto3
+    from moto import mock_aws
+    from app import aws
+    from bench.tables import create_tables
+
+    for key, value in {"AWS_ACCESS_KEY_ID": "testing", "AWS_SECRET_ACCESS_KEY": "testing",
+                       "AWS_DEFAULT_REGION": "eu-central-1"}.items():
+        os.environ.setdefault(key, value)
+
+    with mock_aws():
+        aws.reset()
+        create_tables(boto3.client("dynamodb", region_name="eu-central-1"))
+        repo = CustomerDynamoDBRepository()
+        if latency_ms:
+            # moto answers in-process; add a fixed delay to stand in for the network round trip
+            exists = repo.exists
+            def delayed(cid, consistent=True):
+                time.sleep(latency_ms / 1000)
+                return exists(cid, consistent)
+            repo.exists = delayed
+        ids = [f"as_{i:07d}" for i in range(n)]
+        result = {"sequential": _sequential(repo, ids)}
+        for c in concurrency_levels:
+            result[f"async/{c}"] = asyncio.run(_concurrent(repo, ids, c))
+        aws.reset()
+    return result
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.async_repo",
+                                     description="exists() throughput: sequential vs ThreadedAsyncRepository")
+    parser.add_argument("-n", type=int, default=500)
+    parser.add_argument("-c", "--concurrency", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="simulated network latency per call")
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.n, args.concurrency, args.latency_ms), indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+SAMPLE_EVENT = {
+    "id": "AB_123",
+    "detail": {"id": "AB_123"},
+    "httpMethod": "GET",
+    "resource": "/customers/{id}",
+    "pathParameters": {"id": "AB_123"},
+    "headers": {},
+    "queryStringParameters": None,
+    "body": json.dumps({"ids": ["AB_123"]}),
+    "isBase64Encoded": False,
+}
+
+# Runs in a fresh interpreter: import time is measured before anything else is loaded.
+# moto needs boto3, so the deferred boto3 import is timed on its own and reported separately.
+_PROBE = r"""
+import importlib, json, sys, time
+name, event = sys.argv[1], json.loads(sys.argv[2])
+
+t0 = time.perf_counter()
+mod = importlib.import_module(f"lambdas.{name}.handler")
+import_ms = (time.perf_counter() - t0) * 1000
+boto3_at_import = "boto3" in sys.modules
+
+t0 = time.perf_counter()
+import boto3
+boto3_import_ms = (time.perf_counter() - t0) * 1000
+
+import moto
+mock = moto.mock_aws()
+mock.start()
+from bench.tables import create_tables
+create_tables(boto3.client("dynamodb"))
+
+error = None
+t0 = time.perf_counter()
+try:
+    mod.handler(event, None)
+except Exception as e:
+    error = repr(e)
+first_invocation_ms = (time.perf_counter() - t0) * 1000
+mock.stop()
+
+print(json.dumps({
+    "handler": name,
+    "import_ms": round(import_ms, 3),
+    "boto3_at_import": boto3_at_import,
+    "boto3_import_ms": round(boto3_import_ms, 3),
+    "first_invocation_ms": round(first_invocation_ms, 3),
+    "cold_start_ms": round(import_ms + first_invocation_ms, 3),
+    "error": error,
+}))
+"""
+
+def handler_names() -> list[str]:
+    return sorted(p.parent.name for p in (BACKEND_DIR / "lambdas").glob("*/handler.py"))
+
+def measure(name: str, event: dict | None = None) -> dict:
+    env = {
+        **os.environ,
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+        "AWS_DEFAULT_REGION": "eu-central-1",
+        "AWS_REGION": "eu-central-1",
+        "LOG_LEVEL": "ERROR",
+        "PYTHONDONTWRITEBYTECODE": "1",
+    }
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE, name, json.dumps(event or SAMPLE_EVENT)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.cold_start",
+                                     description="Import + first-invocation time per handler")
+    parser.add_argument("handlers", nargs="*", help="default: every lambdas/*/handler.py")
+    parser.add_argument("--out", help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = [measure(name) for name in (args.handlers or handler_names())]
+    for r in results:
+        print(json.dumps(r))
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
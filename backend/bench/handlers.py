@@ -0,0 +1,313 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("METRICS_ENABLED", "false")
+
+from app.errors import AlreadyExists, NotFound
+from app.stats import summarize
+
+BACKENDS = ("fake", "moto")
+CONTEXT = SimpleNamespace(aws_request_id="bench", function_name="bench")
+
+def _api(method: str, resource: str, cid: str | None = None, body=None, query=None) -> dict:
+    return {"httpMethod": method, "resource": resource, "path": resource.replace("{id}", cid or ""),
+            "headers": {"Content-Type": "application/json", "User-Agent": "bench"},
+            "pathParameters": {"id": cid} if cid else None, "queryStringParameters": query,
+            "body": json.dumps(body) if body is not None else None, "isBase64Encoded": False}
+
+def _seeded(i: int) -> str:
+    return f"seed_{i:07d}"
+
+# handler -> event for the i-th call. Reads and deletes use seeded ids; writes use fresh ones.
+CASES = {
+    "get_customer_id": lambda i, run: _api("GET", "/customers/{id}", _seeded(i)),
+    "put_customer_id": lambda i, run: _api("PUT", "/customers/{id}", f"new_{run}_{i:07d}"),
+    "delete_customer_id": lambda i, run: _api("DELETE", "/customers/{id}", _seeded(i)),
+    "exists_customer_ids": lambda i, run: _api("POST", "/customers/exists",
+                                               body={"ids": [_seeded(i + k) for k in range(20)]}),
+    "list_customer_ids": lambda i, run: _api("GET", "/customers", query={"limit": "50"}),
+    "count_customer_ids": lambda i, run: _api("GET", "/customers/count"),
+    "submit_customer_id": lambda i, run: {"httpMethod": "POST", "headers": {"Content-Type": "application/json"},
+                                          "body": json.dumps({"id": f"sub_{run}_{i:07d}"})},
+    "validate_exists": lambda i, run: {"id": _seeded(i)},
+    "insert_id": lambda i, run: {"id": f"ins_{run}_{i:07d}"},
+    "insert_if_absent": lambda i, run: {"detail": {"id": f"iia_{run}_{i:07d}"}},
+    "log_event": lambda i, run: {"id": _seeded(i), "validation": {"exists": False}, "insert": {"inserted": True}},
+    "ingest_customer_ids": lambda i, run: {"Records": [
+        {"messageId": f"m{k}", "body": json.dumps({"detail": {"id": f"sqs_{run}_{i:07d}_{k}"}})} for k in range(10)]},
+    "api": lambda i, run: _api("GET", "/customers/{id}", _seeded(i)),
+}
+
+class FakeRepository:
+    """In-memory stand-in with the repository's semantics, to time the handler code alone."""
+
+    def __init__(self):
+        self._ids: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def put(self, cid, attrs=None):
+        with self._lock:
+            if cid in self._ids:
+                raise AlreadyExists("id already exists")
+            self._ids[cid] = {"id": cid, **(attrs or {})}
+
+    def put_many_if_absent(self, ids, attrs=None):
+        with self._lock:
+            out = {}
+            for cid in dict.fromkeys(ids):
+                out[cid] = "exists" if cid in self._ids else "created"
+                self._ids.setdefault(cid, {"id": cid, **(attrs or {})})
+            return out
+
+    def exists(self, cid, consistent=True):
+        return cid in self._ids
+
+    def exists_many(self, ids):
+        return {cid: cid in self._ids for cid in dict.fromkeys(ids)}
+
+    def delete(self, cid):
+        with self._lock:
+            try:
+                return self._ids.pop(cid)
+            except KeyError:
+                raise NotFound("id not found") from None
+
+    def batch_put(self, ids, attrs=None):
+        with self._lock:
+            for cid in ids:
+                self._ids[cid] = {"id": cid, **(attrs or {})}
+
+    def list_page(self, limit, start_id=None):
+        ids = sorted(self._ids)
+        pos = ids.index(start_id) + 1 if start_id in self._ids else 0
+        page = ids[pos:pos + limit]
+        return page, (page[-1] if pos + limit < len(ids) else None)
+
+class FakeCounter:
+    def __init__(self, repo: FakeRepository):
+        self._repo = repo
+
+    def read(self):
+        return len(self._repo._ids)
+
+class FakeEvents:
+    def put_events(self, Entries):
+        return {"FailedEntryCount": 0, "Entries": [{"EventId": f"evt-{i}"} for i in range(len(Entries))]}
+
+def _modules() -> dict:
+    import importlib
+    return {name: importlib.import_module(f"lambdas.{name}.handler") for name in CASES}
+
+def _clear_caches(modules: dict) -> None:
+    from app.cache import exists_cache
+    exists_cache.clear()
+    modules["count_customer_ids"]._cache.clear()
+
+@contextmanager
+def wired(backend: str, seed: int):
+    """Point every handler module at one backend for the duration of the block."""
+    modules = _modules()
+    api_routes = list(modules["api"].ROUTES.values())
+    saved = [(m, attr, getattr(m, attr)) for m in list(modules.values()) + api_routes
+             for attr in ("repo", "counter", "events") if hasattr(m, attr)]
+    mock = None
+    from app.cache import cached_repository
+    try:
+        if backend == "fake":
+            repo = FakeRepository()
+            counter, events = FakeCounter(repo), FakeEvents()
+        else:
+            import boto3
+            from moto import mock_aws
+            from app import aws
+            from app.aws import LazyClient
+            from app.counter import CustomerCounter
+            from app.dynamodb_repo import CustomerDynamoDBRepository
+            from bench.tables import create_tables
+            for key, value in {"AWS_ACCESS_KEY_ID": "testing", "AWS_SECRET_ACCESS_KEY": "testing",
+                               "AWS_DEFAULT_REGION": "eu-central-1"}.items():
+                os.environ.setdefault(key, value)
+            mock = mock_aws()
+            mock.start()
+            aws.reset()
+            create_tables(boto3.client("dynamodb", region_name="eu-central-1"))
+            repo = CustomerDynamoDBRepository()
+            counter, events = CustomerCounter(), LazyClient("events")
+        for m, attr, current in saved:
+            if attr == "repo":
+                # handlers that wrapped their repository in the existence cache keep the wrapper
+                new = cached_repository(repo) if hasattr(current, "_cache") else repo
+            else:
+                new = counter if attr == "counter" else events
+            setattr(m, attr, new)
+        for start in range(0, seed, 25):
+            repo.batch_put([_seeded(i) for i in range(start, min(seed, start + 25))])
+        _clear_caches(modules)
+        yield modules
+    finally:
+        for m, attr, value in saved:
+            setattr(m, attr, value)
+        if mock is not None:
+            from app import aws
+            aws.reset()
+            mock.stop()
+
+def _failed(result) -> bool:
+    return isinstance(result, dict) and (result.get("statusCode", 200) >= 500 or bool(result.get("batchItemFailures")))
+
+def _latency(fn, make_event, n: int, warmup: int) -> dict:
+    for i in range(warmup):
+        fn(make_event(i), CONTEXT)
+    latencies, errors = [], 0
+    for i in range(warmup, warmup + n):
+        event = make_event(i)
+        t0 = time.perf_counter()
+        try:
+            errors += _failed(fn(event, CONTEXT))
+        except Exception:
+            errors += 1
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return {"latency": summarize(latencies), "errors": errors}
+
+def _allocations(fn, make_event, n: int, offset: int) -> dict:
+    events = [make_event(offset + i) for i in range(n)]
+    peaks = []
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        for event in events:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            try:
+                fn(event, CONTEXT)
+            except Exception:
+                pass
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        end, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    peaks.sort()
+    return {"alloc_peak_kib_p50": round(peaks[len(peaks) // 2] / 1024, 2),
+            "alloc_peak_kib_max": round(peaks[-1] / 1024, 2),
+            "retained_bytes_per_call": round((end - start) / n, 1)}
+
+def _throughput(fn, make_event, n: int, threads: int, offset: int) -> dict:
+    events = [make_event(offset + i) for i in range(n)]
+    errors = 0
+    lock = threading.Lock()
+
+    def call(event):
+        nonlocal errors
+        try:
+            failed = _failed(fn(event, CONTEXT))
+        except Exception:
+            failed = True
+        if failed:
+            with lock:
+                errors += 1
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(call, events))
+    elapsed = time.perf_counter() - t0
+    return {"threads": threads, "invocations_per_s": round(n / elapsed, 1), "throughput_errors": errors}
+
+def run(backends=BACKENDS, handlers=None, n: int = 500, warmup: int = 20, alloc_n: int = 100,
+        threads: int = 8) -> dict:
+    results: dict = {}
+    for backend in backends:
+        results[backend] = {}
+        for name in handlers or CASES:
+            case = CASES[name]
+            # each phase gets its own id range, so deletes and inserts never collide
+            seed = warmup + n + alloc_n + n + 20
+            with wired(backend, seed) as modules:
+                fn = modules[name].handler
+                row = _latency(fn, lambda i: case(i, "lat"), n, warmup)
+                row.update(_allocations(fn, lambda i: case(i, "mem"), alloc_n, warmup + n))
+                # moto's in-memory backend is not thread-safe (concurrent transactions corrupt
+                # its dicts), so the moto throughput phase runs single-threaded
+                row.update(_throughput(fn, lambda i: case(i, "thr"), n, threads if backend == "fake" else 1,
+                                       warmup + n + alloc_n))
+            results[backend][name] = row
+    return {"meta": _meta(n, warmup, alloc_n, threads), "results": results}
+
+def _meta(n: int, warmup: int, alloc_n: int, threads: int) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {"commit": commit, "python": platform.python_version(), "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "n": n, "warmup": warmup, "alloc_n": alloc_n, "threads": threads}
+
+# metric -> True when higher is better
+COMPARED = {"p50_ms": False, "p99_ms": False, "alloc_peak_kib_p50": False, "invocations_per_s": True}
+
+def compare(base: dict, new: dict, threshold: float = 0.15) -> list[dict]:
+    regressions = []
+    for backend, handlers in new["results"].items():
+        for name, row in handlers.items():
+            old = base["results"].get(backend, {}).get(name)
+            if old is None:
+                continue
+            for metric, higher_is_better in COMPARED.items():
+                a = old["latency"].get(metric) if metric.endswith("_ms") else old.get(metric)
+                b = row["latency"].get(metric) if metric.endswith("_ms") else row.get(metric)
+                if not a or b is None:
+                    continue
+                change = (b - a) / a
+                if (-change if higher_is_better else change) > threshold:
+                    regressions.append({"backend": backend, "handler": name, "metric": metric,
+                                        "base": a, "new": b, "change": round(change, 3)})
+    return regressions
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.handlers",
+                                     description="Latency, allocations and throughput per handler")
+    sub = parser.add_subparsers(dest="command", required=True)
+    r = sub.add_parser("run")
+    r.add_argument("--backend", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    r.add_argument("--handlers", nargs="+", choices=list(CASES))
+    r.add_argument("-n", type=int, default=500, help="invocations for the latency and throughput phases")
+    r.add_argument("--alloc-n", type=int, default=100)
+    r.add_argument("--threads", type=int, default=8)
+    r.add_argument("--out", help="write results as JSON to this file")
+    c = sub.add_parser("compare")
+    c.add_argument("base")
+    c.add_argument("new")
+    c.add_argument("--threshold", type=float, default=0.15, help="relative change that counts as a regression")
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.new, encoding="utf-8") as f:
+            new = json.load(f)
+        regressions = compare(base, new, args.threshold)
+        print(json.dumps({"base": base["meta"].get("commit"), "new": new["meta"].get("commit"),
+                          "regressions": regressions}, indent=2))
+        return 1 if regressions else 0
+
+    result = run(args.backend, args.handlers, args.n, alloc_n=args.alloc_n, threads=args.threads)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    print(json.dumps(result, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
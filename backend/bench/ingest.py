@@ -0,0 +1,84 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("METRICS_ENABLED", "false")
+
+from app.local_queue import LocalQueue
+from app.workflow import DEFAULT_DEFINITION, LocalWorkflow, load_definition, local_lambda
+from bench.workflow import submission_events
+
+def _workflow(events: list[dict], definition_path: str) -> dict:
+    invocations = 0
+
+    def counting(name: str):
+        fn = local_lambda(name)
+
+        def invoke(event, context):
+            nonlocal invocations
+            invocations += 1
+            return fn(event, context)
+        return invoke
+
+    wf = LocalWorkflow(load_definition(definition_path), counting)
+    t0 = time.perf_counter()
+    statuses: dict[str, int] = {}
+    for event in events:
+        status = wf.execute(event)["status"]
+        statuses[status] = statuses.get(status, 0) + 1
+    elapsed = time.perf_counter() - t0
+    return {"ids": len(events), "lambda_invocations": invocations, "statuses": statuses,
+            "invocations_per_id": round(invocations / len(events), 3),
+            "elapsed_s": round(elapsed, 3), "ids_per_s": round(len(events) / elapsed, 1)}
+
+def _queue(events: list[dict], batch_size: int) -> dict:
+    from lambdas.ingest_customer_ids import handler as ingest
+
+    queue = LocalQueue()
+    for event in events:
+        queue.send(event)
+    report = queue.drain(ingest.handler, batch_size)
+    return {"ids": len(events), "lambda_invocations": report["invocations"],
+            "invocations_per_id": round(report["invocations"] / len(events), 3),
+            "redelivered": report["redelivered"], "dead_lettered": report["dead_lettered"],
+            "elapsed_s": report["elapsed_s"], "ids_per_s": round(len(events) / report["elapsed_s"], 1),
+            "invocation_latency": report["invocation_latency"]}
+
+def run(n: int, batch_size: int, definition_path: str, duplicate_ratio: float) -> dict:
+    import boto3
+    from moto import mock_aws
+    from app import aws
+    from bench.tables import create_tables
+
+    for key, value in {"AWS_ACCESS_KEY_ID": "testing", "AWS_SECRET_ACCESS_KEY": "testing",
+                       "AWS_DEFAULT_REGION": "eu-central-1"}.items():
+        os.environ.setdefault(key, value)
+
+    events = submission_events(n, duplicate_ratio)
+    result = {}
+    for name, fn in (("workflow", lambda: _workflow(events, definition_path)),
+                     ("queue", lambda: _queue(events, batch_size))):
+        with mock_aws():
+            aws.reset()
+            create_tables(boto3.client("dynamodb", region_name="eu-central-1"))
+            result[name] = fn()
+            aws.reset()
+    return result
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.ingest",
+                                     description="Burst ingestion: one workflow per id vs SQS batch consumer")
+    parser.add_argument("-n", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--definition", default=str(DEFAULT_DEFINITION))
+    parser.add_argument("--duplicate-ratio", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    print(json.dumps(run(args.n, args.batch_size, args.definition, args.duplicate_ratio), indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
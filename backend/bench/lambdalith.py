@@ -0,0 +1,82 @@
+import argparse
+import json
+import random
+import sys
+
+from app.stats import summarize
+from bench import cold_start
+
+ROUTE_MIX = {"get_customer_id": 0.7, "put_customer_id": 0.2, "delete_customer_id": 0.1}
+
+def spiky_trace(duration_s: float, base_rps: float, burst_rps: float, burst_every_s: float,
+                burst_len_s: float, seed: int = 7) -> list[tuple[float, str]]:
+    rnd = random.Random(seed)
+    routes, weights = zip(*ROUTE_MIX.items())
+    trace, t = [], 0.0
+    while t < duration_s:
+        in_burst = (t % burst_every_s) < burst_len_s
+        t += rnd.expovariate(burst_rps if in_burst else base_rps)
+        trace.append((t, rnd.choices(routes, weights)[0]))
+    return trace
+
+def simulate(trace: list[tuple[float, str]], cold_ms: dict[str, float], warm_ms: float,
+             idle_timeout_s: float, single: bool) -> dict:
+    # containers per function: list of [busy_until, last_used]
+    pools: dict[str, list[list[float]]] = {}
+    latencies, cold = [], 0
+    for t, route in trace:
+        fn = "api" if single else route
+        pool = pools.setdefault(fn, [])
+        pool[:] = [c for c in pool if t - c[1] < idle_timeout_s or c[0] > t]
+        idle = [c for c in pool if c[0] <= t]
+        if idle:
+            container = max(idle, key=lambda c: c[1])
+            latency = warm_ms
+        else:
+            container = [0.0, 0.0]
+            pool.append(container)
+            latency = cold_ms[fn] + warm_ms
+            cold += 1
+        container[0] = t + latency / 1000
+        container[1] = container[0]
+        latencies.append(latency)
+    return {
+        "layout": "single" if single else "per-function",
+        "requests": len(trace),
+        "cold_starts": cold,
+        "cold_start_ratio": round(cold / len(trace), 5) if trace else 0.0,
+        "latency": summarize(latencies),
+    }
+
+def measured_cold_ms() -> dict[str, float]:
+    names = list(ROUTE_MIX) + ["api"]
+    return {name: cold_start.measure(name)["cold_start_ms"] for name in names}
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.lambdalith",
+                                     description="Cold starts: per-function vs single dispatcher")
+    parser.add_argument("--duration", type=float, default=3600)
+    parser.add_argument("--base-rps", type=float, default=0.2)
+    parser.add_argument("--burst-rps", type=float, default=20)
+    parser.add_argument("--burst-every", type=float, default=900)
+    parser.add_argument("--burst-len", type=float, default=30)
+    parser.add_argument("--idle-timeout", type=float, default=600)
+    parser.add_argument("--warm-ms", type=float, default=15)
+    parser.add_argument("--cold-ms", type=float, help="fixed cold start cost instead of measuring handlers")
+    args = parser.parse_args(argv)
+
+    if args.cold_ms is not None:
+        cold_ms = {name: args.cold_ms for name in list(ROUTE_MIX) + ["api"]}
+    else:
+        cold_ms = measured_cold_ms()
+    trace = spiky_trace(args.duration, args.base_rps, args.burst_rps, args.burst_every, args.burst_len)
+    result = {
+        "cold_start_ms": cold_ms,
+        "per_function": simulate(trace, cold_ms, args.warm_ms, args.idle_timeout, single=False),
+        "single": simulate(trace, cold_ms, args.warm_ms, args.idle_timeout, single=True),
+    }
+    print(json.dumps(result, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
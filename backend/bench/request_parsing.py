@@ -0,0 +1,122 @@
+import argparse
+import base64
+import json
+import sys
+import timeit
+
+from app.http import id_extractor, parse_body
+
+# Header set of a typical API Gateway REST proxy event.
+_HEADERS = {
+    "Accept": "application/json", "Accept-Encoding": "gzip, deflate, br", "Content-Type": "application/json",
+    "CloudFront-Forwarded-Proto": "https", "CloudFront-Is-Desktop-Viewer": "true",
+    "CloudFront-Viewer-Country": "IL", "Host": "nve5ktqo18.execute-api.eu-central-1.amazonaws.com",
+    "User-Agent": "python-requests/2.32", "Via": "2.0 abc.cloudfront.net (CloudFront)",
+    "X-Amz-Cf-Id": "x" * 56, "X-Amzn-Trace-Id": "Root=1-6500-abc", "x-api-key": "k" * 40,
+    "X-Forwarded-For": "1.2.3.4, 5.6.7.8", "X-Forwarded-Port": "443", "X-Forwarded-Proto": "https",
+}
+
+def _event(**overrides):
+    event = {"resource": "/customers/{id}", "httpMethod": "GET", "headers": dict(_HEADERS),
+             "queryStringParameters": None, "pathParameters": None, "body": None,
+             "isBase64Encoded": False, "requestContext": {"stage": "prod"}}
+    event.update(overrides)
+    return event
+
+EVENTS = {
+    "path": _event(pathParameters={"id": "AB_123"}),
+    "header": _event(headers={**_HEADERS, "ID": "AB_123"}),
+    "query": _event(queryStringParameters={"id": "AB_123"}),
+    "body": _event(httpMethod="POST", body=json.dumps({"id": "AB_123"})),
+    "base64": _event(httpMethod="POST", isBase64Encoded=True,
+                     body=base64.b64encode(json.dumps({"id": "AB_123"}).encode()).decode()),
+}
+
+# Per-handler extraction as it was before app.http.Request, kept here as the baseline.
+def _legacy_get(event):
+    p = (event.get("pathParameters") or {}).get("id")
+    if p: return p
+    h = event.get("headers") or {}
+    p = h.get("id") or h.get("Id") or h.get("ID")
+    if p: return p
+    q = event.get("queryStringParameters") or {}
+    return q.get("id")
+
+def _legacy_delete(event):
+    p = (event.get("pathParameters") or {}).get("id")
+    if p: return p
+    h = event.get("headers") or {}
+    return h.get("id") or h.get("Id") or h.get("ID")
+
+def _legacy_parse_body(event):
+    # the old app.http.parse_body; the old submit handler parsed the body once with a plain
+    # json.loads and skipped base64, this is the same single parse with base64 support
+    raw = event.get("body") or "{}"
+    if event.get("isBase64Encoded"):
+        try:
+            raw = base64.b64decode(raw).decode("utf-8", errors="ignore")
+        except Exception:
+            return {}
+    try:
+        return json.loads(raw)
+    except Exception:
+        return {}
+
+def _legacy_submit(event):
+    body = _legacy_parse_body(event)
+    if isinstance(body, dict) and "ids" in body:
+        return None
+    if isinstance(body, dict) and "id" in body:
+        return body["id"]
+    p = (event.get("pathParameters") or {}).get("id")
+    if p:
+        return p
+    h = event.get("headers") or {}
+    return h.get("id") or h.get("Id") or h.get("ID")
+
+_get = id_extractor("path", "header", "query")
+_delete = id_extractor("path", "header")
+
+def _unified_submit(event):
+    # what the submit handler does: one body parse, the "ids" check, then path / header
+    body = parse_body(event)
+    cid = None
+    if body.__class__ is dict:
+        if "ids" in body:
+            return None
+        cid = body.get("id")
+    return cid or _delete(event)
+
+CASES = {
+    "get": (_legacy_get, _get, ("path", "header", "query")),
+    "put_delete": (_legacy_delete, _delete, ("path", "header")),
+    "submit": (_legacy_submit, _unified_submit, ("path", "header", "body", "base64")),
+}
+
+def run(number: int = 200_000, rounds: int = 20) -> dict:
+    results = {}
+    for case, (legacy, unified, event_names) in CASES.items():
+        for name in event_names:
+            event = EVENTS[name]
+            assert legacy(event) == unified(event) == "AB_123"
+            # alternate short rounds so load on a shared machine hits both sides alike
+            legacy_s = unified_s = float("inf")
+            for _ in range(rounds):
+                legacy_s = min(legacy_s, timeit.timeit(lambda: legacy(event), number=number // rounds))
+                unified_s = min(unified_s, timeit.timeit(lambda: unified(event), number=number // rounds))
+            legacy_ns = legacy_s / (number // rounds) * 1e9
+            unified_ns = unified_s / (number // rounds) * 1e9
+            results[f"{case}/{name}"] = {"legacy_ns": round(legacy_ns, 1), "unified_ns": round(unified_ns, 1),
+                                         "speedup": round(legacy_ns / unified_ns, 2)}
+    return results
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.request_parsing")
+    parser.add_argument("-n", "--number", type=int, default=200_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.number, args.rounds), indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,28 @@
+# Tables the handlers expect, for benchmarks that run against moto.
+TABLES = {
+    "customer_ids": "id",
+    "customer_ids_meta": "pk",
+    "customer_ids_idempotency": "key",
+}
+
+# customer_ids also carries the prefix index (app.dynamodb_repo.search_prefix)
+PREFIX_INDEX = {
+    "IndexName": "pfx_bucket-id",
+    "KeySchema": [{"AttributeName": "pfx_bucket", "KeyType": "HASH"}, {"AttributeName": "id", "KeyType": "RANGE"}],
+    "Projection": {"ProjectionType": "KEYS_ONLY"},
+}
+
+def create_tables(client) -> None:
+    for name, key in TABLES.items():
+        extra = {}
+        if name == "customer_ids":
+            extra = {"GlobalSecondaryIndexes": [PREFIX_INDEX],
+                     "AttributeDefinitions": [{"AttributeName": key, "AttributeType": "S"},
+                                              {"AttributeName": "pfx_bucket", "AttributeType": "N"}]}
+        client.create_table(**{
+            "TableName": name,
+            "KeySchema": [{"AttributeName": key, "KeyType": "HASH"}],
+            "AttributeDefinitions": [{"AttributeName": key, "AttributeType": "S"}],
+            "BillingMode": "PAY_PER_REQUEST",
+            **extra,
+        })
@@ -0,0 +1,72 @@
+import argparse
+import json
+import random
+import re
+import string
+import sys
+import timeit
+
+from app.errors import InvalidCustomerId
+from app.validation import is_valid_customer_id, validate_many
+
+# The regex validator as it was before the bytes-table check, kept here as the baseline.
+_ID_RE = re.compile(r"^[A-Za-z0-9_-]{3,64}$")
+
+def _regex_valid(s):
+    return bool(s) and isinstance(s, str) and bool(_ID_RE.match(s))
+
+def _regex_validate_id(cid):
+    if not _regex_valid(cid):
+        raise InvalidCustomerId(f"Invalid or missing 'id': {cid}")
+    return cid
+
+def _regex_many(ids):
+    # what batch callers did before validate_many: validate_id per item, catch the error
+    valid, rejected = [], []
+    for i, cid in enumerate(ids):
+        try:
+            valid.append(_regex_validate_id(cid))
+        except InvalidCustomerId as e:
+            rejected.append({"index": i, "id": cid, "reason": str(e)})
+    return valid, rejected
+
+def mixed_ids(n: int, invalid_ratio: float, seed: int = 7) -> list:
+    rnd = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + "_-"
+    bad = ["", None, "ab", "x" * 80, "has space", "bad!id", "é" * 8, 42]
+    out = []
+    for _ in range(n):
+        if rnd.random() < invalid_ratio:
+            out.append(rnd.choice(bad))
+        else:
+            out.append("".join(rnd.choices(alphabet, k=rnd.randint(6, 24))))
+    return out
+
+def run(n: int = 100_000, invalid_ratios=(0.0, 0.1, 0.5), repeat: int = 5) -> dict:
+    results = {}
+    for ratio in invalid_ratios:
+        ids = mixed_ids(n, ratio)
+        assert [_regex_valid(c) for c in ids] == [is_valid_customer_id(c) for c in ids]
+        assert _regex_many(ids)[0] == validate_many(ids)[0]
+        timings = {
+            "regex_check_ns": lambda: [_regex_valid(c) for c in ids],
+            "check_ns": lambda: [is_valid_customer_id(c) for c in ids],
+            "regex_many_ns": lambda: _regex_many(ids),
+            "validate_many_ns": lambda: validate_many(ids),
+        }
+        row = {name: round(min(timeit.repeat(fn, number=1, repeat=repeat)) / n * 1e9, 1)
+               for name, fn in timings.items()}
+        row["check_speedup"] = round(row["regex_check_ns"] / row["check_ns"], 2)
+        row["many_speedup"] = round(row["regex_many_ns"] / row["validate_many_ns"], 2)
+        results[f"invalid={ratio}"] = row
+    return results
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.validation")
+    parser.add_argument("-n", type=int, default=100_000)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.n), indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
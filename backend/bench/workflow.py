@@ -0,0 +1,62 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("METRICS_ENABLED", "false")
+
+from app.events import to_eventbridge_event
+from app.workflow import DEFAULT_DEFINITION, LocalWorkflow, load_definition
+
+def submission_events(n: int, duplicate_ratio: float = 0.2, seed: int = 7) -> list[dict]:
+    from lambdas.submit_customer_id.handler import _entry
+    rnd = random.Random(seed)
+    ids: list[str] = []
+    for i in range(n):
+        if ids and rnd.random() < duplicate_ratio:
+            ids.append(rnd.choice(ids))
+        else:
+            ids.append(f"wf_{i:07d}")
+    return [to_eventbridge_event(_entry(cid)) for cid in ids]
+
+def run(n: int, definition_path: str, duplicate_ratio: float) -> dict:
+    import boto3
+    from moto import mock_aws
+    from app import aws
+    from bench.tables import create_tables
+
+    for key, value in {"AWS_ACCESS_KEY_ID": "testing", "AWS_SECRET_ACCESS_KEY": "testing",
+                       "AWS_DEFAULT_REGION": "eu-central-1"}.items():
+        os.environ.setdefault(key, value)
+
+    with mock_aws():
+        aws.reset()
+        create_tables(boto3.client("dynamodb", region_name="eu-central-1"))
+        wf = LocalWorkflow(load_definition(definition_path))
+        # moto's in-memory backend is not thread-safe (concurrent transactions corrupt its
+        # dicts), so executions run one at a time, as in bench.handlers
+        result = asyncio.run(wf.run_many(submission_events(n, duplicate_ratio), concurrency=1))
+        aws.reset()
+    return result
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.workflow",
+                                     description="Run the customers workflow locally against moto")
+    parser.add_argument("-n", "--executions", type=int, default=200)
+    parser.add_argument("--definition", default=str(DEFAULT_DEFINITION))
+    parser.add_argument("--duplicate-ratio", type=float, default=0.2)
+    parser.add_argument("--out", help="write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    result = run(args.executions, args.definition, args.duplicate_ratio)
+    print(json.dumps(result, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0 if set(result["statuses"]) <= {"SUCCEEDED"} else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
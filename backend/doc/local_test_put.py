@@ -18,6 +18,14 @@ def run():
         AttributeDefinitions=[{"AttributeName":"id","AttributeType":"S"}],
         BillingMode="PAY_PER_REQUEST",
     )
+    if os.environ.get("COUNTER_ENABLED", "false").lower() == "true":
+        # the opt-in customer count writes to its own table in the same transaction
+        ddb.create_table(
+            TableName="customer_ids_meta",
+            KeySchema=[{"AttributeName":"pk","KeyType":"HASH"}],
+            AttributeDefinitions=[{"AttributeName":"pk","AttributeType":"S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
 
     event = {"pathParameters": {"id": "abc-123"}}
     res = handler(event, None)
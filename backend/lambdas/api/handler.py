@@ -0,0 +1,37 @@
+from app.http import resp
+from app.cache import cached_repository
+from app.bloom import filtered_repository
+from app.dynamodb_repo import CustomerDynamoDBRepository
+from lambdas.get_customer_id import handler as get_customer_id
+from lambdas.put_customer_id import handler as put_customer_id
+from lambdas.delete_customer_id import handler as delete_customer_id
+from lambdas.exists_customer_ids import handler as exists_customer_ids
+from lambdas.list_customer_ids import handler as list_customer_ids
+from lambdas.count_customer_ids import handler as count_customer_ids
+from lambdas.list_changes import handler as list_changes
+
+repo = cached_repository(filtered_repository(CustomerDynamoDBRepository()))
+
+ROUTES = {
+    ("GET", "/customers/{id}"): get_customer_id,
+    ("PUT", "/customers/{id}"): put_customer_id,
+    ("DELETE", "/customers/{id}"): delete_customer_id,
+    ("POST", "/customers/exists"): exists_customer_ids,
+    ("GET", "/customers"): list_customer_ids,
+    ("GET", "/customers/count"): count_customer_ids,
+    ("GET", "/customers/changes"): list_changes,
+}
+
+# one repository (and connection pool / cache) for every route in this container
+for _module in ROUTES.values():
+    if hasattr(_module, "repo"):
+        _module.repo = repo
+
+def handler(event, context):
+    event = event if isinstance(event, dict) else {}
+    route = ROUTES.get((event.get("httpMethod"), event.get("resource")))
+    if route is None:
+        return resp(404, {"error": "route not found"})
+    return route.handler(event, context)
+
+lambda_handler = handler
@@ -0,0 +1,30 @@
+from app.http import resp, throttled
+from app.metrics import instrument
+from app.logger import setup_logger, flush_after
+from app.errors import Throttled
+from app.cache import TTLCache
+from app.counter import CustomerCounter
+from app.config import COUNT_CACHE_TTL_SECONDS
+
+logger = setup_logger("count_customer_ids")
+counter = CustomerCounter()
+_cache = TTLCache(1)
+
+@flush_after
+@instrument("count_customer_ids")
+def handler(event, context):
+    count = _cache.get("count", None)
+    if count is not None:
+        return resp(200, {"count": count})
+    try:
+        count = counter.read()
+        _cache.set("count", count, COUNT_CACHE_TTL_SECONDS)
+        logger.info("count ok: %d", count)
+        return resp(200, {"count": count})
+    except Throttled:
+        return throttled()
+    except Exception as e:
+        logger.error("count failed: %s", e)
+        return resp(500, {"error": "internal"})
+
+lambda_handler = handler
@@ -1,32 +1,32 @@
-from app.http import resp
-from app.logger import setup_logger
+from app.http import resp_body, id_extractor, throttled, MESSAGE_BODY, ERROR_BODY
+from app.metrics import instrument
+from app.logger import setup_logger, flush_after
 from app.validation import validate_id
-from app.errors import NotFound
+from app.errors import NotFound, Throttled
 from app.dynamodb_repo import CustomerDynamoDBRepository
+from app.cache import cached_repository
 
 logger = setup_logger("delete_customer_id")
-repo = CustomerDynamoDBRepository()
+repo = cached_repository(CustomerDynamoDBRepository())
 
-def _extract_id(event: dict) -> str | None:
-    p = (event.get("pathParameters") or {}).get("id")
-    if p: return p
-    h = event.get("headers") or {}
-    return h.get("id") or h.get("Id") or h.get("ID")
+_extract_id = id_extractor("path", "header")
+_INVALID = ERROR_BODY("invalid or missing id")
 
+@flush_after
+@instrument("delete_customer_id")
 def handler(event, context):
     cid = _extract_id(event)
     try:
         cid = validate_id(cid)
-
-        if not repo.exists(cid):
-            logger.info(f"delete not_found: {cid}")
-            return resp(404, {"error": f"Customer {cid} not found"})
-
-        repo.delete(cid)
-        logger.info(f"delete ok: {cid}")
-        return resp(200, {"message": f"Customer {cid} deleted"})
+        old = repo.delete(cid)
+        logger.info("delete ok: %s, created_at=%s", cid, (old or {}).get("created_at"))
+        return resp_body(200, MESSAGE_BODY(f"Customer {cid} deleted"))
     except NotFound:
-        return resp(404, {"error": f"Customer {cid} not found"})
+        logger.info("delete not_found: %s", cid)
+        return resp_body(404, ERROR_BODY(f"Customer {cid} not found"))
+    except Throttled:
+        logger.warning("delete throttled: %s", cid)
+        return throttled()
     except Exception:
         logger.error("delete failed")
-        return resp(400, {"error": "invalid or missing id"})
+        return resp_body(400, _INVALID)
@@ -0,0 +1,36 @@
+import logging
+from app.http import resp, Request
+from app.metrics import instrument
+from app.logger import setup_logger, flush_after
+from app.validation import validate_many
+from app.config import EXISTS_BATCH_MAX_IDS
+from app.dynamodb_repo import CustomerDynamoDBRepository
+from app.bloom import filtered_repository
+
+logger = setup_logger("exists_customer_ids")
+repo = filtered_repository(CustomerDynamoDBRepository())
+
+@flush_after
+@instrument("exists_customer_ids")
+def handler(event, context):
+    body = Request(event).json
+    ids = body.get("ids") if isinstance(body, dict) else None
+    if not isinstance(ids, list) or not ids:
+        return resp(400, {"error": "body must contain a non-empty 'ids' array"})
+    if len(ids) > EXISTS_BATCH_MAX_IDS:
+        return resp(400, {"error": f"at most {EXISTS_BATCH_MAX_IDS} ids per request"})
+
+    _, rejected = validate_many(ids)
+    if rejected:
+        return resp(400, {"error": "invalid ids", "invalid": [r["id"] for r in rejected], "rejected": rejected})
+
+    try:
+        results = repo.exists_many(ids)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("exists batch ok: %d ids, %d found", len(results), sum(results.values()))
+        return resp(200, {"results": results})
+    except Exception as e:
+        logger.error("exists batch failed: %s", e)
+        return resp(500, {"error": "internal"})
+
+lambda_handler = handler
@@ -1,27 +1,32 @@
-from app.http import resp
-from app.logger import setup_logger
+import logging
+from app.http import resp_body, id_extractor, throttled, EXISTS_BODY, ERROR_BODY
+from app.metrics import instrument
+from app.logger import setup_logger, flush_after
 from app.validation import validate_id
+from app.errors import Throttled
 from app.dynamodb_repo import CustomerDynamoDBRepository
+from app.cache import cached_repository, exists_cache
+from app.bloom import filtered_repository
 
 logger = setup_logger("get_customer_id")
-repo = CustomerDynamoDBRepository()
+repo = cached_repository(filtered_repository(CustomerDynamoDBRepository()))
 
-def _extract_id(event: dict) -> str | None:
-    p = (event.get("pathParameters") or {}).get("id")
-    if p: return p
-    h = event.get("headers") or {}
-    p = h.get("id") or h.get("Id") or h.get("ID")
-    if p: return p
-    q = event.get("queryStringParameters") or {}
-    return q.get("id")
+_extract_id = id_extractor("path", "header", "query")
+_INVALID = ERROR_BODY("invalid or missing id")
 
+@flush_after
+@instrument("get_customer_id")
 def handler(event, context):
     cid = _extract_id(event)
     try:
         cid = validate_id(cid)
         exists = repo.exists(cid)
-        logger.info(f"get ok: {cid}, exists={exists}")
-        return resp(200, {"exists": exists, "id": cid})
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("get ok: %s, exists=%s", cid, exists, extra={"fields": exists_cache.stats()})
+        return resp_body(200, EXISTS_BODY(exists, cid))
+    except Throttled:
+        logger.warning("get throttled: %s", cid)
+        return throttled()
     except Exception:
         logger.error("get failed")
-        return resp(400, {"error": "invalid or missing id"})
+        return resp_body(400, _INVALID)
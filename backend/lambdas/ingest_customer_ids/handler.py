@@ -0,0 +1,60 @@
+import json
+from datetime import datetime
+from app import metrics
+from app.metrics import instrument
+from app.logger import setup_logger, flush_after
+from app.validation import rejection_reason
+from app.dynamodb_repo import CustomerDynamoDBRepository, PUT_MANY_MAX_IDS
+
+logger = setup_logger("ingest_customer_ids")
+repo = CustomerDynamoDBRepository()
+
+def _message_id(body: str):
+    # EventBridge rule target: the whole event, id under detail; direct sends: {"id": ...}
+    try:
+        msg = json.loads(body)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(msg, dict):
+        return None
+    detail = msg.get("detail")
+    return detail.get("id") if isinstance(detail, dict) else msg.get("id")
+
+@flush_after
+@instrument("ingest_customer_ids")
+def handler(event, context):
+    # invalid messages are logged and dropped, a redelivery cannot fix them; only messages
+    # whose write failed go back in batchItemFailures
+    by_id: dict[str, list[str]] = {}
+    rejected = 0
+    for record in event.get("Records") or []:
+        cid = _message_id(record.get("body"))
+        reason = rejection_reason(cid)
+        if reason:
+            rejected += 1
+            logger.warning("ingest rejected message=%s reason=%s", record.get("messageId"), reason)
+            continue
+        by_id.setdefault(cid, []).append(record["messageId"])
+
+    ids = list(by_id)
+    attrs = {"created_at": datetime.utcnow().isoformat() + "Z"}
+    counts = {"created": 0, "exists": 0, "failed": 0, "rejected": rejected}
+    failures = []
+    for i in range(0, len(ids), PUT_MANY_MAX_IDS):
+        chunk = ids[i:i + PUT_MANY_MAX_IDS]
+        try:
+            for outcome in repo.put_many_if_absent(chunk, attrs).values():
+                counts[outcome] += 1
+        except Exception as e:
+            logger.error("ingest write failed (%d ids, first=%s): %s", len(chunk), chunk[0], e)
+            counts["failed"] += len(chunk)
+            failures.extend({"itemIdentifier": mid} for cid in chunk for mid in by_id[cid])
+
+    for name, metric in (("created", "IngestCreated"), ("exists", "IngestExisting"),
+                         ("failed", "IngestFailed"), ("rejected", "IngestRejected")):
+        if counts[name]:
+            metrics.incr(metric, counts[name])
+    logger.info("ingested batch: %s", counts)
+    return {"batchItemFailures": failures}
+
+lambda_handler = handler
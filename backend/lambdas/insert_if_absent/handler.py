@@ -0,0 +1,31 @@
+from datetime import datetime
+from app.metrics import instrument
+from app.http import id_extractor
+from app.logger import setup_logger, flush_after
+from app.validation import validate_id
+from app.errors import AlreadyExists
+from app.dynamodb_repo import CustomerDynamoDBRepository
+from lambdas.log_event import handler as log_event
+
+logger = setup_logger("insert_if_absent")
+repo = CustomerDynamoDBRepository()
+
+_extract_id = id_extractor("root", "detail")
+
+@flush_after
+@instrument("insert_if_absent")
+def handler(event, context):
+    cid = validate_id(_extract_id(event))
+
+    try:
+        repo.put(cid, {"created_at": datetime.utcnow().isoformat() + "Z"})
+        inserted = True
+    except AlreadyExists:
+        inserted = False
+
+    logger.info("insert_if_absent id=%s, inserted=%s", cid, inserted)
+    result = {"id": cid, "validation": {"exists": not inserted}, "insert": {"inserted": inserted}}
+    log_event.handler(result, context)
+    return result
+
+lambda_handler = handler
@@ -0,0 +1,44 @@
+from app.http import resp, Request
+from app.metrics import instrument
+from app.logger import setup_logger, flush_after
+from app.errors import InvalidToken
+from app.changelog import Changelog, CheckpointCompacted
+from app.pagination import encode_token, decode_token, parse_limit
+from app.config import LIST_DEFAULT_LIMIT, LIST_MAX_LIMIT
+
+logger = setup_logger("list_changes")
+changelog = Changelog()
+
+def _position(state: dict | None) -> dict | None:
+    if state is None:
+        return None
+    keys = {"b", "i"} if "b" in state else {"s", "i"}
+    if set(state) != keys or not all(isinstance(v, int) and not isinstance(v, bool) and v >= 0 for v in state.values()):
+        raise InvalidToken("malformed cursor")
+    return state
+
+@flush_after
+@instrument("list_changes")
+def handler(event, context):
+    query = Request(event).query
+    try:
+        limit = parse_limit(query.get("limit"), LIST_DEFAULT_LIMIT, LIST_MAX_LIMIT)
+        position = _position(decode_token(query.get("cursor")))
+    except (ValueError, InvalidToken) as e:
+        return resp(400, {"error": str(e)})
+
+    try:
+        changes, position, more = changelog.read_page(position, limit)
+    except CheckpointCompacted as e:
+        logger.info("changes cursor expired: %s", e)
+        return resp(410, {"error": "cursor expired, resync without a cursor"})
+    except Exception as e:
+        logger.error("changes failed: %s", e)
+        return resp(500, {"error": "internal"})
+
+    logger.info("changes ok: %d records, more=%s", len(changes), more)
+    # next_cursor is always set: when caught up it marks where the next poll continues
+    return resp(200, {"changes": changes, "count": len(changes),
+                      "next_cursor": encode_token(position), "has_more": more})
+
+lambda_handler = handler
@@ -0,0 +1,46 @@
+from app.http import resp, throttled, Request
+from app.metrics import instrument
+from app.logger import setup_logger, flush_after
+from app.errors import InvalidToken, Throttled
+from app.pagination import encode_token, decode_token, parse_limit
+from app.config import LIST_DEFAULT_LIMIT, LIST_MAX_LIMIT
+from app.validation import is_valid_prefix
+from app.dynamodb_repo import CustomerDynamoDBRepository
+
+logger = setup_logger("list_customer_ids")
+repo = CustomerDynamoDBRepository()
+
+@flush_after
+@instrument("list_customer_ids")
+def handler(event, context):
+    query = Request(event).query
+    try:
+        limit = parse_limit(query.get("limit"), LIST_DEFAULT_LIMIT, LIST_MAX_LIMIT)
+        prefix = query.get("prefix")
+        if prefix is not None and not is_valid_prefix(prefix):
+            raise ValueError("invalid prefix")
+        state = decode_token(query.get("next_token"))
+        start = state.get("id") if state else None
+        if state is not None and (not isinstance(start, str) or state.get("pfx") != prefix):
+            raise InvalidToken("malformed pagination token")
+    except (ValueError, InvalidToken) as e:
+        return resp(400, {"error": str(e)})
+
+    try:
+        if prefix is None:
+            ids, last = repo.list_page(limit, start)
+        else:
+            # the token keeps the last id returned: ids are unique and every bucket is ordered
+            # by id, so the next page resumes after it with no duplicates or gaps
+            ids, last = repo.search_prefix(prefix, limit, start)
+        logger.info("list ok: %d ids, prefix=%s, more=%s", len(ids), prefix, last is not None)
+        state = {"id": last, **({"pfx": prefix} if prefix is not None else {})}
+        return resp(200, {"ids": ids, "count": len(ids),
+                          "next_token": encode_token(state if last else None)})
+    except Throttled:
+        return throttled()
+    except Exception as e:
+        logger.error("list failed: %s", e)
+        return resp(500, {"error": "internal"})
+
+lambda_handler = handler
@@ -1,4 +1,5 @@
-from app.logger import setup_logger
+from app.metrics import instrument
+from app.logger import setup_logger, flush_after, LazyJson
 
 logger = setup_logger("log_event")
 
@@ -10,6 +11,8 @@ def _get(d: dict | None, path: list[str], default=None):
         cur = cur.get(k)
     return cur if cur is not None else default
 
+@flush_after
+@instrument("log_event")
 def handler(event, context):
     cid = _get(event, ["id"]) or _get(event, ["detail", "id"])
 
@@ -22,8 +25,7 @@ def handler(event, context):
         "request_id": getattr(context, "aws_request_id", None),
     }
 
-    import json
-    logger.info(json.dumps(payload))
+    logger.info(LazyJson(payload))
     return {"logged": True}
 
 lambda_handler = handler
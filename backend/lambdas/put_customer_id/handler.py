@@ -1,26 +1,36 @@
-from app.http import resp
-from app.logger import setup_logger
+from app.http import resp_body, id_extractor, throttled, CREATED_BODY, ERROR_BODY
+from app.metrics import instrument
+from app.idempotency import idempotent
+from app.logger import setup_logger, flush_after
 from app.validation import validate_id
-from app.errors import InvalidCustomerId, AlreadyExists
+from app.errors import InvalidCustomerId, AlreadyExists, Throttled
 from app.dynamodb_repo import CustomerDynamoDBRepository
+from app.cache import cached_repository
+from app.bloom import filtered_repository
 
 logger = setup_logger("put_customer_id")
-repo = CustomerDynamoDBRepository()
+repo = cached_repository(filtered_repository(CustomerDynamoDBRepository()))
 
+_extract_id = id_extractor("path", "header")
+_INTERNAL = ERROR_BODY("internal")
+
+@flush_after
+@instrument("put_customer_id")
+@idempotent("put_customer_id")
 def handler(event, context):
-    cid = (event.get("pathParameters") or {}).get("id")
-    if not cid:
-        h = event.get("headers") or {}
-        cid = h.get("id") or h.get("Id") or h.get("ID")
+    cid = _extract_id(event)
 
     try:
         cid = validate_id(cid)
         repo.put(cid)
-        logger.info(f"put ok: {cid}")
-        return resp(201, {"message": "created", "id": cid})
+        logger.info("put ok: %s", cid)
+        return resp_body(201, CREATED_BODY("created", cid))
     except InvalidCustomerId as e:
-        return resp(400, {"error": str(e)})
+        return resp_body(400, ERROR_BODY(str(e)))
     except AlreadyExists as e:
-        return resp(409, {"error": str(e)})
+        return resp_body(409, ERROR_BODY(str(e)))
+    except Throttled:
+        logger.warning("put throttled: %s", cid)
+        return throttled()
     except Exception:
-        return resp(500, {"error": "internal"})
+        return resp_body(500, _INTERNAL)
@@ -1,43 +1,81 @@
-from json import loads, dumps
-import boto3
-from app.logger import setup_logger
-from app.http import resp
-from app.validation import validate_id
-from app.config import AWS_REGION, EVENT_BUS_NAME, EVENT_SOURCE, EVENT_DETAIL_TYPE
+from json import dumps
+from app.aws import LazyClient
+from app.events import put_events_batched
+from app.metrics import instrument
+from app.idempotency import idempotent
+from app.logger import setup_logger, flush_after
+from app.http import resp, resp_body, parse_body, id_extractor, ACCEPTED_BODY, ERROR_BODY
+from app.validation import validate_id, is_valid_customer_id, rejection_reason
+from app.errors import InvalidCustomerId
+from app.config import EVENT_BUS_NAME, EVENT_SOURCE, EVENT_DETAIL_TYPE, SUBMIT_MAX_IDS
 
 logger = setup_logger("submit_customer_id")
-events = boto3.client("events", region_name=AWS_REGION)
-
-def _extract_id(event: dict) -> str | None:
-    body = event.get("body")
-    if isinstance(body, str):
-        try:
-            body = loads(body)
-        except Exception:
-            body = None
-    if isinstance(body, dict) and "id" in body:
-        return body["id"]
-    p = (event.get("pathParameters") or {}).get("id")
-    if p: 
-        return p
-    h = event.get("headers") or {}
-    return h.get("id") or h.get("Id") or h.get("ID")
+events = LazyClient("events")
 
+_extract_id = id_extractor("path", "header")
+_INVALID = ERROR_BODY("invalid or missing id")
+
+def _entry(cid: str) -> dict:
+    return {
+        "EventBusName": EVENT_BUS_NAME,              
+        "Source":      EVENT_SOURCE,                
+        "DetailType":  EVENT_DETAIL_TYPE,            
+        "Detail":      dumps({"id": cid})
+    }
+
+def _submit_many(ids) -> dict:
+    if not isinstance(ids, list) or not ids:
+        return resp(400, {"error": "'ids' must be a non-empty array"})
+    if len(ids) > SUBMIT_MAX_IDS:
+        return resp(400, {"error": f"at most {SUBMIT_MAX_IDS} ids per request"})
+
+    results, valid = [], {}
+    for cid in ids:
+        if not is_valid_customer_id(cid):
+            results.append({"id": cid, "status": "invalid", "reason": rejection_reason(cid)})
+        elif cid not in valid:
+            valid[cid] = len(results)
+            results.append({"id": cid, "status": "pending"})
+
+    outcomes = put_events_batched(events, [_entry(cid) for cid in valid]) if valid else []
+    for (cid, pos), out in zip(valid.items(), outcomes):
+        if out.get("ErrorCode"):
+            results[pos] = {"id": cid, "status": "failed", "error": out["ErrorCode"]}
+        else:
+            results[pos] = {"id": cid, "status": "accepted", "event_id": out.get("EventId")}
+
+    counts = {s: sum(1 for r in results if r["status"] == s) for s in ("accepted", "failed", "invalid")}
+    logger.info("submitted batch: %s", counts)
+    if counts["accepted"] == len(results):
+        status = 202
+    elif counts["accepted"]:
+        status = 207
+    else:
+        status = 502 if counts["failed"] else 400
+    return resp(status, {**counts, "results": results})
+
+@flush_after
+@instrument("submit_customer_id")
+@idempotent("submit_customer_id")
 def handler(event, context):
     try:
-        cid = validate_id(_extract_id(event))
-
-        events.put_events(Entries=[{
-            "EventBusName": EVENT_BUS_NAME,              
-            "Source":      EVENT_SOURCE,                
-            "DetailType":  EVENT_DETAIL_TYPE,            
-            "Detail":      dumps({"id": cid})
-        }])
-
-        logger.info(f"submitted id={cid}")
-        return resp(202, {"status": "accepted", "id": cid})
-    except Exception as e:
-        logger.error(f"submit failed: {e}")
-        return resp(400, {"error": "invalid or missing id"})
+        body = parse_body(event)
+        cid = None
+        if body.__class__ is dict:
+            if "ids" in body:
+                return _submit_many(body["ids"])
+            cid = body.get("id")
+
+        cid = validate_id(cid or _extract_id(event))
+
+        out = put_events_batched(events, [_entry(cid)])[0]
+        if out.get("ErrorCode"):
+            logger.error("submit failed id=%s: %s", cid, out.get("ErrorCode"))
+            return resp(502, {"status": "failed", "id": cid, "error": out.get("ErrorCode")})
+
+        logger.info("submitted id=%s", cid)
+        return resp_body(202, ACCEPTED_BODY("accepted", cid))
+    except (InvalidCustomerId, ValueError):
+        return resp_body(400, _INVALID)
 
 lambda_handler = handler
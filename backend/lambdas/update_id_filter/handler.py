@@ -0,0 +1,29 @@
+from app import bloom
+from app.metrics import instrument
+from app.logger import setup_logger, flush_after
+from app.config import BLOOM_SNAPSHOT_PATH
+
+logger = setup_logger("update_id_filter")
+
+@flush_after
+@instrument("update_id_filter")
+def handler(event, context):
+    inserted, removed = [], 0
+    for record in event.get("Records") or []:
+        name = record.get("eventName")
+        if name == "INSERT":
+            inserted.append(record["dynamodb"]["Keys"]["id"]["S"])
+        elif name == "REMOVE":
+            removed += 1
+    if not inserted and not removed:
+        return {"generation": None, "added": 0, "removed": 0}
+
+    # an exception fails the batch and the stream retries it; adding an id twice is harmless
+    result = bloom.apply_changes(BLOOM_SNAPSHOT_PATH, inserted, removed)
+    if result is None:
+        logger.warning("no id filter snapshot at %s yet, %d inserts journaled only", BLOOM_SNAPSHOT_PATH, len(inserted))
+        return {"generation": None, "added": 0, "removed": removed}
+    logger.info("id filter updated: %s", result)
+    return result
+
+lambda_handler = handler
@@ -1,28 +1,21 @@
-from app.logger import setup_logger
+from app.metrics import instrument
+from app.http import id_extractor
+from app.logger import setup_logger, flush_after
 from app.validation import validate_id
 from app.dynamodb_repo import CustomerDynamoDBRepository
+from app.bloom import filtered_repository
 
 logger = setup_logger("validate_exists")
-repo = CustomerDynamoDBRepository()
+repo = filtered_repository(CustomerDynamoDBRepository())
 
-def _extract_id(event: dict) -> str | None:
-    if not isinstance(event, dict):
-        return None
-    if "id" in event:
-        return event["id"]
-    d = event.get("detail") or {} 
-    if "id" in d:
-        return d["id"]
-    p = (event.get("pathParameters") or {}).get("id") 
-    if p:
-        return p
-    h = event.get("headers") or {}  
-    return h.get("id") or h.get("Id") or h.get("ID")
+_extract_id = id_extractor("root", "detail", "path", "header")
 
+@flush_after
+@instrument("validate_exists")
 def handler(event, context):
     cid = validate_id(_extract_id(event))
     exists = repo.exists(cid)
-    logger.info(f"validate_exists ok: {cid}, exists={exists}")
+    logger.info("validate_exists ok: %s, exists=%s", cid, exists)
     return {"exists": exists}
 
 lambda_handler = handler
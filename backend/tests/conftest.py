@@ -43,3 +43,45 @@ def _extract_status_and_body(resp):
 @pytest.fixture
 def extract_status_and_body():
     return _extract_status_and_body
+
+# === moto-backed DynamoDB table ===
+@pytest.fixture
+def aws_env(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "eu-central-1")
+
+@pytest.fixture
+def ddb_table(aws_env):
+    moto = pytest.importorskip("moto")
+    import boto3
+    from app import aws
+    aws.reset()
+    with moto.mock_aws():
+        ddb = boto3.resource("dynamodb", region_name="eu-central-1")
+        table = ddb.create_table(
+            TableName="customer_ids",
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"},
+                                  {"AttributeName": "pfx_bucket", "AttributeType": "N"}],
+            GlobalSecondaryIndexes=[{
+                "IndexName": "pfx_bucket-id",
+                "KeySchema": [{"AttributeName": "pfx_bucket", "KeyType": "HASH"},
+                              {"AttributeName": "id", "KeyType": "RANGE"}],
+                "Projection": {"ProjectionType": "KEYS_ONLY"},
+            }],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        ddb.create_table(
+            TableName="customer_ids_meta",
+            KeySchema=[{"AttributeName": "pk", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "pk", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        yield table
+    aws.reset()
+
+@pytest.fixture
+def counter_on(monkeypatch):
+    # the sharded counter is opt-in (COUNTER_ENABLED); ddb_table creates its table
+    monkeypatch.setattr("app.config.COUNTER_ENABLED", True)
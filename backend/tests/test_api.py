@@ -0,0 +1,61 @@
+import json
+import pytest
+from lambdas.api import handler as api_module
+
+class SharedRepo:
+    def __init__(self): self.existing = set()
+    def exists(self, cid): return cid in self.existing
+    def put(self, cid, attrs=None): self.existing.add(cid)
+    def delete(self, cid):
+        self.existing.discard(cid)
+        return {"id": cid}
+    def exists_many(self, ids): return {cid: cid in self.existing for cid in ids}
+
+@pytest.fixture
+def repo(monkeypatch):
+    shared = SharedRepo()
+    for module in api_module.ROUTES.values():
+        if hasattr(module, "repo"):
+            monkeypatch.setattr(module, "repo", shared)
+    return shared
+
+def _event(method, resource, cid=None, body=None):
+    return {"httpMethod": method, "resource": resource, "headers": {},
+            "pathParameters": {"id": cid} if cid else None,
+            "body": json.dumps(body) if body is not None else None}
+
+def test_all_routes_share_one_repository():
+    repos = {id(module.repo) for module in api_module.ROUTES.values() if hasattr(module, "repo")}
+    assert repos == {id(api_module.repo)}
+
+def test_routes_dispatch_to_existing_handlers(repo, extract_status_and_body):
+    put = api_module.handler(_event("PUT", "/customers/{id}", "AB_123"), None)
+    assert extract_status_and_body(put)[0] == 201
+
+    status, body = extract_status_and_body(api_module.handler(_event("GET", "/customers/{id}", "AB_123"), None))
+    assert (status, body["exists"]) == (200, True)
+
+    status, body = extract_status_and_body(
+        api_module.handler(_event("POST", "/customers/exists", body={"ids": ["AB_123", "CD_456"]}), None))
+    assert body["results"] == {"AB_123": True, "CD_456": False}
+
+    status, _ = extract_status_and_body(api_module.handler(_event("DELETE", "/customers/{id}", "AB_123"), None))
+    assert status == 200
+    assert repo.existing == set()
+
+@pytest.mark.parametrize("event", [_event("PATCH", "/customers/{id}", "AB_123"), _event("GET", "/nope"), {}, "x"])
+def test_unknown_route_is_404(repo, extract_status_and_body, event):
+    status, body = extract_status_and_body(api_module.handler(event, None))
+    assert status == 404
+    assert "error" in body
+
+def test_single_dispatcher_never_needs_more_cold_starts():
+    from bench import lambdalith
+    trace = lambdalith.spiky_trace(duration_s=1800, base_rps=0.5, burst_rps=30, burst_every_s=300, burst_len_s=10)
+    cold_ms = dict.fromkeys(list(lambdalith.ROUTE_MIX) + ["api"], 200.0)
+
+    per_fn = lambdalith.simulate(trace, cold_ms, warm_ms=15, idle_timeout_s=300, single=False)
+    single = lambdalith.simulate(trace, cold_ms, warm_ms=15, idle_timeout_s=300, single=True)
+
+    assert per_fn["requests"] == single["requests"] == len(trace)
+    assert single["cold_starts"] <= per_fn["cold_starts"]
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+import pytest
+from app.async_repo import AsyncCustomerRepository, ThreadedAsyncRepository
+from app.dynamodb_repo import CustomerDynamoDBRepository, prefix_bucket
+from app.errors import AlreadyExists, NotFound
+
+def test_same_semantics_as_sync_repo(ddb_table):
+    async def scenario():
+        async with ThreadedAsyncRepository(CustomerDynamoDBRepository(), max_in_flight=4) as repo:
+            await repo.put("AB_1")
+            assert await repo.exists("AB_1") is True
+            with pytest.raises(AlreadyExists):
+                await repo.put("AB_1")
+            assert (await repo.delete("AB_1"))["id"] == "AB_1"
+            with pytest.raises(NotFound):
+                await repo.delete("AB_1")
+            assert await repo.put_many(["AB_2", "AB_3", "AB_2"]) == {"AB_2": "created", "AB_3": "created"}
+            assert await repo.put_many(["AB_3"]) == {"AB_3": "exists"}
+            assert await repo.exists_many(["AB_2", "AB_9"]) == {"AB_2": True, "AB_9": False}
+            return repo.stats()
+    stats = asyncio.run(scenario())
+    # domain errors are outcomes, not failures
+    assert stats["errors"] == 0 and stats["requests"] == 9
+
+class SlowRepo:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = self.peak = 0
+
+    def exists(self, cid, consistent=True):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.01)
+        with self.lock:
+            self.active -= 1
+        return cid.endswith("1")
+
+def test_in_flight_is_bounded_and_reported():
+    slow = SlowRepo()
+    repo = ThreadedAsyncRepository(slow, max_in_flight=5)
+
+    async def scenario():
+        return await asyncio.gather(*(repo.exists(f"id_{i}") for i in range(40)))
+    try:
+        results = asyncio.run(scenario())
+    finally:
+        repo.close()
+
+    assert results.count(True) == 4
+    stats = repo.stats()
+    assert slow.peak <= 5 and stats["peak_in_flight"] == 5
+    assert stats["achieved_concurrency"] > 2
+    assert stats["latency"]["count"] == 40
+
+# AsyncCustomerRepository talks HTTP through aiobotocore, so it runs against moto in server mode
+@pytest.fixture
+def moto_server(aws_env):
+    pytest.importorskip("aiobotocore")
+    server = pytest.importorskip("moto.server").ThreadedMotoServer(ip_address="127.0.0.1", port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    url = f"http://{host}:{port}"
+    import boto3
+    from bench.tables import create_tables
+    create_tables(boto3.client("dynamodb", region_name="eu-central-1", endpoint_url=url))
+    yield url
+    # moto keeps its backends per process, not per server
+    from urllib.request import Request, urlopen
+    urlopen(Request(f"{url}/moto-api/reset", method="POST")).close()
+    server.stop()
+
+def test_native_async_repo_matches_the_sync_semantics(moto_server):
+    async def scenario():
+        async with AsyncCustomerRepository(counter_table=None, endpoint_url=moto_server, max_in_flight=8) as repo:
+            await repo.put("AB_1", {"created_at": "t1"})
+            assert await repo.exists("AB_1") is True
+            with pytest.raises(AlreadyExists):
+                await repo.put("AB_1")
+            assert await repo.delete("AB_1") == {"id": "AB_1", "created_at": "t1", "pfx_bucket": prefix_bucket("AB_1")}
+            with pytest.raises(NotFound):
+                await repo.delete("AB_1")
+            ids = [f"AB_{i}" for i in range(2, 150)]
+            assert set((await repo.put_many(ids)).values()) == {"created"}
+            found = await repo.exists_many(ids + ["AB_999"])
+            return found, repo.stats()
+    found, stats = asyncio.run(scenario())
+    assert sum(found.values()) == 148 and found["AB_999"] is False
+    assert stats["errors"] == 0 and stats["peak_in_flight"] <= 8
+
+def test_native_async_repo_moves_the_counter(moto_server, counter_on):
+    async def scenario():
+        async with AsyncCustomerRepository(endpoint_url=moto_server) as repo:
+            await asyncio.gather(*(repo.put(f"AB_{i}") for i in range(5)))
+            with pytest.raises(AlreadyExists):
+                await repo.put("AB_0")
+            assert await repo.delete("AB_0") == {"id": "AB_0"}
+            with pytest.raises(NotFound):
+                await repo.delete("AB_0")
+    asyncio.run(scenario())
+    import boto3
+    client = boto3.client("dynamodb", region_name="eu-central-1", endpoint_url=moto_server)
+    shards = client.scan(TableName="customer_ids_meta")["Items"]
+    assert sum(int(s["n"]["N"]) for s in shards) == 4
+
+def test_native_async_repo_needs_async_with():
+    repo = AsyncCustomerRepository(counter_table=None)
+    with pytest.raises(RuntimeError):
+        asyncio.run(repo.exists("AB_1"))
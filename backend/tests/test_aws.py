@@ -0,0 +1,33 @@
+from app import aws
+
+def test_clients_are_shared_singletons(aws_env):
+    aws.reset()
+    try:
+        a = aws.client("events")
+        assert aws.client("events") is a
+        assert aws.client("events", "us-east-1") is not a
+        assert aws.resource("dynamodb") is aws.resource("dynamodb")
+    finally:
+        aws.reset()
+
+def test_client_config_is_tuned(aws_env, monkeypatch):
+    monkeypatch.setattr(aws.config, "AWS_MAX_POOL_CONNECTIONS", 7)
+    monkeypatch.setattr(aws.config, "AWS_READ_TIMEOUT", 3.5)
+    aws.reset()
+    try:
+        cfg = aws.client("dynamodb").meta.config
+        assert cfg.tcp_keepalive is True
+        assert cfg.max_pool_connections == 7
+        assert cfg.read_timeout == 3.5
+    finally:
+        aws.reset()
+
+def test_lazy_client_defers_creation(aws_env):
+    aws.reset()
+    try:
+        lazy = aws.LazyClient("events")
+        assert aws._clients == {}
+        assert lazy.meta.service_model.service_name == "events"
+        assert ("events", aws.config.AWS_REGION) in aws._clients
+    finally:
+        aws.reset()
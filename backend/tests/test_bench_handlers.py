@@ -0,0 +1,35 @@
+import copy
+from bench import handlers
+
+def test_fake_run_covers_every_phase():
+    res = handlers.run(["fake"], ["get_customer_id", "put_customer_id", "delete_customer_id"],
+                       n=20, warmup=2, alloc_n=5, threads=4)
+
+    assert res["meta"]["n"] == 20
+    for row in res["results"]["fake"].values():
+        assert row["errors"] == 0 and row["throughput_errors"] == 0
+        assert row["latency"]["count"] == 20
+        assert row["invocations_per_s"] > 0
+        assert row["alloc_peak_kib_max"] >= row["alloc_peak_kib_p50"]
+
+def test_wired_restores_module_state():
+    import lambdas.get_customer_id.handler as get_handler
+    before = get_handler.repo
+    with handlers.wired("fake", 3) as modules:
+        assert modules["get_customer_id"].handler(handlers.CASES["get_customer_id"](0, "t"),
+                                                  handlers.CONTEXT)["statusCode"] == 200
+    assert get_handler.repo is before
+
+def test_compare_flags_regressions_only():
+    base = {"meta": {}, "results": {"fake": {"get_customer_id": {
+        "latency": {"p50_ms": 1.0, "p99_ms": 2.0}, "alloc_peak_kib_p50": 10.0, "invocations_per_s": 1000.0}}}}
+    new = copy.deepcopy(base)
+    row = new["results"]["fake"]["get_customer_id"]
+    row["latency"]["p50_ms"] = 0.5
+    row["latency"]["p99_ms"] = 3.0
+    row["invocations_per_s"] = 700.0
+
+    regressions = handlers.compare(base, new, threshold=0.15)
+
+    assert {r["metric"] for r in regressions} == {"p99_ms", "invocations_per_s"}
+    assert handlers.compare(base, base) == []
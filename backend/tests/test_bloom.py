@@ -0,0 +1,123 @@
+import os
+import pytest
+from app import bloom
+from app.bloom import BloomFilter, FilterSource, FilteredCustomerRepository
+from lambdas.update_id_filter import handler as update_module
+
+class Clock:
+    def __init__(self): self.now = 0.0
+    def __call__(self): return self.now
+
+class Repo:
+    def __init__(self, ids=()):
+        self.ids = set(ids)
+        self.reads = []
+    def exists(self, cid, consistent=True):
+        self.reads.append(cid)
+        return cid in self.ids
+    def exists_many(self, ids):
+        self.reads.extend(ids)
+        return {cid: cid in self.ids for cid in ids}
+    def put(self, cid, attrs=None):
+        self.ids.add(cid)
+
+def _snapshot(path, ids, n=1000, fp_rate=0.01):
+    f = BloomFilter.for_capacity(n, fp_rate)
+    f.add_many(ids)
+    bloom.write_snapshot(str(path), f)
+    return str(path)
+
+def test_no_false_negatives_and_fp_rate_near_target():
+    f = BloomFilter.for_capacity(5000, 0.01)
+    members = [f"AB_{i}" for i in range(5000)]
+    f.add_many(members)
+
+    assert all(cid in f for cid in members)
+    fp = sum(f"ZZ_{i}" in f for i in range(20000)) / 20000
+    assert fp < 0.02
+    assert abs(f.stats()["estimated_fp_rate"] - 0.01) < 0.005
+
+def test_snapshot_roundtrip_is_memory_mapped(tmp_path):
+    path = _snapshot(tmp_path / "ids.bloom", ["AB_1", "AB_2"])
+
+    loaded = bloom.load_snapshot(path)
+    assert "AB_1" in loaded and "AB_2" in loaded and "AB_3" not in loaded
+    assert loaded.count == 2
+    # copy-on-write: a container's own adds never reach the file
+    loaded.add("AB_3")
+    assert "AB_3" not in bloom.load_snapshot(path)
+
+def test_rejects_foreign_or_truncated_files(tmp_path):
+    path = _snapshot(tmp_path / "ids.bloom", ["AB_1"])
+    data = open(path, "rb").read()
+    with pytest.raises(ValueError):
+        BloomFilter.from_buffer(b"NOTBLOOM" + data[8:])
+    with pytest.raises(ValueError):
+        BloomFilter.from_buffer(data[:-1])
+
+def test_filtered_repository_skips_reads_on_definite_miss(tmp_path):
+    path = _snapshot(tmp_path / "ids.bloom", ["AB_1"])
+    inner = Repo({"AB_1"})
+    repo = FilteredCustomerRepository(inner, FilterSource(path, refresh_seconds=60))
+
+    assert repo.exists("AB_1") is True
+    assert repo.exists("AB_404") is False
+    assert repo.exists_many(["AB_1", "AB_404"]) == {"AB_1": True, "AB_404": False}
+    assert inner.reads == ["AB_1", "AB_1"]
+
+def test_missing_snapshot_passes_everything_through(tmp_path):
+    inner = Repo({"AB_1"})
+    repo = FilteredCustomerRepository(inner, FilterSource(str(tmp_path / "none.bloom")))
+
+    assert repo.exists("AB_1") is True and repo.exists("AB_2") is False
+    assert inner.reads == ["AB_1", "AB_2"]
+
+def test_source_reloads_new_generation_and_keeps_local_writes(tmp_path):
+    clock = Clock()
+    path = _snapshot(tmp_path / "ids.bloom", ["AB_1"])
+    source = FilterSource(path, refresh_seconds=10, clock=clock)
+    repo = FilteredCustomerRepository(Repo({"AB_1"}), source)
+    repo.put("AB_local")
+    assert "AB_local" in source.get()
+
+    bloom.apply_changes(path, ["AB_2"])
+    assert "AB_2" not in source.get()       # not re-checked yet
+    clock.now = 10
+    assert "AB_2" in source.get() and "AB_local" in source.get()
+    assert source.stats()["generation"] == 1 and source.loads == 2
+
+def test_stream_consumer_applies_inserts_and_counts_removals(tmp_path, monkeypatch):
+    path = _snapshot(tmp_path / "ids.bloom", [])
+    monkeypatch.setattr(update_module, "BLOOM_SNAPSHOT_PATH", path)
+    event = {"Records": [
+        {"eventName": "INSERT", "dynamodb": {"Keys": {"id": {"S": "AB_1"}}}},
+        {"eventName": "MODIFY", "dynamodb": {"Keys": {"id": {"S": "AB_2"}}}},
+        {"eventName": "REMOVE", "dynamodb": {"Keys": {"id": {"S": "AB_3"}}}},
+    ]}
+
+    assert update_module.handler(event, None) == {"generation": 1, "added": 1, "removed": 1}
+    loaded = bloom.load_snapshot(path)
+    assert "AB_1" in loaded and "AB_2" not in loaded and loaded.removed == 1
+
+def test_rebuild_scans_table_and_replays_journal(tmp_path, ddb_table, monkeypatch):
+    from app.dynamodb_repo import CustomerDynamoDBRepository
+    path = str(tmp_path / "ids.bloom")
+    for i in range(50):
+        ddb_table.put_item(Item={"id": f"AB_{i}"})
+    repo = CustomerDynamoDBRepository(counter_table=None)
+    scan_segment = repo.scan_segment
+
+    def racing_scan(segment, total, page_size=1000):
+        # an insert the stream consumer sees while segment 0 is being scanned
+        if segment == 0:
+            bloom.apply_changes(path, ["AB_raced"])
+        yield from scan_segment(segment, total, page_size)
+    monkeypatch.setattr(repo, "scan_segment", racing_scan)
+
+    report = bloom.rebuild(path, repo, segments=2, workers=1)
+
+    assert (report["scanned"], report["replayed"], report["generation"]) == (50, 1, 1)
+    loaded = bloom.load_snapshot(path)
+    assert all(f"AB_{i}" in loaded for i in range(50)) and "AB_raced" in loaded
+    assert os.path.getsize(path + ".journal") == 0
+    assert bloom.measure(path, probes=1000)["measured_fp_rate"] < 0.05
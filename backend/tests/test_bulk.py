@@ -0,0 +1,114 @@
+import io
+import json
+import pytest
+from app import bulk, dynamodb_repo
+from app.dynamodb_repo import CustomerDynamoDBRepository
+
+@pytest.fixture
+def repo(ddb_table):
+    return CustomerDynamoDBRepository(table_name="customer_ids", region_name="eu-central-1")
+
+def _ids_in(table):
+    return {item["id"] for item in table.scan()["Items"]}
+
+def test_read_ids_skips_blank_lines():
+    assert list(bulk.read_ids(io.StringIO("AB_1\n\n  CD_2 \n"))) == ["AB_1", "CD_2"]
+
+def test_bulk_put_validates_dedupes_and_writes(repo, ddb_table):
+    ids = [f"id_{i:03d}" for i in range(60)] + ["id_001", "!!", "x"]
+    report = bulk.run_bulk(iter(ids), "put", repo, workers=4)
+
+    assert report["read"] == 63
+    assert report["written"] == 60
+    assert report["duplicates"] == 1
+    assert report["invalid"] == 2
+    assert report["invalid_sample"] == ["!!", "x"]
+    assert report["batches"] == 3
+    assert report["failed"] == 0
+    assert report["batch_latency"]["count"] == 3
+
+    assert _ids_in(ddb_table) == {f"id_{i:03d}" for i in range(60)}
+    assert "created_at" in ddb_table.get_item(Key={"id": "id_000"})["Item"]
+
+def test_bulk_delete(repo, ddb_table):
+    for i in range(30):
+        ddb_table.put_item(Item={"id": f"id_{i:03d}"})
+
+    report = bulk.run_bulk(iter(f"id_{i:03d}" for i in range(20)), "delete", repo, workers=2)
+
+    assert report["written"] == 20
+    assert _ids_in(ddb_table) == {f"id_{i:03d}" for i in range(20, 30)}
+
+def test_transactional_bulk_moves_the_counter_by_rows_changed(ddb_table, counter_on):
+    from app.counter import CustomerCounter, reconcile
+    repo = CustomerDynamoDBRepository()
+    repo.put("id_000")
+    ids = [f"id_{i:03d}" for i in range(150)]
+
+    # moto's in-memory backend is not thread-safe under concurrent transactions
+    report = bulk.run_bulk(iter(ids), "put", repo, workers=1, transactional=True)
+    assert report["written"] == 149 and report["unchanged"] == 1 and report["batches"] == 2
+    assert "reconcile" not in report
+    assert ddb_table.get_item(Key={"id": "id_000"})["Item"].get("created_at") is None
+
+    report = bulk.run_bulk(iter(ids[:100] + ["gone_1"]), "delete", repo, workers=1, transactional=True)
+    assert report["written"] == 100 and report["unchanged"] == 1
+    assert CustomerCounter().read() == 50
+    assert reconcile(segments=2)["drift"] == 0
+
+def test_batch_bulk_reconciles_the_counter_afterwards(ddb_table, counter_on):
+    from app.counter import CustomerCounter
+    repo = CustomerDynamoDBRepository()
+    repo.put("id_000")
+
+    report = bulk.run_bulk(iter(f"id_{i:03d}" for i in range(60)), "put", repo, workers=1)
+    assert report["batches"] == 3
+    assert report["reconcile"]["drift"] == 59 and report["reconcile"]["fixed"] is True
+    assert CustomerCounter().read() == 60
+
+    report = bulk.run_bulk(iter(f"id_{i:03d}" for i in range(10)), "delete", repo, workers=1)
+    assert report["reconcile"]["drift"] == -10
+    assert CustomerCounter().read() == 50
+
+def test_bulk_counts_failed_batches(repo, monkeypatch):
+    def boom(ids, attrs=None): raise RuntimeError("throttled")
+    monkeypatch.setattr(repo, "batch_put", boom)
+
+    report = bulk.run_bulk(iter(["AB_1", "AB_2"]), "put", repo)
+    assert report["written"] == 0
+    assert report["failed"] == 2
+
+def test_batch_write_retries_unprocessed(repo, monkeypatch):
+    monkeypatch.setattr(dynamodb_repo, "_backoff", lambda attempt: None)
+    calls = []
+
+    class FakeClient:
+        def batch_write_item(self, RequestItems):
+            calls.append(RequestItems)
+            if len(calls) == 1:
+                return {"UnprocessedItems": {"customer_ids": RequestItems["customer_ids"][1:]}}
+            return {"UnprocessedItems": {}}
+
+    class FakeMeta:
+        client = FakeClient()
+
+    class FakeTable:
+        name = "customer_ids"
+        meta = FakeMeta()
+
+    repo._table = FakeTable()
+    repo.batch_delete(["AB_1", "AB_2", "AB_3"])
+    assert [len(c["customer_ids"]) for c in calls] == [3, 2]
+
+def test_batch_write_rejects_oversized_chunk(repo):
+    with pytest.raises(ValueError):
+        repo.batch_put([f"id_{i}" for i in range(26)])
+
+def test_cli_reads_file(repo, ddb_table, tmp_path, capsys):
+    src = tmp_path / "ids.txt"
+    src.write_text("AB_1\nAB_2\n")
+
+    assert bulk.main(["put", str(src)]) == 0
+    report = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert report["written"] == 2
+    assert _ids_in(ddb_table) == {"AB_1", "AB_2"}
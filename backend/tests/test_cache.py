@@ -0,0 +1,85 @@
+import json
+import pytest
+from app.cache import TTLCache, CachedCustomerRepository
+from app.errors import AlreadyExists
+from app.logger import setup_logger
+
+class FakeClock:
+    def __init__(self): self.now = 0.0
+    def __call__(self): return self.now
+
+class CountingRepo:
+    def __init__(self, existing=()):
+        self.existing = set(existing)
+        self.reads = []
+    def exists(self, cid, consistent=True):
+        self.reads.append((cid, consistent))
+        return cid in self.existing
+    def put(self, cid, attrs=None):
+        if cid in self.existing:
+            raise AlreadyExists("id already exists")
+        self.existing.add(cid)
+    def delete(self, cid):
+        self.existing.discard(cid)
+        return {"id": cid}
+    def exists_many(self, ids):
+        return {cid: cid in self.existing for cid in ids}
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def repo():
+    return CountingRepo({"AB_1"})
+
+@pytest.fixture
+def cached(repo, clock):
+    return CachedCustomerRepository(repo, TTLCache(2, clock=clock), positive_ttl=10, negative_ttl=1,
+                                    consistent_on_miss=False)
+
+def test_cache_hits_and_separate_ttls(cached, repo, clock):
+    assert cached.exists("AB_1") is True
+    assert cached.exists("CD_2") is False
+    assert cached.exists("AB_1") is True
+    assert cached.exists("CD_2") is False
+    assert len(repo.reads) == 2
+
+    clock.now = 2
+    assert cached.exists("AB_1") is True
+    assert cached.exists("CD_2") is False
+    assert [cid for cid, _ in repo.reads] == ["AB_1", "CD_2", "CD_2"]
+    assert all(consistent is False for _, consistent in repo.reads)
+
+def test_lru_bound_evicts_oldest(cached, repo):
+    for cid in ("AB_1", "CD_2", "AB_1", "EF_3"):
+        cached.exists(cid)
+    cached.exists("AB_1")
+    cached.exists("CD_2")
+    assert [cid for cid, _ in repo.reads] == ["AB_1", "CD_2", "EF_3", "CD_2"]
+    assert cached._cache.stats()["cache_evictions"] == 2
+
+def test_put_and_delete_invalidate(cached, repo):
+    assert cached.exists("CD_2") is False
+    cached.put("CD_2")
+    assert cached.exists("CD_2") is True
+
+    cached.delete("CD_2")
+    assert cached.exists("CD_2") is False
+    assert len(repo.reads) == 3
+
+def test_failed_put_still_invalidates(cached):
+    cached._cache.set("AB_1", False, 10)
+    with pytest.raises(AlreadyExists):
+        cached.put("AB_1")
+    assert cached.exists("AB_1") is True
+
+def test_delegates_other_methods(cached):
+    assert cached.exists_many(["AB_1", "ZZ_9"]) == {"AB_1": True, "ZZ_9": False}
+
+def test_stats_fields_are_emitted_in_json_logs(capsys):
+    logger = setup_logger("cache_stats_test")
+    logger.info("get ok", extra={"fields": {"cache_hits": 3, "cache_misses": 1}})
+    line = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert line["message"] == "get ok"
+    assert line["cache_hits"] == 3 and line["cache_misses"] == 1
@@ -0,0 +1,82 @@
+import gzip
+import json
+import pytest
+from app.changelog import ADD, REMOVE, Changelog, CheckpointCompacted, LocalStore, S3Store, compact_changes
+from lambdas.append_changelog import handler as append_module
+
+def _stream(*changes):
+    names = {ADD: "INSERT", REMOVE: "REMOVE"}
+    return {"Records": [{"eventName": names[op], "dynamodb": {"Keys": {"id": {"S": cid}},
+                                                            "ApproximateCreationDateTime": 1700000000 + i}}
+                        for i, (op, cid) in enumerate(changes)]}
+
+@pytest.fixture
+def log(tmp_path):
+    return Changelog(LocalStore(str(tmp_path / "changelog")))
+
+def test_batch_is_compacted_to_last_op_per_id():
+    records = compact_changes([(ADD, "AB_1", 1), (ADD, "AB_2", 2), (REMOVE, "AB_1", 3)])
+    assert [(r["op"], r["id"]) for r in records] == [(ADD, "AB_2"), (REMOVE, "AB_1")]
+
+def test_consumer_appends_gzip_ndjson_segments(log, monkeypatch, tmp_path):
+    monkeypatch.setattr(append_module, "changelog", log)
+
+    assert append_module.handler(_stream((ADD, "AB_1"), (ADD, "AB_2")), None) == {"segment": 1, "records": 2}
+    assert append_module.handler({"Records": [{"eventName": "MODIFY"}]}, None) == {"segment": None, "records": 0}
+    assert append_module.handler(_stream((REMOVE, "AB_1"), (ADD, "AB_3")), None)["segment"] == 2
+
+    raw = (tmp_path / "changelog" / "00000000000000000001.ndjson.gz").read_bytes()
+    first = json.loads(gzip.decompress(raw).decode().splitlines()[0])
+    assert first == {"op": "add", "id": "AB_1", "ts": 1700000000}
+
+def test_ids_at_any_checkpoint_and_changes_since(log):
+    log.append([{"op": ADD, "id": "AB_1", "ts": None}, {"op": ADD, "id": "AB_2", "ts": None}])
+    log.append([{"op": REMOVE, "id": "AB_1", "ts": None}])
+    log.append([{"op": ADD, "id": "AB_3", "ts": None}])
+
+    assert log.ids_at(1) == ({"AB_1", "AB_2"}, 1)
+    assert log.ids_at(2) == ({"AB_2"}, 2)
+    assert log.ids_at() == ({"AB_2", "AB_3"}, 3)
+    assert log.ids_at(99) == ({"AB_2", "AB_3"}, 3)
+    assert [n for n, _ in log.changes_since(1)] == [2, 3]
+
+def test_concurrent_writer_never_overwrites_a_segment(log):
+    other = Changelog(log.store)
+    assert log.append([{"op": ADD, "id": "AB_1", "ts": None}]) == 1
+    assert other.append([{"op": ADD, "id": "AB_2", "ts": None}]) == 2
+    assert log.store.create("00000000000000000002.ndjson.gz", b"x") is False
+    assert log.ids_at()[0] == {"AB_1", "AB_2"}
+
+def test_compaction_folds_old_segments_into_base(log):
+    for i in range(5):
+        log.append([{"op": ADD, "id": f"AB_{i}", "ts": None}])
+    log.append([{"op": REMOVE, "id": "AB_0", "ts": None}])
+
+    report = log.compact(keep=2)
+
+    assert report == {"base": 4, "folded": 4, "ids": 4}
+    assert sorted(log.store.list()) == ["00000000000000000005.ndjson.gz", "00000000000000000006.ndjson.gz",
+                                        "base-00000000000000000004.ndjson.gz"]
+    assert log.ids_at()[0] == {"AB_1", "AB_2", "AB_3", "AB_4"}
+    assert log.ids_at(5)[0] == {"AB_0", "AB_1", "AB_2", "AB_3", "AB_4"}
+    with pytest.raises(CheckpointCompacted):
+        log.ids_at(3)
+    with pytest.raises(CheckpointCompacted):
+        list(log.changes_since(2))
+    assert log.append([{"op": ADD, "id": "AB_9", "ts": None}]) == 7
+
+def test_s3_store_uses_conditional_create(aws_env):
+    moto = pytest.importorskip("moto")
+    import boto3
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="eu-central-1")
+        client.create_bucket(Bucket="ids-changelog", CreateBucketConfiguration={"LocationConstraint": "eu-central-1"})
+        log = Changelog(S3Store("ids-changelog", "prod/changelog", client))
+
+        assert log.append([{"op": ADD, "id": "AB_1", "ts": None}]) == 1
+        assert log.store.create("00000000000000000001.ndjson.gz", b"x") is False
+        log.append([{"op": ADD, "id": "AB_2", "ts": None}])
+        log.compact(keep=1)
+        assert log.ids_at() == ({"AB_1", "AB_2"}, 2)
+        assert sorted(o["Key"] for o in client.list_objects_v2(Bucket="ids-changelog")["Contents"]) == [
+            "prod/changelog/00000000000000000002.ndjson.gz", "prod/changelog/base-00000000000000000001.ndjson.gz"]
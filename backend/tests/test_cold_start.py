@@ -0,0 +1,26 @@
+import os
+import pytest
+from bench import cold_start
+
+# wall-clock budgets depend on the machine, so they are opt-in (COLD_START_BUDGETS=1) for a
+# dedicated runner; the default suite only checks what holds everywhere
+BUDGETS = os.getenv("COLD_START_BUDGETS", "").lower() in ("1", "true", "yes")
+IMPORT_BUDGET_MS = float(os.getenv("COLD_START_IMPORT_BUDGET_MS", "250"))
+FIRST_INVOCATION_BUDGET_MS = float(os.getenv("COLD_START_FIRST_INVOCATION_BUDGET_MS", "2000"))
+
+pytest.importorskip("moto")
+
+@pytest.mark.parametrize("name", cold_start.handler_names())
+def test_handler_defers_boto3_until_first_call(name):
+    res = cold_start.measure(name)
+
+    assert res["error"] is None
+    assert res["boto3_at_import"] is False, f"{name} imports boto3 at module import time"
+
+@pytest.mark.skipif(not BUDGETS, reason="set COLD_START_BUDGETS=1 to check wall-clock budgets")
+@pytest.mark.parametrize("name", cold_start.handler_names())
+def test_handler_cold_start_budget(name):
+    res = cold_start.measure(name)
+
+    assert res["import_ms"] < IMPORT_BUDGET_MS, res
+    assert res["first_invocation_ms"] < FIRST_INVOCATION_BUDGET_MS, res
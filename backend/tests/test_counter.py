@@ -0,0 +1,55 @@
+import pytest
+from app.counter import CustomerCounter, reconcile
+from app.dynamodb_repo import CustomerDynamoDBRepository
+from app.errors import AlreadyExists, NotFound
+from lambdas.count_customer_ids import handler as count_module
+
+@pytest.fixture
+def repo(ddb_table, counter_on):
+    return CustomerDynamoDBRepository()
+
+@pytest.fixture
+def counter(ddb_table):
+    return CustomerCounter(shards=4)
+
+def test_put_and_delete_keep_the_count_exact(repo, counter, monkeypatch):
+    monkeypatch.setattr("app.config.COUNTER_SHARDS", 4)
+    for i in range(12):
+        repo.put(f"id_{i}")
+    with pytest.raises(AlreadyExists):
+        repo.put("id_3")
+    repo.delete("id_0")
+    with pytest.raises(NotFound):
+        repo.delete("id_0")
+    assert counter.read() == 11
+
+def test_reconcile_reports_and_fixes_drift(repo, counter, ddb_table, monkeypatch):
+    monkeypatch.setattr("app.config.COUNTER_SHARDS", 4)
+    repo.put("id_a")
+    repo.batch_put(["id_b", "id_c", "id_d"])  # BatchWriteItem bypasses the counter
+
+    report = reconcile(counter, repo, segments=3, workers=3)
+    assert report["scanned"] == 4 and report["counter"] == 1 and report["drift"] == 3
+    assert report["fixed"] is False
+
+    assert reconcile(counter, repo, segments=3, workers=3, fix=True)["fixed"] is True
+    assert counter.read() == 4
+    assert reconcile(counter, repo, segments=3)["drift"] == 0
+
+class FakeCounter:
+    def __init__(self):
+        self.reads = 0
+
+    def read(self):
+        self.reads += 1
+        return 42
+
+def test_count_endpoint_is_cached(monkeypatch, extract_status_and_body):
+    fake = FakeCounter()
+    monkeypatch.setattr(count_module, "counter", fake)
+    count_module._cache.clear()
+
+    for _ in range(3):
+        status, body = extract_status_and_body(count_module.handler({}, None))
+        assert status == 200 and body == {"count": 42}
+    assert fake.reads == 1
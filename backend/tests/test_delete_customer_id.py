@@ -28,12 +28,12 @@ def _unwrap(resp):
 
 # ----- Dummy repos -----
 class RepoDeleteOK:
-    def exists(self, _id): return True
-    def delete(self, _id): return None
+    def exists(self, _id): raise AssertionError("delete must not pre-read")
+    def delete(self, _id): return {"id": _id, "created_at": "2025-01-01T00:00:00Z"}
 
-class RepoNotFoundOnExists:
-    def exists(self, _id): return False
-    def delete(self, _id): raise AssertionError("should not be called")
+class RepoNotFoundNoPreRead:
+    def exists(self, _id): raise AssertionError("delete must not pre-read")
+    def delete(self, _id): raise del_module.NotFound("no such customer")
 
 class RepoDeleteRaisesNotFound:
     def exists(self, _id): return True
@@ -83,9 +83,9 @@ def test_delete_success_via_header(monkeypatch, del_event_header):
     assert "deleted" in body.get("message", "").lower()
     assert "ab_123" in body.get("message", "").lower()
 
-def test_delete_not_found_when_exists_false(monkeypatch, del_event_path):
+def test_delete_not_found_without_pre_read(monkeypatch, del_event_path):
     monkeypatch.setattr(del_module, "validate_id", _stub_validate_identity)
-    monkeypatch.setattr(del_module, "repo", RepoNotFoundOnExists())
+    monkeypatch.setattr(del_module, "repo", RepoNotFoundNoPreRead())
 
     resp = del_module.handler(del_event_path, context=None)
     status, body = _unwrap(resp)
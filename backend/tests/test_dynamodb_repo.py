@@ -0,0 +1,85 @@
+import pytest
+from app import dynamodb_repo
+from app.dynamodb_repo import CustomerDynamoDBRepository
+from app.errors import AlreadyExists, NotFound
+
+@pytest.fixture
+def repo(ddb_table):
+    return CustomerDynamoDBRepository(table_name="customer_ids", region_name="eu-central-1")
+
+def test_put_exists_delete_roundtrip(repo):
+    repo.put("AB_123")
+    assert repo.exists("AB_123") is True
+    with pytest.raises(AlreadyExists):
+        repo.put("AB_123")
+
+    repo.delete("AB_123")
+    assert repo.exists("AB_123") is False
+    with pytest.raises(NotFound):
+        repo.delete("AB_123")
+
+def test_exists_many_chunks_and_dedupes(repo, ddb_table, monkeypatch):
+    monkeypatch.setattr(dynamodb_repo, "BATCH_GET_MAX_KEYS", 3)
+    for cid in ("id_0", "id_4", "id_7"):
+        ddb_table.put_item(Item={"id": cid})
+
+    ids = [f"id_{i}" for i in range(8)] + ["id_4"]
+    res = repo.exists_many(ids)
+
+    assert list(res) == [f"id_{i}" for i in range(8)]
+    assert {cid for cid, found in res.items() if found} == {"id_0", "id_4", "id_7"}
+
+def test_exists_many_retries_unprocessed_keys(repo, monkeypatch):
+    monkeypatch.setattr(dynamodb_repo, "_backoff", lambda attempt: None)
+    responses = [
+        {"Responses": {"customer_ids": [{"id": "AB_1"}]},
+         "UnprocessedKeys": {"customer_ids": {"Keys": [{"id": "AB_2"}]}}},
+        {"Responses": {"customer_ids": [{"id": "AB_2"}]}, "UnprocessedKeys": {}},
+    ]
+    calls = []
+
+    class FakeDDB:
+        def batch_get_item(self, RequestItems):
+            calls.append(RequestItems)
+            return responses.pop(0)
+
+    repo._ddb = FakeDDB()
+    assert repo.exists_many(["AB_1", "AB_2", "AB_3"]) == {"AB_1": True, "AB_2": True, "AB_3": False}
+    assert calls[0]["customer_ids"]["ProjectionExpression"] == "#id"
+    assert calls[1] == {"customer_ids": {"Keys": [{"id": "AB_2"}]}}
+
+def test_delete_returns_old_attributes_in_single_call(repo, ddb_table):
+    ddb_table.put_item(Item={"id": "AB_123", "created_at": "2025-01-01T00:00:00Z"})
+
+    assert repo.delete("AB_123") == {"id": "AB_123", "created_at": "2025-01-01T00:00:00Z"}
+    assert "Item" not in ddb_table.get_item(Key={"id": "AB_123"})
+
+@pytest.fixture
+def counted(ddb_table):
+    return CustomerDynamoDBRepository(counter_table="customer_ids_meta")
+
+def test_put_many_if_absent_reports_existing_and_writes_the_rest(counted, ddb_table):
+    from app.counter import CustomerCounter
+    repo = counted
+    ddb_table.put_item(Item={"id": "AB_2", "created_at": "old"})
+
+    res = repo.put_many_if_absent(["AB_1", "AB_2", "AB_3", "AB_1"], {"created_at": "new"})
+
+    assert res == {"AB_1": "created", "AB_2": "exists", "AB_3": "created"}
+    assert ddb_table.get_item(Key={"id": "AB_2"})["Item"]["created_at"] == "old"
+    assert ddb_table.get_item(Key={"id": "AB_3"})["Item"]["created_at"] == "new"
+    assert CustomerCounter().read() == 2
+
+def test_delete_many_if_present_reports_missing_and_moves_the_counter(counted, ddb_table):
+    from app.counter import CustomerCounter
+    repo = counted
+    repo.put("AB_1")
+    repo.put("AB_2")
+
+    assert repo.delete_many_if_present(["AB_1", "AB_9", "AB_2"]) == {"AB_1": "deleted", "AB_9": "missing", "AB_2": "deleted"}
+    assert "Item" not in ddb_table.get_item(Key={"id": "AB_1"})
+    assert CustomerCounter().read() == 0
+
+def test_put_many_if_absent_limits_transaction_size(repo):
+    with pytest.raises(ValueError):
+        repo.put_many_if_absent([f"id_{i}" for i in range(dynamodb_repo.PUT_MANY_MAX_IDS + 1)])
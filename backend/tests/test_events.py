@@ -0,0 +1,46 @@
+import json
+from app import events
+
+def _entry(detail_bytes):
+    return {"Source": "src", "DetailType": "dt", "Detail": json.dumps({"pad": "x" * detail_bytes})}
+
+def test_batches_respect_entry_count():
+    indexed = list(enumerate(_entry(10) for _ in range(21)))
+    assert [len(b) for b in events.batches(indexed)] == [10, 10, 1]
+
+def test_batches_respect_size_cap():
+    indexed = list(enumerate(_entry(100 * 1024) for _ in range(5)))
+    assert [len(b) for b in events.batches(indexed)] == [2, 2, 1]
+    for batch in events.batches(indexed):
+        assert sum(events.entry_size(e) for _, e in batch) <= events.PUT_EVENTS_MAX_BYTES
+
+def test_oversized_entry_is_not_sent():
+    class Client:
+        calls = 0
+        def put_events(self, Entries):
+            self.calls += 1
+            return {"Entries": [{"EventId": "e"} for _ in Entries]}
+
+    client = Client()
+    res = events.put_events_batched(client, [_entry(300 * 1024), _entry(10)])
+    assert res[0]["ErrorCode"] == "EntryTooLarge"
+    assert res[1] == {"EventId": "e"}
+    assert client.calls == 1
+
+def test_raising_batch_is_failed_and_the_rest_still_sent():
+    from botocore.exceptions import ClientError
+
+    class Client:
+        calls = 0
+        def put_events(self, Entries):
+            self.calls += 1
+            if self.calls == 2:
+                raise ClientError({"Error": {"Code": "AccessDeniedException", "Message": "no"}}, "PutEvents")
+            return {"Entries": [{"EventId": f"e{self.calls}"} for _ in Entries]}
+
+    client = Client()
+    res = events.put_events_batched(client, [_entry(10) for _ in range(25)])
+    assert client.calls == 3
+    assert res[:10] == [{"EventId": "e1"}] * 10
+    assert {r["ErrorCode"] for r in res[10:20]} == {"AccessDeniedException"}
+    assert res[20:] == [{"EventId": "e3"}] * 5
@@ -0,0 +1,61 @@
+import json
+import pytest
+from lambdas.exists_customer_ids import handler as exists_module
+
+class RepoSome:
+    def __init__(self, existing):
+        self.existing = set(existing)
+        self.calls = []
+    def exists_many(self, ids):
+        self.calls.append(list(ids))
+        return {cid: cid in self.existing for cid in ids}
+
+class RepoCrash:
+    def exists_many(self, ids): raise RuntimeError("db error")
+
+def _event(body):
+    return {"httpMethod": "POST", "resource": "/customers/exists", "body": json.dumps(body)}
+
+def test_exists_batch_ok(monkeypatch, extract_status_and_body):
+    repo = RepoSome({"AB_123"})
+    monkeypatch.setattr(exists_module, "repo", repo)
+
+    resp = exists_module.handler(_event({"ids": ["AB_123", "CD_456"]}), context=None)
+    status, body = extract_status_and_body(resp)
+
+    assert status == 200
+    assert body["results"] == {"AB_123": True, "CD_456": False}
+    assert repo.calls == [["AB_123", "CD_456"]]
+
+@pytest.mark.parametrize("body", [{}, {"ids": []}, {"ids": "AB_123"}])
+def test_exists_batch_missing_ids(monkeypatch, extract_status_and_body, body):
+    monkeypatch.setattr(exists_module, "repo", RepoCrash())
+
+    status, body = extract_status_and_body(exists_module.handler(_event(body), context=None))
+    assert status == 400
+    assert "error" in body
+
+def test_exists_batch_invalid_ids(monkeypatch, extract_status_and_body):
+    monkeypatch.setattr(exists_module, "repo", RepoCrash())
+
+    resp = exists_module.handler(_event({"ids": ["AB_123", "!!", None]}), context=None)
+    status, body = extract_status_and_body(resp)
+
+    assert status == 400
+    assert body["invalid"] == ["!!", None]
+    assert [(r["index"], r["reason"]) for r in body["rejected"]] == [(1, "too_short"), (2, "missing")]
+
+def test_exists_batch_too_many(monkeypatch, extract_status_and_body):
+    monkeypatch.setattr(exists_module, "EXISTS_BATCH_MAX_IDS", 2)
+    monkeypatch.setattr(exists_module, "repo", RepoCrash())
+
+    resp = exists_module.handler(_event({"ids": ["AB_1", "AB_2", "AB_3"]}), context=None)
+    status, _ = extract_status_and_body(resp)
+    assert status == 400
+
+def test_exists_batch_repo_crash(monkeypatch, extract_status_and_body):
+    monkeypatch.setattr(exists_module, "repo", RepoCrash())
+
+    status, body = extract_status_and_body(exists_module.handler(_event({"ids": ["AB_123"]}), context=None))
+    assert status == 500
+    assert "error" in body
@@ -0,0 +1,30 @@
+import io
+import json
+from app.dynamodb_repo import CustomerDynamoDBRepository
+from app.export import export_ndjson
+
+def test_parallel_scan_exports_every_id_once(ddb_table):
+    with ddb_table.batch_writer() as batch:
+        for i in range(120):
+            batch.put_item(Item={"id": f"id_{i:04d}", "created_at": "2024-01-01"})
+
+    out = io.StringIO()
+    report = export_ndjson(out, CustomerDynamoDBRepository(), segments=4, workers=2, page_size=7)
+
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert sorted(line["id"] for line in lines) == [f"id_{i:04d}" for i in range(120)]
+    assert all(set(line) == {"id"} for line in lines)
+    assert report["ids"] == 120 and report["failed_segments"] == []
+    assert report["pages"] >= 120 // 7
+
+class HalfBroken:
+    def scan_segment(self, segment, total, page_size):
+        if segment == 1:
+            raise RuntimeError("boom")
+        yield [f"s{segment}"]
+
+def test_failed_segments_are_reported():
+    out = io.StringIO()
+    report = export_ndjson(out, HalfBroken(), segments=3, workers=3)
+    assert report["failed_segments"] == [1]
+    assert sorted(json.loads(line)["id"] for line in out.getvalue().splitlines()) == ["s0", "s2"]
@@ -0,0 +1,94 @@
+import base64
+import json
+import pytest
+from app.http import (CORS_HEADERS, ERROR_BODY, EXISTS_BODY, Request, _UNROLLED, _getter_loop, _json_backend,
+                      body_template, id_extractor, parse_body, resp, resp_body)
+
+def test_header_lookup_is_case_insensitive():
+    req = Request({"headers": {"Content-Type": "application/json", "iD": "AB_1"}})
+    assert req.header("content-type") == "application/json"
+    assert req.header("ID") == "AB_1"
+    assert req.header("missing", "x") == "x"
+
+def test_body_is_decoded_once_and_cached():
+    raw = base64.b64encode(json.dumps({"id": "AB_1"}).encode()).decode()
+    req = Request({"body": raw, "isBase64Encoded": True})
+    first = req.json
+    assert first == {"id": "AB_1"}
+    assert req.json is first
+
+@pytest.mark.parametrize("event", [
+    {"body": "not json"},
+    {"body": "!!!", "isBase64Encoded": True},
+    {"body": None},
+    {},
+])
+def test_bad_or_missing_body_parses_to_empty(event):
+    assert Request(event).json == {}
+    assert parse_body(event) == {}
+
+def test_non_dict_event_is_empty_request():
+    req = Request("not-a-dict")
+    assert req.path_params == {} and req.query == {} and req.header("id") is None
+
+@pytest.mark.parametrize("sources,event,expected", [
+    (("path", "header", "query"), {"pathParameters": {"id": "P"}, "headers": {"id": "H"}}, "P"),
+    (("path", "header", "query"), {"pathParameters": None, "headers": {"Id": "H"}}, "H"),
+    (("path", "header", "query"), {"queryStringParameters": {"id": "Q"}}, "Q"),
+    (("body", "path"), {"body": json.dumps({"id": "B"}), "pathParameters": {"id": "P"}}, "B"),
+    (("root", "detail"), {"detail": {"id": "D"}}, "D"),
+    (("root", "detail"), {"id": "R", "detail": {"id": "D"}}, "R"),
+    (("path", "header"), {"queryStringParameters": {"id": "Q"}}, None),
+])
+def test_id_extractor_source_order(sources, event, expected):
+    assert id_extractor(*sources)(Request(event)) == expected
+
+_ID_EVENTS = [
+    {}, {"id": "R"}, {"detail": {"id": "D"}}, {"detail": None, "pathParameters": {"id": ""}},
+    {"pathParameters": {"id": "P"}, "headers": {"iD": "H"}}, {"headers": {"Id": "H"}, "queryStringParameters": {"id": "Q"}},
+    {"headers": None, "queryStringParameters": {"id": "Q"}}, {"headers": {"id": ""}, "body": "[1]"},
+    {"body": json.dumps({"id": "B"}), "pathParameters": {"id": "P"}},
+    {"body": base64.b64encode(b'{"id": "B64"}').decode(), "isBase64Encoded": True},
+]
+
+@pytest.mark.parametrize("sources", list(_UNROLLED))
+def test_unrolled_extractors_match_the_getter_loop(sources):
+    loop = _getter_loop(sources)
+    assert id_extractor(*sources) is _UNROLLED[sources]
+    for event in _ID_EVENTS:
+        assert id_extractor(*sources)(event) == loop(event), event
+        assert id_extractor(*sources)(Request(event)) == loop(Request(event)), event
+    assert id_extractor(*sources)("not-an-event") is None
+
+def test_unknown_source_fails_at_build_time():
+    with pytest.raises(KeyError):
+        id_extractor("cookie")
+
+@pytest.mark.parametrize("values", [
+    (True, "AB_1"), (False, "AB_1"), (None, 7), ("é", 'q"\\'), ("tab\there", "ctl\x01"), (1.5, [1, {"a": 2}]),
+])
+def test_body_template_matches_json_dumps(values):
+    encode = body_template("exists", "id")
+    assert encode(*values) == json.dumps(dict(zip(("exists", "id"), values)))
+
+def test_body_template_any_arity_matches_json_dumps():
+    keys = ("a", "b", "c")
+    assert body_template(*keys)(1, "x", None) == json.dumps({"a": 1, "b": "x", "c": None})
+    assert body_template("only")("é") == json.dumps({"only": "é"})
+    with pytest.raises(TypeError):
+        body_template(*keys)(1, 2)
+
+def test_resp_body_matches_resp():
+    assert resp_body(200, EXISTS_BODY(True, "AB_1")) == resp(200, {"exists": True, "id": "AB_1"})
+    extra = {"Retry-After": "1"}
+    assert resp_body(503, ERROR_BODY("x"), extra) == resp(503, {"error": "x"}, extra)
+
+def test_resp_headers_are_not_shared():
+    r = resp(200, {})
+    r["headers"]["X-Test"] = "1"
+    assert "X-Test" not in CORS_HEADERS and "X-Test" not in resp(200, {})["headers"]
+
+def test_orjson_backend_is_opt_in():
+    assert _json_backend("stdlib") is json.dumps
+    payload = {"results": {"AB_1": True}}
+    assert json.loads(_json_backend("orjson")(payload)) == payload
@@ -0,0 +1,130 @@
+import json
+import pytest
+from app import idempotency
+from app.idempotency import IdempotencyStore
+from lambdas.put_customer_id import handler as put_module
+from lambdas.submit_customer_id import handler as submit_module
+
+@pytest.fixture
+def store(ddb_table, monkeypatch):
+    import boto3
+    boto3.client("dynamodb", region_name="eu-central-1").create_table(
+        TableName="customer_ids_idempotency",
+        KeySchema=[{"AttributeName": "key", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "key", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    s = IdempotencyStore(table_name="customer_ids_idempotency", region_name="eu-central-1")
+    monkeypatch.setattr(idempotency, "store", s)
+    return s
+
+class CountingRepo:
+    def __init__(self):
+        self.puts = []
+
+    def put(self, cid):
+        self.puts.append(cid)
+
+def _put_event(cid, key=None):
+    return {"httpMethod": "PUT", "path": f"/customers/{cid}", "pathParameters": {"id": cid},
+            "headers": {"Idempotency-Key": key} if key else {}, "body": None}
+
+def test_retried_put_is_replayed_not_conflict(store, monkeypatch):
+    repo = CountingRepo()
+    monkeypatch.setattr(put_module, "repo", repo)
+
+    first = put_module.handler(_put_event("AB_1", "k-1"), None)
+    store.cache.clear()  # force the second lookup through DynamoDB
+    second = put_module.handler(_put_event("AB_1", "k-1"), None)
+
+    assert first["statusCode"] == second["statusCode"] == 201
+    assert second["body"] == first["body"]
+    assert second["headers"]["Idempotent-Replayed"] == "true"
+    assert repo.puts == ["AB_1"]
+
+def test_replay_is_served_from_the_lru(store, monkeypatch):
+    monkeypatch.setattr(put_module, "repo", CountingRepo())
+    put_module.handler(_put_event("AB_1", "k-1"), None)
+    monkeypatch.setattr(store, "_table", None)  # any table call would now fail
+    assert put_module.handler(_put_event("AB_1", "k-1"), None)["statusCode"] == 201
+    assert store.cache.hits == 1
+
+def test_key_reused_for_a_different_request_is_rejected(store, monkeypatch):
+    monkeypatch.setattr(put_module, "repo", CountingRepo())
+    put_module.handler(_put_event("AB_1", "k-1"), None)
+    assert put_module.handler(_put_event("AB_2", "k-1"), None)["statusCode"] == 422
+
+def test_concurrent_retry_sees_in_progress(store):
+    fp = "f" * 64
+    assert store.begin("put_customer_id#k-1", fp) is None
+    with pytest.raises(idempotency.IdempotencyInProgress):
+        store.begin("put_customer_id#k-1", fp)
+
+def test_server_errors_release_the_key(store, monkeypatch):
+    class Broken:
+        def put(self, cid):
+            raise RuntimeError("boom")
+    monkeypatch.setattr(put_module, "repo", Broken())
+    assert put_module.handler(_put_event("AB_1", "k-1"), None)["statusCode"] == 500
+
+    repo = CountingRepo()
+    monkeypatch.setattr(put_module, "repo", repo)
+    assert put_module.handler(_put_event("AB_1", "k-1"), None)["statusCode"] == 201
+    assert repo.puts == ["AB_1"]
+
+def test_without_header_every_call_runs(store, monkeypatch):
+    repo = CountingRepo()
+    monkeypatch.setattr(put_module, "repo", repo)
+    put_module.handler(_put_event("AB_1"), None)
+    put_module.handler(_put_event("AB_1"), None)
+    assert repo.puts == ["AB_1", "AB_1"]
+
+def test_retried_submit_emits_one_event(store, monkeypatch):
+    calls = []
+    class Events:
+        def put_events(self, Entries):
+            calls.append(Entries)
+            return {"FailedEntryCount": 0, "Entries": [{"EventId": "evt-1"}]}
+    monkeypatch.setattr(submit_module, "events", Events())
+    event = {"httpMethod": "POST", "body": json.dumps({"id": "AB_1"}),
+             "headers": {"idempotency-key": "sub-1"}}
+
+    first = submit_module.handler(event, None)
+    second = submit_module.handler(event, None)
+
+    assert first["statusCode"] == second["statusCode"] == 202
+    assert len(calls) == 1
+
+def test_key_reused_with_a_different_header_id_is_rejected(store, monkeypatch):
+    monkeypatch.setattr(put_module, "repo", CountingRepo())
+    def event(cid):
+        return {"httpMethod": "PUT", "path": "/customers", "pathParameters": None,
+                "headers": {"Idempotency-Key": "k-1", "id": cid}, "body": None}
+    assert put_module.handler(event("AB_1"), None)["statusCode"] == 201
+    assert put_module.handler(event("AB_2"), None)["statusCode"] == 422
+
+def test_missing_store_table_runs_without_idempotency(ddb_table, monkeypatch):
+    # no idempotency table in this account: the store call fails for good
+    monkeypatch.setattr(idempotency, "store", IdempotencyStore(table_name="customer_ids_idempotency",
+                                                               region_name="eu-central-1"))
+    repo = CountingRepo()
+    monkeypatch.setattr(put_module, "repo", repo)
+    assert put_module.handler(_put_event("AB_1", "k-1"), None)["statusCode"] == 201
+    assert repo.puts == ["AB_1"]
+
+def test_throttled_store_is_503(store, monkeypatch):
+    from botocore.exceptions import ClientError
+    from app import retry
+    from app.retry import RetryPolicy, TokenBucket
+    monkeypatch.setattr(retry, "backoff", lambda *a: None)
+    class Throttling:
+        def put_item(self, **kwargs):
+            raise ClientError({"Error": {"Code": "ThrottlingException", "Message": "slow down"}}, "PutItem")
+    monkeypatch.setattr(store, "_table", Throttling())
+    monkeypatch.setattr(store, "_retry", RetryPolicy(TokenBucket(sleep=lambda s: None), max_attempts=2))
+    repo = CountingRepo()
+    monkeypatch.setattr(put_module, "repo", repo)
+
+    response = put_module.handler(_put_event("AB_1", "k-1"), None)
+    assert response["statusCode"] == 503 and response["headers"]["Retry-After"] == "1"
+    assert repo.puts == []
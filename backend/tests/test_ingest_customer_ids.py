@@ -0,0 +1,102 @@
+import json
+from app.local_queue import LocalQueue
+from lambdas.ingest_customer_ids import handler as ingest_module
+
+class RepoOK:
+    def __init__(self, existing=()):
+        self.calls = []
+        self.ids = set(existing)
+
+    def put_many_if_absent(self, ids, attrs=None):
+        self.calls.append(list(ids))
+        out = {cid: "exists" if cid in self.ids else "created" for cid in ids}
+        self.ids.update(ids)
+        return out
+
+class RepoFailsFor(RepoOK):
+    def __init__(self, bad):
+        super().__init__()
+        self.bad = bad
+
+    def put_many_if_absent(self, ids, attrs=None):
+        if self.bad in ids:
+            raise RuntimeError("transaction failed")
+        return super().put_many_if_absent(ids, attrs)
+
+def _record(mid, body):
+    return {"messageId": mid, "body": body if isinstance(body, str) else json.dumps(body)}
+
+def test_writes_batch_once_and_reports_no_failures(monkeypatch):
+    repo = RepoOK(existing={"AB_2"})
+    monkeypatch.setattr(ingest_module, "repo", repo)
+    event = {"Records": [
+        _record("m1", {"detail": {"id": "AB_1"}}),   # EventBridge event as the rule delivers it
+        _record("m2", {"id": "AB_2"}),
+        _record("m3", {"detail": {"id": "AB_1"}}),
+    ]}
+
+    assert ingest_module.handler(event, None) == {"batchItemFailures": []}
+    assert repo.calls == [["AB_1", "AB_2"]]
+
+def test_invalid_messages_are_dropped_not_redelivered(monkeypatch):
+    repo = RepoOK()
+    monkeypatch.setattr(ingest_module, "repo", repo)
+    event = {"Records": [_record("m1", "not json"), _record("m2", {"id": "!!"}),
+                         _record("m3", {"detail": {}}), _record("m4", {"id": "AB_123"})]}
+
+    assert ingest_module.handler(event, None) == {"batchItemFailures": []}
+    assert repo.calls == [["AB_123"]]
+
+def test_failed_chunk_reports_only_its_messages(monkeypatch):
+    monkeypatch.setattr(ingest_module, "PUT_MANY_MAX_IDS", 2)
+    monkeypatch.setattr(ingest_module, "repo", RepoFailsFor("AB_3"))
+    event = {"Records": [_record(f"m{i}", {"id": f"AB_{i}"}) for i in range(1, 5)]
+             + [_record("m5", {"id": "AB_3"})]}
+
+    res = ingest_module.handler(event, None)
+    assert sorted(f["itemIdentifier"] for f in res["batchItemFailures"]) == ["m3", "m4", "m5"]
+
+def test_local_queue_redelivers_failures_until_dead_letter(monkeypatch):
+    monkeypatch.setattr(ingest_module, "repo", RepoFailsFor("AB_bad"))
+    queue = LocalQueue(max_receive_count=3)
+    for cid in ("AB_1", "AB_2", "AB_bad"):
+        queue.send_events([{"Source": "customers.api", "DetailType": "Customer.Submitted",
+                            "Detail": json.dumps({"id": cid})}])
+
+    report = queue.drain(ingest_module.handler, batch_size=1)
+
+    assert report["invocations"] == 5
+    assert report["redelivered"] == 2
+    assert [json.loads(m["body"])["detail"]["id"] for m in queue.dead_letters] == ["AB_bad"]
+    assert len(queue) == 0
+    assert ingest_module.repo.ids == {"AB_1", "AB_2"}
+
+def test_local_queue_fails_whole_batch_on_exception():
+    queue = LocalQueue(max_receive_count=2)
+    queue.send({"id": "AB_1"})
+    queue.send({"id": "AB_2"})
+
+    def boom(event, context):
+        assert [r["eventSource"] for r in event["Records"]] == ["aws:sqs", "aws:sqs"]
+        raise RuntimeError("boom")
+
+    report = queue.drain(boom)
+    assert (report["invocations"], report["redelivered"], report["dead_lettered"]) == (2, 2, 2)
+
+def test_end_to_end_against_dynamodb(ddb_table, counter_on):
+    from app.counter import CustomerCounter
+    from app.dynamodb_repo import CustomerDynamoDBRepository
+    ingest_module.repo = repo = CustomerDynamoDBRepository()
+    try:
+        repo.put("AB_0")
+        queue = LocalQueue()
+        for i in range(150):
+            queue.send({"id": f"AB_{i % 120}"})
+
+        report = queue.drain(ingest_module.handler, batch_size=100)
+
+        assert (report["invocations"], report["redelivered"]) == (2, 0)
+        assert ddb_table.scan(Select="COUNT")["Count"] == 120
+        assert CustomerCounter().read() == 120
+    finally:
+        ingest_module.repo = CustomerDynamoDBRepository()
@@ -0,0 +1,57 @@
+import json
+import pytest
+from app.errors import AlreadyExists
+from lambdas.insert_if_absent import handler as iia_module
+
+class RepoPutOK:
+    def __init__(self): self.calls = []
+    def put(self, cid, attrs=None): self.calls.append((cid, attrs))
+    def exists(self, cid): raise AssertionError("must not pre-read")
+
+class RepoAlreadyExists(RepoPutOK):
+    def put(self, cid, attrs=None): raise AlreadyExists("id already exists")
+
+class DummyLogger:
+    def __init__(self): self.messages = []
+    def info(self, msg, *args, **kwargs): self.messages.append(msg)
+
+@pytest.fixture
+def workflow_log(monkeypatch):
+    dummy = DummyLogger()
+    monkeypatch.setattr(iia_module.log_event, "logger", dummy)
+    return dummy
+
+def test_inserts_new_id(monkeypatch, workflow_log):
+    repo = RepoPutOK()
+    monkeypatch.setattr(iia_module, "repo", repo)
+
+    res = iia_module.handler({"id": "AB_123"}, context=None)
+
+    assert res == {"id": "AB_123", "validation": {"exists": False}, "insert": {"inserted": True}}
+    assert repo.calls[0][0] == "AB_123"
+    assert "created_at" in repo.calls[0][1]
+
+def test_existing_id_reports_exists(monkeypatch, workflow_log):
+    monkeypatch.setattr(iia_module, "repo", RepoAlreadyExists())
+
+    res = iia_module.handler({"detail": {"id": "AB_123"}}, context=None)
+    assert res["validation"] == {"exists": True}
+    assert res["insert"] == {"inserted": False}
+
+def test_emits_workflow_log_line(monkeypatch, workflow_log):
+    monkeypatch.setattr(iia_module, "repo", RepoPutOK())
+
+    iia_module.handler({"id": "AB_123"}, context=None)
+    payload = json.loads(str(workflow_log.messages[-1]))
+    assert payload["msg"] == "workflow_log"
+    assert payload["customer_id"] == "AB_123"
+    assert (payload["exists"], payload["inserted"]) == (False, True)
+
+def test_invalid_id_raises(monkeypatch, workflow_log):
+    monkeypatch.setattr(iia_module, "repo", RepoPutOK())
+    with pytest.raises(Exception):
+        iia_module.handler({"id": "!!"}, context=None)
+
+def test_lambda_handler_alias(monkeypatch, workflow_log):
+    monkeypatch.setattr(iia_module, "repo", RepoPutOK())
+    assert iia_module.lambda_handler({"id": "AB_123"}, context=None)["insert"] == {"inserted": True}
@@ -0,0 +1,69 @@
+import pytest
+from app.changelog import ADD, REMOVE, Changelog, LocalStore
+from app.pagination import encode_token
+from lambdas.list_changes import handler as changes_module
+
+@pytest.fixture
+def log(tmp_path, monkeypatch):
+    log = Changelog(LocalStore(str(tmp_path / "changelog")))
+    monkeypatch.setattr(changes_module, "changelog", log)
+    return log
+
+def _op(op, cid):
+    return {"op": op, "id": cid, "ts": None}
+
+def _event(**query):
+    return {"httpMethod": "GET", "resource": "/customers/changes", "queryStringParameters": query or None}
+
+def _poll(extract, cursor=None, limit="2"):
+    query = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+    status, body = extract(changes_module.handler(_event(**query), None))
+    assert status == 200, body
+    assert body["count"] == len(body["changes"]) <= int(limit)
+    return body
+
+def _drain(extract, cursor=None):
+    seen = []
+    while True:
+        body = _poll(extract, cursor)
+        seen += [(c["op"], c["id"]) for c in body["changes"]]
+        cursor = body["next_cursor"]
+        if not body["has_more"]:
+            return seen, cursor
+
+def test_full_sync_then_incremental_polls_with_tombstones(log, extract_status_and_body):
+    for i in range(3):
+        log.append([_op(ADD, f"AB_{i}")])
+    log.append([_op(REMOVE, "AB_1"), _op(ADD, "AB_9")])
+    log.compact(keep=1)          # base of AB_0..AB_2, then the last segment
+
+    seen, cursor = _drain(extract_status_and_body)
+    assert seen == [(ADD, "AB_0"), (ADD, "AB_1"), (ADD, "AB_2"), (REMOVE, "AB_1"), (ADD, "AB_9")]
+
+    assert _poll(extract_status_and_body, cursor)["changes"] == []
+    log.append([_op(REMOVE, "AB_0")])
+    log.append([_op(ADD, "AB_5"), _op(ADD, "AB_6"), _op(ADD, "AB_7")])
+    seen, cursor = _drain(extract_status_and_body, cursor)
+    assert seen == [(REMOVE, "AB_0"), (ADD, "AB_5"), (ADD, "AB_6"), (ADD, "AB_7")]
+    assert _poll(extract_status_and_body, cursor)["has_more"] is False
+
+def test_compacted_cursor_is_410(log, extract_status_and_body):
+    log.append([_op(ADD, "AB_1"), _op(ADD, "AB_2"), _op(ADD, "AB_3")])
+    cursor = _poll(extract_status_and_body, limit="1")["next_cursor"]   # inside segment 1
+    log.append([_op(ADD, "AB_4")])
+    log.compact(keep=1)
+
+    status, body = extract_status_and_body(changes_module.handler(_event(cursor=cursor), None))
+    assert status == 410 and "resync" in body["error"]
+
+@pytest.mark.parametrize("query", [{"cursor": "!!!"}, {"cursor": encode_token({"s": "1", "i": 0})},
+                                   {"cursor": encode_token({"s": 1})}, {"limit": "0"}])
+def test_bad_query_is_400(log, query, extract_status_and_body):
+    status, body = extract_status_and_body(changes_module.handler(_event(**query), None))
+    assert status == 400 and "error" in body
+
+def test_empty_log_returns_resumable_cursor(log, extract_status_and_body):
+    body = _poll(extract_status_and_body)
+    assert (body["changes"], body["has_more"]) == ([], False)
+    log.append([_op(ADD, "AB_1")])
+    assert [c["id"] for c in _poll(extract_status_and_body, body["next_cursor"])["changes"]] == ["AB_1"]
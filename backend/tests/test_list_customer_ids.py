@@ -0,0 +1,41 @@
+import pytest
+from app.dynamodb_repo import CustomerDynamoDBRepository
+from app.pagination import decode_token, encode_token
+from lambdas.list_customer_ids import handler as list_module
+
+@pytest.fixture
+def seeded(ddb_table, monkeypatch):
+    with ddb_table.batch_writer() as batch:
+        for i in range(25):
+            batch.put_item(Item={"id": f"id_{i:03d}", "created_at": "2024-01-01"})
+    monkeypatch.setattr(list_module, "repo", CustomerDynamoDBRepository())
+    return {f"id_{i:03d}" for i in range(25)}
+
+def _event(**query):
+    return {"httpMethod": "GET", "resource": "/customers", "queryStringParameters": query or None}
+
+def test_pages_cover_every_id_once(seeded, extract_status_and_body):
+    seen, token, pages = [], None, 0
+    while True:
+        status, body = extract_status_and_body(list_module.handler(_event(limit="10", **({"next_token": token} if token else {})), None))
+        assert status == 200
+        assert len(body["ids"]) <= 10 and body["count"] == len(body["ids"])
+        seen += body["ids"]
+        pages += 1
+        token = body["next_token"]
+        if token is None:
+            break
+    assert sorted(seen) == sorted(seeded)
+    assert pages >= 3
+
+@pytest.mark.parametrize("query", [{"limit": "0"}, {"limit": "abc"}, {"limit": "100000"},
+                                   {"next_token": "!!!"}, {"next_token": encode_token({"x": 1})}])
+def test_bad_query_is_400(query, extract_status_and_body):
+    status, body = extract_status_and_body(list_module.handler(_event(**query), None))
+    assert status == 400 and "error" in body
+
+def test_token_is_opaque_roundtrip():
+    token = encode_token({"id": "AB_1"})
+    assert "AB_1" not in token
+    assert decode_token(token) == {"id": "AB_1"}
+    assert encode_token(None) is None and decode_token(None) is None
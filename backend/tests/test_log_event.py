@@ -21,6 +21,8 @@ def _unwrap_logged_json(dummy_logger):
     msg = dummy_logger.infos[0]
     if isinstance(msg, (bytes, bytearray)):
         msg = msg.decode("utf-8")
+    else:
+        msg = str(msg)  # messages are rendered lazily by the logging backend
     try:
         return json.loads(msg)
     except Exception:
@@ -0,0 +1,80 @@
+import io
+import json
+import logging
+import threading
+import pytest
+from app import logger as logger_module
+from app.logger import LazyJson, _BatchWriter, _QueueHandler
+
+def _async_logger(name, writer):
+    log = logging.getLogger(name)
+    log.handlers[:] = [_QueueHandler(writer)]
+    log.propagate = False
+    log.setLevel("INFO")
+    return log
+
+def test_async_logger_writes_batched_json_lines():
+    stream = io.StringIO()
+    writer = _BatchWriter(stream, max_queue=100, batch_size=50)
+    log = _async_logger("async_test_batch", writer)
+
+    for i in range(10):
+        log.info("item %d of %s", i, "ten")
+    log.debug("dropped by level %s", "never")
+    assert writer.flush(timeout=2)
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["message"] for line in lines] == [f"item {i} of ten" for i in range(10)]
+    assert lines[0]["logger"] == "async_test_batch"
+    stats = writer.stats()
+    assert stats["log_records"] == 10
+    assert 1 <= stats["log_batches"] <= 10
+
+def test_lazy_json_is_rendered_on_writer_thread():
+    rendered_on = []
+
+    class Payload(dict):
+        def items(self):
+            rendered_on.append(threading.current_thread().name)
+            return super().items()
+
+    stream = io.StringIO()
+    writer = _BatchWriter(stream, max_queue=10, batch_size=10)
+    _async_logger("async_test_lazy", writer).info(LazyJson(Payload(a=1)))
+    assert writer.flush(timeout=2)
+
+    assert json.loads(json.loads(stream.getvalue())["message"]) == {"a": 1}
+    assert rendered_on == ["log-writer"]
+
+def test_full_queue_drops_instead_of_blocking():
+    release = threading.Event()
+
+    class SlowStream(io.StringIO):
+        def write(self, s):
+            release.wait(2)
+            return super().write(s)
+
+    writer = _BatchWriter(SlowStream(), max_queue=1, batch_size=1)
+    log = _async_logger("async_test_drop", writer)
+    for i in range(20):
+        log.info("burst %d", i)
+    release.set()
+    assert writer.flush(timeout=2)
+    assert writer.stats()["log_dropped"] > 0
+
+def test_flush_after_flushes_active_writer(monkeypatch):
+    calls = []
+    monkeypatch.setattr(logger_module, "flush_logs", lambda timeout=None: calls.append(timeout))
+
+    @logger_module.flush_after
+    def handler(event, context):
+        return {"ok": event}
+
+    @logger_module.flush_after
+    def crashing(event, context):
+        raise ZeroDivisionError
+
+    assert handler(1, None) == {"ok": 1}
+    with pytest.raises(ZeroDivisionError):
+        crashing(0, None)
+    assert len(calls) == 2
@@ -0,0 +1,94 @@
+import io
+import json
+import pytest
+from app import metrics
+
+@pytest.fixture
+def stream():
+    return io.StringIO()
+
+def _docs(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+def test_one_emf_document_per_invocation(stream):
+    @metrics.instrument("get_customer_id", stream=stream)
+    def handler(event, context):
+        with metrics.timer("DynamoDBExists"):
+            pass
+        with metrics.timer("DynamoDBExists"):
+            pass
+        metrics.incr("CacheHit")
+        metrics.incr("CacheHit")
+        return {"statusCode": 200, "body": "{}"}
+
+    assert handler({}, None)["statusCode"] == 200
+    (doc,) = _docs(stream)
+
+    directive = doc["_aws"]["CloudWatchMetrics"][0]
+    assert directive["Dimensions"] == [["FunctionName", "Outcome"]]
+    names = {m["Name"]: m["Unit"] for m in directive["Metrics"]}
+    assert names["DynamoDBExists"] == "Milliseconds"
+    assert names["CacheHit"] == "Count"
+    assert names["Duration"] == "Milliseconds"
+    assert doc["FunctionName"] == "get_customer_id"
+    assert doc["Outcome"] == "success"
+    assert len(doc["DynamoDBExists"]) == 2
+    assert doc["CacheHit"] == 2
+
+@pytest.mark.parametrize("status,outcome", [(404, "client_error"), (503, "server_error")])
+def test_outcome_from_status_code(stream, status, outcome):
+    @metrics.instrument("put_customer_id", stream=stream)
+    def handler(event, context):
+        return {"statusCode": status}
+
+    handler({}, None)
+    assert _docs(stream)[0]["Outcome"] == outcome
+
+def test_exception_outcome_is_error_and_reraised(stream):
+    @metrics.instrument("validate_exists", stream=stream)
+    def handler(event, context):
+        raise ValueError("bad id")
+
+    with pytest.raises(ValueError):
+        handler({}, None)
+    assert _docs(stream)[0]["Outcome"] == "error"
+    assert metrics.current() is None
+
+def test_nested_handlers_report_into_outer_invocation(stream):
+    @metrics.instrument("inner", stream=stream)
+    def inner(event, context):
+        with metrics.timer("Inner"):
+            return {}
+
+    @metrics.instrument("outer", stream=stream)
+    def outer(event, context):
+        inner(event, context)
+        with metrics.timer("Outer"):
+            return {}
+
+    outer({}, None)
+    (doc,) = _docs(stream)
+    assert doc["FunctionName"] == "outer"
+    assert "Inner" in doc and "Outer" in doc
+
+def test_timers_are_noops_outside_invocations():
+    with metrics.timer("DynamoDBPut"):
+        pass
+    metrics.incr("CacheMiss")
+    assert metrics.current() is None
+
+def test_repository_calls_are_timed(ddb_table, stream):
+    from app.dynamodb_repo import CustomerDynamoDBRepository
+    repo = CustomerDynamoDBRepository(region_name="eu-central-1")
+
+    @metrics.instrument("roundtrip", stream=stream)
+    def handler(event, context):
+        repo.put("AB_1")
+        repo.exists("AB_1")
+        repo.delete("AB_1")
+        return {}
+
+    handler({}, None)
+    doc = _docs(stream)[0]
+    for name in ("DynamoDBPut", "DynamoDBExists", "DynamoDBDelete"):
+        assert doc[name] >= 0
@@ -0,0 +1,84 @@
+import pytest
+from app import prefix_index
+from app.dynamodb_repo import CustomerDynamoDBRepository, prefix_bucket
+from app.pagination import encode_token
+from lambdas.list_customer_ids import handler as list_module
+
+IDS = [f"ab_{i:03d}" for i in range(60)] + [f"abc{i:02d}" for i in range(10)] + [f"zz_{i:03d}" for i in range(20)]
+
+@pytest.fixture
+def repo(ddb_table, monkeypatch):
+    repo = CustomerDynamoDBRepository(counter_table=None)
+    for i in range(0, len(IDS), 25):
+        repo.batch_put(IDS[i:i + 25])
+    monkeypatch.setattr(list_module, "repo", repo)
+    return repo
+
+def _search_all(repo, prefix, limit):
+    seen, after = [], None
+    while True:
+        ids, after = repo.search_prefix(prefix, limit, after)
+        assert len(ids) <= limit
+        seen += ids
+        if after is None:
+            return seen
+
+def test_search_merges_buckets_in_id_order(repo):
+    assert len({prefix_bucket(cid) for cid in IDS}) > 1
+    assert _search_all(repo, "ab", 7) == sorted(c for c in IDS if c.startswith("ab"))
+    assert _search_all(repo, "abc", 100) == [f"abc{i:02d}" for i in range(10)]
+    assert repo.search_prefix("nope", 10) == ([], None)
+
+def test_cursor_survives_writes_between_pages(repo):
+    first, after = repo.search_prefix("ab_", 20)
+    assert first == [f"ab_{i:03d}" for i in range(20)] and after == "ab_019"
+    repo.delete("ab_020")
+    repo.delete("ab_005")
+    repo.put("ab_0205")
+    repo.put("ab_0001")
+    ids, last = [], after
+    while True:
+        page, last = repo.search_prefix("ab_", 20, last)
+        ids += page
+        if last is None:
+            break
+    assert ids == ["ab_0205"] + [f"ab_{i:03d}" for i in range(21, 60)]
+
+def test_backfill_tags_untagged_and_keeps_deleted_ids_gone(repo, ddb_table):
+    ddb_table.put_item(Item={"id": "ab_legacy"})
+    ddb_table.put_item(Item={"id": "ab_stale", "pfx_bucket": (prefix_bucket("ab_stale") + 1) % 16})
+    assert "ab_legacy" not in _search_all(repo, "ab_l", 10)
+
+    report = prefix_index.backfill(repo, segments=4, workers=1)
+    assert report["scanned"] == len(IDS) + 2 and report["tagged"] == 2
+    assert _search_all(repo, "ab_", 100) == sorted([c for c in IDS if c.startswith("ab_")] + ["ab_legacy", "ab_stale"])
+
+    repo.delete("ab_legacy")
+    assert repo.tag_prefix_bucket("ab_legacy") is False
+    assert "Item" not in ddb_table.get_item(Key={"id": "ab_legacy"})
+    assert prefix_index.backfill(repo, segments=2, workers=1)["tagged"] == 0
+
+def _event(**query):
+    return {"httpMethod": "GET", "resource": "/customers", "queryStringParameters": query or None}
+
+def test_handler_pages_by_prefix(repo, extract_status_and_body):
+    seen, token = [], None
+    while True:
+        query = {"prefix": "abc", "limit": "4", **({"next_token": token} if token else {})}
+        status, body = extract_status_and_body(list_module.handler(_event(**query), None))
+        assert status == 200 and body["count"] == len(body["ids"]) <= 4
+        seen += body["ids"]
+        token = body["next_token"]
+        if token is None:
+            break
+    assert seen == [f"abc{i:02d}" for i in range(10)]
+
+@pytest.mark.parametrize("query", [
+    {"prefix": ""}, {"prefix": "a b"}, {"prefix": "x" * 65},
+    {"prefix": "ab", "next_token": encode_token({"id": "ab_001"})},
+    {"next_token": encode_token({"id": "ab_001", "pfx": "ab"})},
+    {"prefix": "zz", "next_token": encode_token({"id": "ab_001", "pfx": "ab"})},
+])
+def test_bad_prefix_or_mismatched_token_is_400(repo, query, extract_status_and_body):
+    status, body = extract_status_and_body(list_module.handler(_event(**query), None))
+    assert status == 400 and "error" in body
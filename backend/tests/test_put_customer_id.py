@@ -66,3 +66,16 @@ def test_put_internal_error(monkeypatch):
 
     resp = put_handler(_event("x1"), None)
     assert resp["statusCode"] == 500
+
+def test_put_throttled_returns_503(monkeypatch):
+    from app.errors import Throttled
+
+    class RepoThrottled:
+        def put(self, cid):
+            raise Throttled("throttled")
+
+    monkeypatch.setattr("lambdas.put_customer_id.handler.repo", RepoThrottled())
+
+    resp = put_handler(_event("abc123"), None)
+    assert resp["statusCode"] == 503
+    assert resp["headers"]["Retry-After"] == "1"
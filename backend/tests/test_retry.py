@@ -0,0 +1,163 @@
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError, ReadTimeoutError
+from app import retry
+from app.dynamodb_repo import CustomerDynamoDBRepository
+from app.errors import AlreadyExists, NotFound, Throttled
+from app.retry import RetryPolicy, TokenBucket
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(retry, "backoff", lambda *a: None)
+
+def _error(code):
+    return ClientError({"Error": {"Code": code, "Message": code}}, "PutItem")
+
+def _flaky(*outcomes):
+    calls = []
+    def fn(**kwargs):
+        calls.append(kwargs)
+        out = outcomes[len(calls) - 1]
+        if isinstance(out, Exception):
+            raise out
+        return out
+    return fn, calls
+
+def test_throttles_are_retried_counted_and_engage_the_limiter():
+    policy = RetryPolicy(TokenBucket(sleep=lambda s: None), max_attempts=4)
+    fn, calls = _flaky(_error("ProvisionedThroughputExceededException"), _error("ThrottlingException"), {"ok": 1})
+    assert policy.call(fn) == {"ok": 1}
+    assert len(calls) == 3
+    stats = policy.stats()
+    assert stats["throttles"] == 2 and stats["retries"] == 2
+    assert stats["rate_limit"] is not None
+
+def test_throttled_after_max_attempts():
+    policy = RetryPolicy(TokenBucket(sleep=lambda s: None), max_attempts=2)
+    fn, _ = _flaky(*[_error("ThrottlingException")] * 2)
+    with pytest.raises(Throttled):
+        policy.call(fn)
+
+def test_non_retryable_errors_are_raised_immediately():
+    policy = RetryPolicy(max_attempts=5)
+    fn, calls = _flaky(EndpointConnectionError(endpoint_url="x"), _error("ValidationException"))
+    with pytest.raises(ClientError) as info:
+        policy.call(fn)
+    assert len(calls) == 2
+    # a connect failure never reached the service, so it is not ambiguous
+    assert info.value.after_ambiguous_attempt is False
+
+def test_token_bucket_paces_after_throttle_and_recovers():
+    now = [0.0]
+    slept = []
+    def sleep(s):
+        slept.append(s)
+        now[0] += s
+    bucket = TokenBucket(min_rate=10, max_rate=12, increase=1, burst=1, clock=lambda: now[0], sleep=sleep)
+    assert bucket.acquire() == 0.0
+    bucket.on_throttle()
+    assert bucket.rate == 10
+    for _ in range(3):
+        bucket.acquire()
+    assert slept and sum(slept) == pytest.approx(0.3)
+    bucket.on_success()
+    bucket.on_success()
+    assert bucket.rate is None
+
+@pytest.fixture
+def repo(ddb_table):
+    # plain PutItem / DeleteItem; the counted (transactional) path is covered below
+    return CustomerDynamoDBRepository(retry=RetryPolicy(TokenBucket(sleep=lambda s: None)), counter_table=None)
+
+def _timeout_after(real):
+    # the write reaches the table, the response never reaches us
+    state = {"calls": 0}
+    def fn(**kwargs):
+        state["calls"] += 1
+        if state["calls"] == 1:
+            real(**kwargs)
+            raise ReadTimeoutError(endpoint_url="x")
+        return real(**kwargs)
+    return fn
+
+def test_put_retried_after_timeout_is_not_a_conflict(repo):
+    table = repo._table
+    table.put_item = _timeout_after(type(table).put_item.__get__(table))
+    repo.put("AB_1", {"created_at": "t1"})
+    assert repo.exists("AB_1")
+
+def test_real_conflict_after_timeout_is_still_reported(repo, ddb_table):
+    ddb_table.put_item(Item={"id": "AB_1", "created_at": "someone else"})
+    table = repo._table
+    real = type(table).put_item.__get__(table)
+    calls = []
+    def fn(**kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            raise ReadTimeoutError(endpoint_url="x")
+        return real(**kwargs)
+    table.put_item = fn
+    with pytest.raises(AlreadyExists):
+        repo.put("AB_1", {"created_at": "t1"})
+
+def _idempotent_timeout_after(real):
+    # like _timeout_after, plus what moto does not emulate: DynamoDB answers a retry carrying
+    # the ClientRequestToken of an applied transaction with success instead of running it again
+    applied = set()
+    state = {"calls": 0}
+    def fn(**kwargs):
+        state["calls"] += 1
+        token = kwargs.get("ClientRequestToken")
+        if token in applied:
+            return {}
+        res = real(**kwargs)
+        applied.add(token)
+        if state["calls"] == 1:
+            raise ReadTimeoutError(endpoint_url="x")
+        return res
+    return fn
+
+def test_delete_retried_after_timeout_succeeds(ddb_table, counter_on, monkeypatch):
+    # the first attempt landed; the retry reuses its token, so DynamoDB reports the delete as done
+    from app.counter import CustomerCounter
+    repo = CustomerDynamoDBRepository(retry=RetryPolicy(TokenBucket(sleep=lambda s: None)))
+    repo.put("AB_1")
+    client = repo._table.meta.client
+    monkeypatch.setattr(client, "transact_write_items", _idempotent_timeout_after(client.transact_write_items))
+    assert repo.delete("AB_1") == {"id": "AB_1"}
+    assert "Item" not in ddb_table.get_item(Key={"id": "AB_1"})
+    assert CustomerCounter().read() == 0
+
+def test_uncounted_delete_retried_after_timeout_is_ambiguous(repo, ddb_table):
+    # a plain DeleteItem has no token, and nothing on the retry proves the delete was ours
+    ddb_table.put_item(Item={"id": "AB_1"})
+    table = repo._table
+    table.delete_item = _timeout_after(type(table).delete_item.__get__(table))
+    with pytest.raises(NotFound):
+        repo.delete("AB_1")
+    assert "Item" not in ddb_table.get_item(Key={"id": "AB_1"})
+
+def test_delete_of_missing_id_after_timeout_is_not_found(ddb_table, counter_on, monkeypatch):
+    from app.counter import CustomerCounter
+    repo = CustomerDynamoDBRepository(retry=RetryPolicy(TokenBucket(sleep=lambda s: None)))
+    client = repo._table.meta.client
+    real = client.transact_write_items
+    calls = []
+    def fn(**kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            raise ReadTimeoutError(endpoint_url="x")
+        return real(**kwargs)
+    monkeypatch.setattr(client, "transact_write_items", fn)
+    with pytest.raises(NotFound):
+        repo.delete("AB_404")
+    assert len(calls) == 2
+    assert CustomerCounter().read() == 0
+
+def test_counted_put_retried_after_timeout_is_not_a_conflict(ddb_table, counter_on, monkeypatch):
+    from app.counter import CustomerCounter
+    repo = CustomerDynamoDBRepository(retry=RetryPolicy(TokenBucket(sleep=lambda s: None)))
+    client = repo._table.meta.client
+    monkeypatch.setattr(client, "transact_write_items", _timeout_after(client.transact_write_items))
+    repo.put("AB_1", {"created_at": "t1"})
+    assert repo.exists("AB_1")
+    assert CustomerCounter().read() == 1
@@ -153,3 +153,98 @@ def test_lambda_handler_alias(monkeypatch, ev_path):
     assert status == 202
     assert body["id"] == "AB_123"
     assert len(fake.calls) == 1
+
+class FlakyEvents:
+    def __init__(self, fail_once=(), fail_always=()):
+        self.calls = []
+        self.fail_once = set(fail_once)
+        self.fail_always = set(fail_always)
+    def put_events(self, Entries):
+        self.calls.append({"Entries": Entries})
+        out = []
+        for e in Entries:
+            cid = json.loads(e["Detail"])["id"]
+            if cid in self.fail_always or cid in self.fail_once:
+                self.fail_once.discard(cid)
+                out.append({"ErrorCode": "InternalFailure", "ErrorMessage": "boom"})
+            else:
+                out.append({"EventId": f"evt-{cid}"})
+        return {"FailedEntryCount": sum(1 for o in out if "ErrorCode" in o), "Entries": out}
+
+def _ids_event(ids):
+    return {"body": json.dumps({"ids": ids}), "pathParameters": None, "headers": {}}
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    from app import events as events_module
+    monkeypatch.setattr(events_module, "_backoff", lambda attempt: None)
+
+def test_submit_many_packs_ten_per_call(monkeypatch):
+    fake = FlakyEvents()
+    monkeypatch.setattr(submit_module, "events", fake)
+
+    ids = [f"id_{i:02d}" for i in range(23)]
+    status, body = _unwrap(submit_module.handler(_ids_event(ids), context=None))
+
+    assert status == 202
+    assert body["accepted"] == 23
+    assert [len(c["Entries"]) for c in fake.calls] == [10, 10, 3]
+    assert [r["id"] for r in body["results"]] == ids
+
+def test_submit_many_retries_failed_entries(monkeypatch, no_backoff):
+    fake = FlakyEvents(fail_once={"id_01"})
+    monkeypatch.setattr(submit_module, "events", fake)
+
+    status, body = _unwrap(submit_module.handler(_ids_event(["id_00", "id_01"]), context=None))
+
+    assert status == 202
+    assert [len(c["Entries"]) for c in fake.calls] == [2, 1]
+    assert body["results"][1] == {"id": "id_01", "status": "accepted", "event_id": "evt-id_01"}
+
+def test_submit_many_reports_per_id_status(monkeypatch, no_backoff):
+    fake = FlakyEvents(fail_always={"id_02"})
+    monkeypatch.setattr(submit_module, "events", fake)
+
+    status, body = _unwrap(submit_module.handler(_ids_event(["id_01", "!!", "id_02", "id_01"]), context=None))
+
+    assert status == 207
+    assert body["results"] == [
+        {"id": "id_01", "status": "accepted", "event_id": "evt-id_01"},
+        {"id": "!!", "status": "invalid", "reason": "too_short"},
+        {"id": "id_02", "status": "failed", "error": "InternalFailure"},
+    ]
+    assert (body["accepted"], body["failed"], body["invalid"]) == (1, 1, 1)
+
+def test_submit_many_rejects_empty_or_oversized(monkeypatch):
+    monkeypatch.setattr(submit_module, "events", FakeEvents())
+    monkeypatch.setattr(submit_module, "SUBMIT_MAX_IDS", 2)
+
+    assert _unwrap(submit_module.handler(_ids_event([]), context=None))[0] == 400
+    assert _unwrap(submit_module.handler(_ids_event(["a_1", "a_2", "a_3"]), context=None))[0] == 400
+
+def test_submit_single_failed_entry_is_not_accepted(monkeypatch, ev_path, no_backoff):
+    fake = FlakyEvents(fail_always={"AB_123"})
+    monkeypatch.setattr(submit_module, "events", fake)
+    monkeypatch.setattr(submit_module, "validate_id", _stub_validate_identity)
+
+    status, body = _unwrap(submit_module.handler(ev_path, context=None))
+    assert status == 502
+    assert body["status"] == "failed"
+    assert len(fake.calls) == 5
+
+def test_submit_many_keeps_published_results_when_a_call_raises(monkeypatch):
+    class Failing(FlakyEvents):
+        def put_events(self, Entries):
+            if self.calls:
+                self.calls.append({"Entries": Entries})
+                raise RuntimeError("connection reset")
+            return super().put_events(Entries)
+
+    fake = Failing()
+    monkeypatch.setattr(submit_module, "events", fake)
+    ids = [f"id_{i:02d}" for i in range(12)]
+    status, body = _unwrap(submit_module.handler(_ids_event(ids), context=None))
+
+    assert status == 207
+    assert (body["accepted"], body["failed"]) == (10, 2)
+    assert body["results"][10] == {"id": "id_10", "status": "failed", "error": "RuntimeError"}
@@ -0,0 +1,27 @@
+import re
+import pytest
+from app.errors import InvalidCustomerId
+from app.validation import is_valid_customer_id, rejection_reason, validate_id, validate_many
+
+_REFERENCE = re.compile(r"[A-Za-z0-9_-]{3,64}")
+
+@pytest.mark.parametrize("cid", [
+    "AB_123", "abc", "a-b", "___", "x" * 64, "x" * 65, "ab", "", None, 123, "bad id", "bad!", "é" * 5,
+    "abc\n", "ab\x00c", "ＡＢＣ", "AB-12_cd",
+])
+def test_matches_pattern(cid):
+    expected = isinstance(cid, str) and _REFERENCE.fullmatch(cid) is not None
+    assert is_valid_customer_id(cid) is expected
+    assert (rejection_reason(cid) is None) is expected
+
+def test_validate_many_reports_reasons_without_raising():
+    valid, rejected = validate_many(["AB_1", None, "x", "y" * 65, 7, "a b c", "CD_2"])
+    assert valid == ["AB_1", "CD_2"]
+    assert [(r["index"], r["reason"]) for r in rejected] == [
+        (1, "missing"), (2, "too_short"), (3, "too_long"), (4, "not_a_string"), (5, "invalid_characters"),
+    ]
+
+def test_validate_id_still_raises():
+    with pytest.raises(InvalidCustomerId):
+        validate_id("no spaces")
+    assert validate_id("AB_1") == "AB_1"
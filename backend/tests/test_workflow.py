@@ -0,0 +1,81 @@
+import asyncio
+from app.events import to_eventbridge_event
+from app.workflow import LocalWorkflow, load_definition
+
+def _event(cid):
+    return to_eventbridge_event({"Source": "customers.api", "DetailType": "Customer.Submitted",
+                                 "Detail": f'{{"id": "{cid}"}}'})
+
+class FakeLambdas:
+    def __init__(self, existing=()):
+        self.existing = set(existing)
+        self.calls = []
+    def __call__(self, name):
+        def fn(event, context):
+            self.calls.append((name, event))
+            if name == "validate_exists":
+                return {"exists": event["id"] in self.existing}
+            if name == "insert_id":
+                self.existing.add(event["id"])
+                return {"inserted": True}
+            return {"logged": True}
+        return fn
+
+def test_eventbridge_envelope_shape():
+    ev = _event("AB_1")
+    assert ev["detail"] == {"id": "AB_1"}
+    assert ev["detail-type"] == "Customer.Submitted"
+    assert ev["source"] == "customers.api"
+    assert {"version", "id", "account", "time", "region", "resources"} <= set(ev)
+
+def test_new_id_takes_insert_branch():
+    fake = FakeLambdas()
+    res = LocalWorkflow(load_definition(), resolver=fake).execute(_event("AB_1"))
+
+    assert res["status"] == "SUCCEEDED"
+    assert [name for name, _ in fake.calls] == ["validate_exists", "insert_id", "log_event"]
+    assert fake.calls[0][1] == {"id": "AB_1"}
+    log_input = fake.calls[2][1]
+    assert log_input["validation"] == {"exists": False}
+    assert log_input["insert"] == {"inserted": True}
+    assert [state for state, _ in res["timings"]] == ["ValidateExists", "Exists?", "InsertId", "LogEvent"]
+
+def test_existing_id_skips_insert():
+    fake = FakeLambdas({"AB_1"})
+    res = LocalWorkflow(load_definition(), resolver=fake).execute(_event("AB_1"))
+
+    assert res["status"] == "SUCCEEDED"
+    assert [name for name, _ in fake.calls] == ["validate_exists", "log_event"]
+    assert res["output"]["validation"] == {"exists": True}
+
+def test_handler_exception_fails_execution():
+    def resolver(name):
+        def fn(event, context): raise ValueError("bad id")
+        return fn
+    res = LocalWorkflow(load_definition(), resolver=resolver).execute(_event("!!"))
+    assert res["status"] == "FAILED"
+    assert res["error"] == "ValueError"
+    assert res["state"] == "ValidateExists"
+
+def test_run_many_against_moto(ddb_table):
+    wf = LocalWorkflow(load_definition())
+    inputs = [_event(cid) for cid in ("wf_1", "wf_2", "wf_1", "!!")]
+
+    rep = asyncio.run(wf.run_many(inputs, concurrency=1))
+
+    assert rep["executions"] == 4
+    assert rep["statuses"] == {"SUCCEEDED": 3, "FAILED": 1}
+    assert rep["states"]["InsertId"]["count"] == 2
+    assert {i["id"] for i in ddb_table.scan()["Items"]} == {"wf_1", "wf_2"}
+
+def test_single_write_definition_against_moto(ddb_table):
+    from app.workflow import DEFAULT_DEFINITION
+    wf = LocalWorkflow(load_definition(DEFAULT_DEFINITION.with_name("customer_workflow_single_write.asl.json")))
+
+    first = wf.execute(_event("wf_1"))
+    second = wf.execute(_event("wf_1"))
+
+    assert [state for state, _ in first["timings"]] == ["InsertIfAbsent"]
+    assert first["output"] == {"id": "wf_1", "validation": {"exists": False}, "insert": {"inserted": True}}
+    assert second["output"]["validation"] == {"exists": True}
+    assert second["output"]["insert"] == {"inserted": False}